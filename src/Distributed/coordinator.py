@@ -0,0 +1,203 @@
+import argparse
+import copy
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Tuple, Any, Optional
+
+from Distributed.protocol import (CodificadorSoluciones, FIN, MSG_ESCENARIO, MSG_FIN, MSG_MEJOR_GLOBAL,
+                                  MSG_MEJOR_ITERACION, codificar_json, enviar_mensaje, recibir_mensaje)
+from utils.bounds import comprobar_viabilidad
+from utils.scenario import (VARIANTES, generar_horas_disponibles, generar_instancias_personal,
+                            transformar_nombres_pacientes)
+
+
+class Coordinador:
+    """
+    Reparte un escenario entre trabajadores conectados por TCP, recibe sus mejores soluciones
+    por iteración y difunde la mejor global. La mejor solución se guarda en el coordinador, por lo
+    que la caída de un trabajador no la pierde.
+    """
+    def __init__(self, config_data: Dict[str, Any], aco_params: Dict[str, Any], variante: str,
+                 host: str = "127.0.0.1", puerto: int = 5555):
+        if variante not in VARIANTES:
+            raise ValueError(f"Variante desconocida '{variante}'. Disponibles: {', '.join(VARIANTES)}")
+        self.config_data = config_data
+        self.aco_params = aco_params
+        self.variante = variante
+        self.host = host
+        self.puerto = puerto
+
+        # El coordinador construye las mismas tablas de codificación que los trabajadores
+        config_transformada = copy.deepcopy(config_data)
+        transformar_nombres_pacientes(config_transformada)
+        horas = generar_horas_disponibles(config_transformada["hora_inicio"], config_transformada["hora_fin"],
+                                          config_transformada["intervalo_consultas_minutos"])
+        self.codificador = CodificadorSoluciones(config_transformada, horas, generar_instancias_personal(config_transformada))
+
+        self.lock = threading.Lock()
+        self.best_solution: Optional[List[Tuple]] = None
+        self.best_cost = float('inf')
+        self.historial_mejoras: List[Tuple[float, float, int]] = [] # (segundos, coste, trabajador)
+        self.conexiones: Dict[int, socket.socket] = {}
+        self.locks_envio: Dict[int, threading.Lock] = {}
+        self.estado_trabajadores: Dict[int, str] = {}
+        self.mensajes_recibidos: Dict[int, int] = {}
+        self.tiempos_trabajadores: Dict[int, float] = {}
+        self.start_time = None
+
+    def _marcar_caido(self, idx: int, motivo: str):
+        with self.lock:
+            if self.estado_trabajadores.get(idx) != "activo":
+                return
+            self.estado_trabajadores[idx] = "caido"
+        print(f"Coordinador: trabajador {idx} desconectado ({motivo}). Se conserva la mejor solución global.")
+        try:
+            self.conexiones[idx].close()
+        except OSError:
+            pass
+
+    def _difundir(self, origen: int, contenido: bytes):
+        """Envía la mejor solución global a todos los trabajadores activos salvo al que la encontró."""
+        for idx, sock in list(self.conexiones.items()):
+            if idx == origen or self.estado_trabajadores.get(idx) != "activo":
+                continue
+            try:
+                with self.locks_envio[idx]:
+                    enviar_mensaje(sock, MSG_MEJOR_GLOBAL, contenido)
+            except OSError as e:
+                self._marcar_caido(idx, repr(e))
+
+    def _atender_trabajador(self, idx: int, sock: socket.socket):
+        try:
+            while True:
+                tipo, contenido = recibir_mensaje(sock)
+                if tipo == MSG_MEJOR_ITERACION:
+                    self.mensajes_recibidos[idx] += 1
+                    _, coste, solucion = self.codificador.decodificar(contenido)
+                    with self.lock:
+                        mejora = coste < self.best_cost
+                        if mejora:
+                            self.best_cost = coste
+                            self.best_solution = solucion
+                            self.historial_mejoras.append((time.time() - self.start_time, coste, idx))
+                    if mejora:
+                        self._difundir(idx, contenido)
+                elif tipo == MSG_FIN:
+                    (self.tiempos_trabajadores[idx],) = FIN.unpack(contenido)
+                    with self.lock:
+                        self.estado_trabajadores[idx] = "terminado"
+                    return
+        except (ConnectionError, OSError) as e:
+            self._marcar_caido(idx, repr(e))
+
+    def ejecutar(self, num_trabajadores: int, trabajadores_locales: int = 0, espera_conexion: float = 60.0):
+        """
+        Espera a 'num_trabajadores' conexiones (lanzando 'trabajadores_locales' procesos en esta
+        máquina), les envía el escenario y atiende sus mensajes hasta que todos terminan o caen.
+        """
+        procesos_locales = []
+        with socket.create_server((self.host, self.puerto)) as servidor:
+            self.puerto = servidor.getsockname()[1]
+            print(f"Coordinador escuchando en {self.host}:{self.puerto} - esperando {num_trabajadores} trabajadores...")
+            for _ in range(trabajadores_locales):
+                procesos_locales.append(subprocess.Popen(
+                    [sys.executable, "-m", "Distributed.worker", "--host", self.host, "--puerto", str(self.puerto)]))
+
+            servidor.settimeout(espera_conexion)
+            while len(self.conexiones) < num_trabajadores:
+                try:
+                    sock, direccion = servidor.accept()
+                except socket.timeout:
+                    print(f"Coordinador: sólo se conectaron {len(self.conexiones)} de {num_trabajadores} trabajadores.")
+                    break
+                idx = len(self.conexiones)
+                sock.settimeout(None)
+                self.conexiones[idx] = sock
+                self.locks_envio[idx] = threading.Lock()
+                self.estado_trabajadores[idx] = "activo"
+                self.mensajes_recibidos[idx] = 0
+                print(f"Coordinador: trabajador {idx} conectado desde {direccion[0]}:{direccion[1]}")
+
+        self.start_time = time.time()
+        hilos = []
+        for idx, sock in self.conexiones.items():
+            enviar_mensaje(sock, MSG_ESCENARIO, codificar_json({
+                "idx_trabajador": idx,
+                "variante": self.variante,
+                "config_data": self.config_data,
+                "aco_params": self.aco_params,
+            }))
+            hilo = threading.Thread(target=self._atender_trabajador, args=(idx, sock), daemon=True)
+            hilo.start()
+            hilos.append(hilo)
+        for hilo in hilos:
+            hilo.join()
+
+        for sock in self.conexiones.values():
+            try:
+                sock.close()
+            except OSError:
+                pass
+        for proceso in procesos_locales:
+            proceso.wait()
+        return self.best_solution, self.best_cost
+
+    def imprimir_resumen(self):
+        print("\nResumen de trabajadores:")
+        for idx in sorted(self.estado_trabajadores):
+            tiempo = self.tiempos_trabajadores.get(idx)
+            tiempo_str = f"{tiempo:.2f}s" if tiempo is not None else "N/A"
+            print(f"  Trabajador {idx}: {self.estado_trabajadores[idx]} - {self.mensajes_recibidos[idx]} soluciones recibidas - {tiempo_str}")
+        coste_str = f"{self.best_cost:.2f}" if self.best_cost != float('inf') else "N/A"
+        print(f"Mejor coste global: {coste_str}")
+
+    def guardar_mejor_solucion(self, output_dir: str, filename: str = "mejor_solucion_distribuida.json"):
+        os.makedirs(output_dir, exist_ok=True)
+        ruta = os.path.join(output_dir, filename)
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump({
+                "variante": self.variante,
+                "best_cost": self.best_cost,
+                "best_solution": [list(asignacion) for asignacion in (self.best_solution or [])],
+                "historial_mejoras": self.historial_mejoras,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"Mejor solución guardada en {ruta}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Coordinador de colonias ACO distribuidas.")
+    parser.add_argument("--variante", choices=VARIANTES, default="standard")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=5555)
+    parser.add_argument("--trabajadores", type=int, default=2, help="Número de trabajadores a esperar.")
+    parser.add_argument("--trabajadores-locales", type=int, default=0, help="Trabajadores a lanzar en esta máquina.")
+    parser.add_argument("--espera-conexion", type=float, default=60.0)
+    args = parser.parse_args()
+
+    if args.variante == "minmax":
+        from MinMax.main import get_configuration, get_aco_params
+        directorio_defecto = "src/MinMax"
+    else:
+        from Standard.main import get_configuration, get_aco_params
+        directorio_defecto = "src/Standard"
+    config_file_path = os.environ.get('ACO_CONFIG_PATH', os.path.join(directorio_defecto, 'config.json'))
+    aco_params_path = os.environ.get('ACO_PARAMS_PATH', os.path.join(directorio_defecto, 'params_config.json'))
+    plot_dir_path = os.environ.get('PLOT_DIR_PATH', 'plots/')
+
+    config_data = get_configuration(config_file_path)
+    if config_data is None:
+        print("No se pudo cargar la configuración.")
+        exit(1)
+    if not comprobar_viabilidad(config_data):
+        exit(1)
+    aco_params = get_aco_params(aco_params_path)
+
+    coordinador = Coordinador(config_data, aco_params, args.variante, host=args.host, puerto=args.puerto)
+    coordinador.ejecutar(max(args.trabajadores, args.trabajadores_locales), args.trabajadores_locales, args.espera_conexion)
+    coordinador.imprimir_resumen()
+    coordinador.guardar_mejor_solucion(plot_dir_path)
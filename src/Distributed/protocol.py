@@ -0,0 +1,87 @@
+import json
+import socket
+import struct
+from typing import Dict, List, Tuple, Any, Optional
+
+# Cabecera de cada mensaje: tipo (1 byte) y longitud del contenido (4 bytes), en orden de red
+CABECERA = struct.Struct("!BI")
+# Resumen de una solución: iteración, coste y número de asignaciones
+RESUMEN_SOLUCION = struct.Struct("!IdI")
+CAMPOS_POR_ASIGNACION = 6
+
+MSG_ESCENARIO = 1       # Coordinador -> trabajador: configuración, parámetros e índice del trabajador (JSON)
+MSG_MEJOR_ITERACION = 2 # Trabajador -> coordinador: mejor solución de una iteración
+MSG_MEJOR_GLOBAL = 3    # Coordinador -> trabajadores: mejor solución global conocida
+MSG_FIN = 4             # Trabajador -> coordinador: fin de la ejecución (tiempo de ejecución)
+
+FIN = struct.Struct("!d")
+
+
+def enviar_mensaje(sock: socket.socket, tipo: int, contenido: bytes = b""):
+    """Envía un mensaje enmarcado con su cabecera."""
+    sock.sendall(CABECERA.pack(tipo, len(contenido)) + contenido)
+
+
+def _recibir_exacto(sock: socket.socket, num_bytes: int) -> bytes:
+    datos = bytearray()
+    while len(datos) < num_bytes:
+        bloque = sock.recv(num_bytes - len(datos))
+        if not bloque:
+            raise ConnectionError("Conexión cerrada por el otro extremo.")
+        datos.extend(bloque)
+    return bytes(datos)
+
+
+def recibir_mensaje(sock: socket.socket) -> Tuple[int, bytes]:
+    """Recibe un mensaje completo. Lanza ConnectionError si la conexión se cierra."""
+    tipo, longitud = CABECERA.unpack(_recibir_exacto(sock, CABECERA.size))
+    return tipo, _recibir_exacto(sock, longitud)
+
+
+def codificar_json(datos: Dict[str, Any]) -> bytes:
+    return json.dumps(datos).encode("utf-8")
+
+
+def decodificar_json(contenido: bytes) -> Dict[str, Any]:
+    return json.loads(contenido.decode("utf-8"))
+
+
+class CodificadorSoluciones:
+    """
+    Codifica soluciones como secuencias de enteros de 16 bits: cada asignación
+    (paciente, consulta, dia_idx, hora_str, personal_instancia, fase) se transmite como
+    seis índices sobre tablas construidas a partir de la configuración (con los nombres de
+    paciente ya transformados), que coordinador y trabajadores generan de forma idéntica.
+    """
+    def __init__(self, config_data: Dict[str, Any], horas_disponibles: List[str], lista_personal_instancias: List[str]):
+        pacientes = []
+        fases = []
+        for estudio in config_data["tipos_estudio"]:
+            pacientes.extend(p for p in estudio["pacientes"] if p not in pacientes)
+            fases.extend(f for f in estudio["fases"] if f not in fases)
+        self.tablas = [
+            pacientes,
+            list(config_data["consultas"]),
+            None, # dia_idx se transmite directamente
+            list(horas_disponibles),
+            list(lista_personal_instancias),
+            fases,
+        ]
+        self.indices = [None if tabla is None else {valor: i for i, valor in enumerate(tabla)} for tabla in self.tablas]
+
+    def codificar(self, iteracion: int, coste: float, solucion: Optional[List[Tuple]]) -> bytes:
+        solucion = solucion or []
+        valores = []
+        for asignacion in solucion:
+            for campo, valor in enumerate(asignacion):
+                valores.append(valor if self.indices[campo] is None else self.indices[campo][valor])
+        return RESUMEN_SOLUCION.pack(iteracion, coste, len(solucion)) + struct.pack(f"!{len(valores)}H", *valores)
+
+    def decodificar(self, contenido: bytes) -> Tuple[int, float, List[Tuple]]:
+        iteracion, coste, num_asignaciones = RESUMEN_SOLUCION.unpack_from(contenido)
+        valores = struct.unpack_from(f"!{num_asignaciones * CAMPOS_POR_ASIGNACION}H", contenido, RESUMEN_SOLUCION.size)
+        solucion = []
+        for i in range(num_asignaciones):
+            campos = valores[i * CAMPOS_POR_ASIGNACION:(i + 1) * CAMPOS_POR_ASIGNACION]
+            solucion.append(tuple(v if self.tablas[c] is None else self.tablas[c][v] for c, v in enumerate(campos)))
+        return iteracion, coste, solucion
@@ -0,0 +1,72 @@
+import argparse
+import select
+import socket
+import time
+
+from Distributed.protocol import (CodificadorSoluciones, FIN, MSG_ESCENARIO, MSG_FIN, MSG_MEJOR_GLOBAL,
+                                  MSG_MEJOR_ITERACION, decodificar_json, enviar_mensaje, recibir_mensaje)
+from utils.islands import configurar_isla
+from utils.scenario import crear_colonia, preparar_escenario
+
+
+def _procesar_mensajes_pendientes(sock: socket.socket, aco, codificador: CodificadorSoluciones) -> int:
+    """Incorpora todas las mejores soluciones globales recibidas sin bloquear la colonia."""
+    recibidas = 0
+    while select.select([sock], [], [], 0)[0]:
+        tipo, contenido = recibir_mensaje(sock)
+        if tipo == MSG_MEJOR_GLOBAL:
+            _, coste, solucion = codificador.decodificar(contenido)
+            aco.incorporar_solucion(solucion, coste)
+            recibidas += 1
+    return recibidas
+
+
+def ejecutar_trabajador(host: str, puerto: int):
+    """
+    Se conecta al coordinador, recibe el escenario y ejecuta una colonia sobre él. Tras cada
+    iteración envía su mejor solución de la iteración y aplica las mejores globales recibidas.
+    """
+    with socket.create_connection((host, puerto)) as sock:
+        tipo, contenido = recibir_mensaje(sock)
+        if tipo != MSG_ESCENARIO:
+            raise ConnectionError(f"Mensaje inesperado del coordinador: {tipo}")
+        datos = decodificar_json(contenido)
+        idx_trabajador = datos["idx_trabajador"]
+        aco_params = datos["aco_params"]
+
+        escenario = preparar_escenario(datos["config_data"], clases_recursos=aco_params.get("clases_recursos", False),
+                                       plantillas_estudio=aco_params.get("plantillas_estudio", False))
+        if escenario is None:
+            raise ValueError("No se pudo preparar el escenario recibido.")
+        aco = crear_colonia(datos["variante"], escenario, aco_params)
+        # Cada trabajador se comporta como una isla: semilla propia y variaciones opcionales
+        configurar_isla(aco, idx_trabajador, aco_params.get("islas") or {})
+        codificador = CodificadorSoluciones(escenario["config_data"], escenario["horas_disponibles"],
+                                            escenario["lista_personal_instancias"])
+
+        print(f"Trabajador {idx_trabajador}: ejecutando {datos['variante']} ({aco.iterations} iteraciones)...")
+        start_time = time.time()
+        aco._iniciar_ejecucion()
+        for iteration in range(aco.iterations):
+            if aco._tiempo_agotado():
+                aco.motivo_parada = "tiempo_maximo"
+                break
+            aco._ejecutar_iteracion(iteration)
+            if aco.iteration_best_solution is not None:
+                enviar_mensaje(sock, MSG_MEJOR_ITERACION,
+                               codificador.codificar(iteration, aco.iteration_best_cost, aco.iteration_best_solution))
+            _procesar_mensajes_pendientes(sock, aco, codificador)
+            if aco._comprobar_parada(iteration):
+                break
+        aco.execution_time = time.time() - start_time
+
+        enviar_mensaje(sock, MSG_FIN, FIN.pack(aco.execution_time))
+        print(f"Trabajador {idx_trabajador}: terminado en {aco.execution_time:.2f}s (parada: {aco.motivo_parada}) - mejor coste {aco.best_cost}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trabajador de colonias ACO distribuidas.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=5555)
+    args = parser.parse_args()
+    ejecutar_trabajador(args.host, args.puerto)
@@ -1,9 +1,8 @@
 from Standard.ACO import ACO
 from MinMax.MinMaxGraph import MinMaxGraph
-from utils.Ant import Ant
-from typing import List, Dict
+from utils.rng import derivar_rng
+from typing import List, Dict, Optional
 import matplotlib.pyplot as plt
-import time
 import os
 from collections import defaultdict
 
@@ -19,7 +18,20 @@ class MinMaxACO(ACO):
                  alpha: float = 1.0,
                  beta: float = 3.0,
                  rho: float = 0.1, # Tasa de evaporación y aprendizaje
-                 Q: float = 1.0):  # Factor de depósito de feromona
+                 Q: float = 1.0,  # Factor de depósito de feromona
+                 seed: Optional[int] = None, # Semilla de la ejecución
+                 criterios_parada: Optional[Dict] = None,
+                 adaptativo: Optional[Dict] = None,
+                 reinicio_estancamiento: Optional[Dict] = None, # Reinicio MMAS de feromonas al estancarse
+                 limites_dinamicos: bool = False, # Derivar tau_max/tau_min del mejor coste y de rho
+                 p_best: float = 0.05,
+                 inicializacion_voraz: bool = False,
+                 clases_recursos: bool = False,
+                 plantillas_estudio: bool = False,
+                 comprobacion_anticipada: bool = False,
+                 max_retrocesos: int = 0,
+                 margen_poda: Optional[float] = None,
+                 vectorizado: bool = False):
 
         # Inicialización de atributos igual que en ACO principal
         super().__init__(
@@ -33,7 +45,17 @@ class MinMaxACO(ACO):
             alpha=alpha,
             beta=beta,
             rho=rho,
-            Q=Q
+            Q=Q,
+            seed=seed,
+            criterios_parada=criterios_parada,
+            adaptativo=adaptativo,
+            inicializacion_voraz=inicializacion_voraz,
+            clases_recursos=clases_recursos,
+            plantillas_estudio=plantillas_estudio,
+            comprobacion_anticipada=comprobacion_anticipada,
+            max_retrocesos=max_retrocesos,
+            margen_poda=margen_poda,
+            vectorizado=vectorizado
         )
         self.graph: MinMaxGraph
 
@@ -46,107 +68,148 @@ class MinMaxACO(ACO):
                 self.fase_a_roles_compatibles[fase].append(rol)
         self.consultas = config_data["consultas"]
 
-    def run(self):
+        # Reinicio de feromonas por estancamiento: iteraciones_sin_mejora y/o factor_ramificacion
+        self.reinicio_estancamiento = reinicio_estancamiento or {}
+        self.limites_dinamicos = limites_dinamicos
+        self.p_best = p_best
+        self.reinicios = 0
+        self._iteraciones_desde_mejora = 0
+
+    def _iniciar_ejecucion(self):
         """
-        Ejecuta el algoritmo Min-Max Ant System.
+        Reinicia el estado de la búsqueda antes de ejecutar el algoritmo Min-Max Ant System.
         """
-        start_time = time.time()
         self.total_costs = []
         self.best_cost = float('inf')
         self.best_solution = None
+        self.reinicios = 0
+        self._iteraciones_desde_mejora = 0
+        super()._iniciar_ejecucion()
+        if self.limites_dinamicos:
+            self._actualizar_limites_dinamicos() # Límites derivados de la solución voraz, si la hay
 
-        for iteration in range(self.iterations):
-            # Crear las hormigas para esta iteración
-            ants = [Ant(self.graph, self.paciente_to_estudio, self.pacientes, 
-                        self.duracion_consultas, self.num_dias_planificacion, 
-                        self.alpha, self.beta, self.max_fases_por_dia_paciente) for _ in range(self.n_ants)]
-            
-            iteration_best_cost = float('inf')
-            iteration_best_solution_path = None 
-            iteration_best_ant_object = None 
-
-            # Calcular el máximo de pasos permitidos para evitar bucles infinitos
-            max_steps = sum(len(self.paciente_to_estudio[p]["orden_fases"]) for p in self.pacientes) * 2 # Usar orden_fases
-            if max_steps == 0: max_steps = 20 * self.num_dias_planificacion
-
-            for ant in ants:
-                # Reiniciar el estado interno de la hormiga
-                ant.visited = []
-                ant.pacientes_progreso.clear()
-                ant.paciente_dia_fase_contador.clear()
-                ant.current_node = None
-                ant.valid_solution = False
-
-                steps = 0
-                # Construcción de la solución por la hormiga
-                while steps < max_steps and not ant.valid_solution:
-                    next_node = ant.choose_next_node()
-                    if next_node is None:
-                        break
-                    ant.move(next_node)
-                    steps += 1
-                
-                # Si la hormiga encuentra una solución válida, calcular su coste
-                if ant.valid_solution:
-                    cost = self.calcular_coste(ant.visited)
-                    ant.total_cost = cost
-                    
-                    # Actualizar la mejor solución de la iteración si corresponde
-                    if cost < iteration_best_cost:
-                        iteration_best_cost = cost
-                        iteration_best_solution_path = ant.visited.copy()
-                        iteration_best_ant_object = ant
-
-            ant_to_update_pheromone_with = None
-
-            if iteration_best_solution_path is not None:
-                # Aplicar búsqueda local a la mejor solución de la iteración
-                ls_solution = self.local_search(iteration_best_solution_path)
-                ls_cost = self.calcular_coste(ls_solution)
-
-                # Si la búsqueda local mejora la solución, actualizar
-                if ls_cost < iteration_best_cost:
-                    iteration_best_cost = ls_cost
-                    iteration_best_solution_path = ls_solution 
-
-                    temp_ls_ant = Ant(self.graph, self.paciente_to_estudio, self.pacientes,
-                                        self.duracion_consultas, self.num_dias_planificacion,
-                                        self.alpha, self.beta, self.max_fases_por_dia_paciente)
-                    temp_ls_ant.visited = ls_solution
-                    temp_ls_ant.total_cost = ls_cost
-                    temp_ls_ant.valid_solution = True 
-                    iteration_best_ant_object = temp_ls_ant 
-                
-                # Actualizar la mejor solución global si corresponde
-                if iteration_best_cost < self.best_cost:
-                    self.best_cost = iteration_best_cost
-                    self.best_solution = iteration_best_solution_path.copy()
+    def _actualizar_limites_dinamicos(self):
+        """
+        Calcula los límites de feromona a partir del mejor coste (tau_max = Q / (rho * C*), ya que
+        cada depósito es Q / coste) y de p_best para tau_min, según el esquema clásico de MMAS.
+        """
+        if not self.best_solution or self.best_cost <= 0 or self.best_cost == float('inf'):
+            return
+        tau_max = self.Q / (self.rho * self.best_cost)
+        n = len(self.best_solution)
+        # Número medio de opciones por decisión a lo largo de la mejor solución
+        opciones = [len(self.graph.edges.get(node, [])) for node in self._contraer_solucion(self.best_solution)]
+        media_opciones = max(2.0, sum(opciones) / len(opciones) / 2) if opciones else 2.0
+        raiz_p_best = self.p_best ** (1.0 / n)
+        tau_min = tau_max * (1 - raiz_p_best) / ((media_opciones - 1) * raiz_p_best)
+        self.graph.actualizar_limites(tau_max, min(tau_min, tau_max))
+
+    def _comprobar_reinicio(self, mejora: bool):
+        """
+        Reinicia las feromonas a pheromone_max (conservando la mejor solución global) si la búsqueda
+        lleva demasiadas iteraciones sin mejorar o el factor de ramificación indica convergencia.
+        """
+        if not self.reinicio_estancamiento:
+            return
+        self._iteraciones_desde_mejora = 0 if mejora else self._iteraciones_desde_mejora + 1
+
+        max_sin_mejora = self.reinicio_estancamiento.get("iteraciones_sin_mejora")
+        factor_min = self.reinicio_estancamiento.get("factor_ramificacion")
+        estancada = max_sin_mejora is not None and self._iteraciones_desde_mejora >= max_sin_mejora
+        if not estancada and factor_min is not None and self.best_solution:
+            lambda_ = self.reinicio_estancamiento.get("lambda_ramificacion", 0.05)
+            estancada = self.graph.branching_factor(self._contraer_solucion(self.best_solution), lambda_) <= factor_min
+        if estancada:
+            self.graph.reinicializar_feromonas()
+            self.reinicios += 1
+            self._iteraciones_desde_mejora = 0
+            print(f"Reinicio de feromonas por estancamiento ({self.reinicios}) - Mejor Costo Global (MinMax): {self.best_cost:.2f}")
+
+    def _ejecutar_iteracion(self, iteration: int):
+        """
+        Ejecuta una iteración del algoritmo Min-Max Ant System.
+        """
+        mejor_coste_inicial = self.best_cost
+        # Crear las hormigas para esta iteración
+        ants = [self._crear_hormiga(derivar_rng(self.seed, iteration, ant_idx)) for ant_idx in range(self.n_ants)]
+        
+        iteration_best_cost = float('inf')
+        iteration_best_solution_path = None 
+        iteration_best_ant_object = None 
+
+        # Calcular el máximo de pasos permitidos para evitar bucles infinitos
+        max_steps = sum(len(self.paciente_to_estudio[p]["orden_fases"]) for p in self.pacientes) * 2 # Usar orden_fases
+        if max_steps == 0: max_steps = 20 * self.num_dias_planificacion
+
+        # Construcción de las soluciones de las hormigas
+        self._construir_soluciones(ants, iteration, max_steps)
+        for ant in ants:
+            # Si la hormiga encuentra una solución válida, calcular su coste
+            if ant.valid_solution:
+                solucion = self._expandir_solucion(ant.solucion())
+                # Sólo interesa si mejora la mejor de la iteración: el coste es exacto en ese caso
+                cost = self.calcular_coste(solucion, cutoff=iteration_best_cost)
+                ant.total_cost = cost if cost < iteration_best_cost else float('inf') # Sólo el coste exacto; inf si se cortó
                 
-                # La hormiga que se usará para actualizar las feromonas será la mejor de la iteración
-                ant_to_update_pheromone_with = iteration_best_ant_object
-
-            # Se prepara la mejor hormiga de la iteración para actualizar las feromonas
-            ants_for_update_list = []
-            if ant_to_update_pheromone_with:
-                ants_for_update_list.append(ant_to_update_pheromone_with)
+                # Actualizar la mejor solución de la iteración si corresponde
+                if cost < iteration_best_cost:
+                    iteration_best_cost = cost
+                    iteration_best_solution_path = solucion
+                    iteration_best_ant_object = ant
+
+        ant_to_update_pheromone_with = None
+        mejora_global = False
+
+        if iteration_best_solution_path is not None:
+            # Aplicar búsqueda local a la mejor solución de la iteración
+            ls_solution = self.local_search(iteration_best_solution_path,
+                                            rng=derivar_rng(self.seed, iteration, "busqueda_local", 0))
+            ls_cost = self.calcular_coste(ls_solution, cutoff=iteration_best_cost)
+
+            # Si la búsqueda local mejora la solución, actualizar
+            if ls_cost < iteration_best_cost:
+                iteration_best_cost = ls_cost
+                iteration_best_solution_path = ls_solution
+
+                temp_ls_ant = self._crear_hormiga()
+                temp_ls_ant.visited = self._contraer_solucion(iteration_best_solution_path)
+                temp_ls_ant.total_cost = ls_cost
+                temp_ls_ant.valid_solution = True 
+                iteration_best_ant_object = temp_ls_ant 
+            
+            # Actualizar la mejor solución global si corresponde
+            if iteration_best_cost < self.best_cost:
+                self.best_cost = iteration_best_cost
+                self.best_solution = list(iteration_best_solution_path)
+                mejora_global = True
+                if self.limites_dinamicos:
+                    self._actualizar_limites_dinamicos()
             
-            # Actualizar feromonas en el grafo
-            self.graph.update_pheromone(ants=ants_for_update_list, rho=self.rho, Q=self.Q)
-
-            # Registrar el coste para la gráfica de convergencia
-            cost_to_log = self.best_cost if self.best_cost != float('inf') else \
-                          (iteration_best_cost if iteration_best_cost != float('inf') else \
-                          (self.total_costs[-1] if self.total_costs and self.total_costs[-1] != float('inf') else float('inf')))
-            self.total_costs.append(cost_to_log)
-
-            # Mostrar progreso cada 10 iteraciones
-            if iteration % 10 == 0:
-                current_best_display = f"{self.best_cost:.2f}" if self.best_cost != float('inf') else "N/A"
-                print(f"Iteración {iteration}/{self.iterations} - Mejor Costo Global (MinMax): {current_best_display}")
-
-        end_time = time.time()
-        self.execution_time = end_time - start_time
-        return self.best_solution, self.best_cost
+            # La hormiga que se usará para actualizar las feromonas será la mejor de la iteración
+            ant_to_update_pheromone_with = iteration_best_ant_object
+
+        # Se prepara la mejor hormiga de la iteración para actualizar las feromonas
+        ants_for_update_list = []
+        if ant_to_update_pheromone_with:
+            ants_for_update_list.append(ant_to_update_pheromone_with)
+        
+        # Actualizar feromonas en el grafo
+        self.graph.update_pheromone(ants=ants_for_update_list, rho=self.rho, Q=self.Q)
+        self._comprobar_reinicio(mejora_global)
+        self.iteration_best_solution = iteration_best_solution_path
+        self.iteration_best_cost = iteration_best_cost
+        self._registrar_estadisticas(iteration, ants, mejor_coste_inicial)
+
+        # Registrar el coste para la gráfica de convergencia
+        cost_to_log = self.best_cost if self.best_cost != float('inf') else \
+                      (iteration_best_cost if iteration_best_cost != float('inf') else \
+                      (self.total_costs[-1] if self.total_costs and self.total_costs[-1] != float('inf') else float('inf')))
+        self.total_costs.append(cost_to_log)
+
+        # Mostrar progreso cada 10 iteraciones
+        if iteration % 10 == 0:
+            current_best_display = f"{self.best_cost:.2f}" if self.best_cost != float('inf') else "N/A"
+            print(f"Iteración {iteration}/{self.iterations} - Mejor Costo Global (MinMax): {current_best_display}{self._texto_validas()}")
 
     def plot_convergence(self, output_dir: str = "/plots"):
         """
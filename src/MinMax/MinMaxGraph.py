@@ -3,17 +3,22 @@ from utils.Ant import Ant
 from typing import List, Dict, Tuple, Optional
 
 class MinMaxGraph(Graph):
+    # Los límites cambian durante la ejecución con limites_dinamicos
+    ATRIBUTOS_ESTADO = Graph.ATRIBUTOS_ESTADO + ("pheromone_max", "pheromone_min")
+
     def __init__(self,
                  nodes: List[Tuple],
                  edges: Dict[Tuple, List[Tuple]],
                  pheromone_max: float = 10.0,  
                  pheromone_min: float = 0.1,   
-                 initial_pheromone: Optional[float] = None):
+                 initial_pheromone: Optional[float] = None,
+                 heuristica_estatica: Optional[Dict[Tuple[Tuple, Tuple], float]] = None):
         
         # Asegurar que initial_pheromone no sea None y respete los límites
         effective_initial_pheromone = initial_pheromone if initial_pheromone is not None else pheromone_max
 
-        super().__init__(nodes, edges, initial_pheromone=effective_initial_pheromone)
+        super().__init__(nodes, edges, initial_pheromone=effective_initial_pheromone,
+                         heuristica_estatica=heuristica_estatica)
 
         self.pheromone_max = pheromone_max
         self.pheromone_min = pheromone_min
@@ -46,3 +51,35 @@ class MinMaxGraph(Graph):
         for edge_key in self.pheromone:
             current_val = self.pheromone[edge_key]
             self.pheromone[edge_key] = min(max(current_val, self.pheromone_min), self.pheromone_max)
+
+    def deposit_pheromone(self, path: List[Tuple], delta: float):
+        """
+        Deposita feromona sobre el camino dado respetando el límite superior de Min-Max.
+        """
+        super().deposit_pheromone(path, delta)
+        for i in range(len(path) - 1):
+            edge = (path[i], path[i+1])
+            self.pheromone[edge] = min(max(self.pheromone[edge], self.pheromone_min), self.pheromone_max)
+
+    def importar_feromonas(self, datos: Dict) -> Tuple[int, int]:
+        """ Carga una instantánea de feromonas ajustándola a los límites Min-Max actuales """
+        resultado = super().importar_feromonas(datos)
+        self.actualizar_limites(self.pheromone_max, self.pheromone_min)
+        return resultado
+
+    def actualizar_limites(self, pheromone_max: float, pheromone_min: float):
+        """
+        Sustituye los límites Min-Max (p. ej. derivados del mejor coste) y los aplica a las feromonas actuales.
+        """
+        self.pheromone_max = pheromone_max
+        self.pheromone_min = pheromone_min
+        self.current_base_pheromone = min(max(self.current_base_pheromone, self.pheromone_min), self.pheromone_max)
+        for edge_key in self.pheromone:
+            self.pheromone[edge_key] = min(max(self.pheromone[edge_key], self.pheromone_min), self.pheromone_max)
+
+    def reinicializar_feromonas(self):
+        """
+        Reinicio clásico de MMAS: todas las aristas vuelven al valor máximo de feromona.
+        """
+        self.pheromone.clear()
+        self.current_base_pheromone = self.pheromone_max
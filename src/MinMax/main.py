@@ -1,13 +1,21 @@
 from MinMax.MinMaxAco import MinMaxACO
-from MinMax.MinMaxGraph import MinMaxGraph 
-from utils.generate_graph_components import generar_nodos, generar_aristas, construir_mapeo_paciente_info
+from utils.generate_graph_components import construir_mapeo_paciente_info
 from utils.plot_gantt_solution import plot_gantt_chart
-import random
+from utils.scenario import (generar_horas_disponibles, transformar_nombres_pacientes, generar_instancias_personal,
+                            preparar_escenario, crear_colonia)
+from utils.adaptive import guardar_registro_adaptativo
+from utils.multiresolution import nodos_multiresolucion
+from utils.decomposition import ejecutar_descomposicion, imprimir_resumen_descomposicion
+from utils.bounds import comprobar_viabilidad
+from utils.islands import ejecutar_islas, imprimir_resumen_islas, plot_convergencia_islas
+from utils.solution import guardar_solucion
+from utils.warm_start import cargar_arranque_en_caliente, guardar_feromonas
+from utils.result_cache import clave_resultado, motivo_sin_cache, cargar_resultado, guardar_resultado, restaurar_resultado
+from utils.rng import SEMILLA_POR_DEFECTO
 import json
 import os
 from collections import defaultdict
-from datetime import datetime, timedelta, time # time es necesario para datetime.strptime(...).time()
-from typing import List
+from datetime import datetime, time # time es necesario para datetime.strptime(...).time()
 
 def get_configuration(config_path='/app/src/MinMax/config.json'):
     try:
@@ -76,73 +84,59 @@ def get_aco_params(params_path='aco_params.json'):
     Carga los parámetros del algoritmo ACO desde un archivo JSON y verifica que las claves sean correctas.
     """
     expected_keys = {"n_ants", "iterations", "alpha", "beta", "rho", "Q","pheromone_max", "pheromone_min"}
+    optional_keys = {"seed", "islas", "criterios_parada", "adaptativo", "inicializacion_voraz", "clases_recursos", "plantillas_estudio", "comprobacion_anticipada", "max_retrocesos", "margen_poda", "vectorizado", "multiresolucion", "descomposicion", "checkpoint", "reinicio_estancamiento", "limites_dinamicos", "p_best"}
     try:
         with open(params_path, 'r') as file:
             params = json.load(file)
-        # Se verifican las claves
+        # Se verifican las claves (las opcionales pueden omitirse)
         params_keys = set(params.keys())
-        if params_keys != expected_keys:
+        if not expected_keys <= params_keys or not params_keys <= expected_keys | optional_keys:
             raise Exception(f"Advertencia: Las claves del archivo de parámetros no son correctas.\n"
                   f"Esperadas: {sorted(expected_keys)}\n"
+                  f"Opcionales: {sorted(optional_keys)}\n"
                   f"Encontradas: {sorted(params_keys)}\n")
+        params.setdefault("seed", SEMILLA_POR_DEFECTO) # Semilla por defecto para reproducibilidad de los resultados
         return params
     except Exception as e:
         raise Exception(f"Error cargando parámetros de ACO: {e}")
 
-def generar_horas_disponibles(hora_inicio_str: str, hora_fin_str: str, intervalo_minutos: int) -> List[str]:
-    """Genera una lista de strings de tiempo ("HH:MM") para un día tipo."""
-    horas = []
-    try:
-        start_time_obj = datetime.strptime(hora_inicio_str, "%H:%M").time()
-        end_time_obj = datetime.strptime(hora_fin_str, "%H:%M").time()
-    except ValueError:
-        print("Error: Formato de hora_inicio o hora_fin inválido en generar_horas_disponibles. Use HH:MM.")
-        return []
-
-    if intervalo_minutos <= 0:
-        print("Error: intervalo_consultas_minutos debe ser positivo en generar_horas_disponibles.")
-        return []
-
-    current_dt = datetime.combine(datetime.today(), start_time_obj)
-    end_datetime_limit = datetime.combine(datetime.today(), end_time_obj)
-
-    while current_dt < end_datetime_limit:
-        horas.append(current_dt.strftime("%H:%M"))
-        current_dt += timedelta(minutes=intervalo_minutos)
-    return horas
-
 if __name__ == "__main__":
     # Especificar la ruta al config.json de MinMax
     config_file_path = os.environ.get('ACO_CONFIG_PATH', 'src/MinMax/config.json')
     aco_params_path = os.environ.get('ACO_PARAMS_PATH', 'src/MinMax/params_config.json')
     plot_dir_path = os.environ.get('PLOT_DIR_PATH', 'plots/')
+    # Arranque en caliente opcional desde la solución y las feromonas de una ejecución anterior
+    solucion_previa_path = os.environ.get('ACO_SOLUCION_PREVIA')
+    feromonas_previas_path = os.environ.get('ACO_FEROMONAS_PREVIAS')
+    # Reanudar desde el último checkpoint de la carpeta de gráficos (ACO_REANUDAR=1)
+    reanudar = os.environ.get('ACO_REANUDAR', '').lower() in ("1", "true", "si", "sí")
+    # Caché de resultados por escenario, parámetros, semilla y versión del código (ACO_FORCE_RECOMPUTE=1 la ignora)
+    cache_dir_path = os.environ.get('ACO_CACHE_DIR', os.path.join(plot_dir_path, 'cache'))
+    forzar_recalculo = os.environ.get('ACO_FORCE_RECOMPUTE', '').lower() in ("1", "true", "si", "sí")
     gantt_filename = os.environ.get('GANTT_FILENAME', 'schedule_standard_MinMax.png')
     gantt_filepath = os.path.join(plot_dir_path, gantt_filename)
     config_data = get_configuration(config_file_path)
     aco_params = get_aco_params(aco_params_path)
-    random.seed(777) # Para reproducibilidad de los resultados
-
     if config_data is None:
         print("No se pudo cargar la configuración para MinMax.")
         exit(1)
+    # Comprobación rápida de capacidad antes de construir el grafo
+    if not comprobar_viabilidad(config_data):
+        exit(1)
+    # La clave se calcula con los nombres de paciente tal y como están en el archivo
+    clave_cache = None
+    motivo = motivo_sin_cache(aco_params, arranque_en_caliente=bool(solucion_previa_path or feromonas_previas_path), reanudar=reanudar)
+    if motivo:
+        print(f"Caché de resultados desactivada: {motivo}.")
+    else:
+        clave_cache = clave_resultado("minmax", config_data, aco_params)
+    resultado_cache = cargar_resultado(cache_dir_path, clave_cache) if clave_cache and not forzar_recalculo else None
 
     # Definir nombre paciente 
-    for i in range(len(config_data['tipos_estudio'])):
-        estudio_config = config_data['tipos_estudio'][i]
-        nombre_estudio = estudio_config.get("nombre_estudio", f"EstudioDesconocido_{i}")
-        
-        # Transformar nombres de pacientes
-        if "pacientes" in estudio_config and isinstance(estudio_config["pacientes"], list):
-            transformed_pacientes_list = []
-            for p_generic in estudio_config["pacientes"]:
-                transformed_name = f"{nombre_estudio}_{p_generic}"
-                transformed_pacientes_list.append(transformed_name)
-            
-            config_data['tipos_estudio'][i]["pacientes"] = transformed_pacientes_list
+    transformar_nombres_pacientes(config_data)
 
     map_paciente_info = construir_mapeo_paciente_info(config_data['tipos_estudio'])
     num_dias_planificacion = config_data['num_dias_planificacion'] # Cargar desde el config
-    max_fases_por_dia_paciente = config_data.get('max_fases_por_dia_paciente', 2)
 
     horas_disponibles_un_dia = generar_horas_disponibles(
         config_data['hora_inicio'],
@@ -158,48 +152,69 @@ if __name__ == "__main__":
     print(f"Número de días para planificación: {num_dias_planificacion}")
 
     # Generar instancias de personal
-    lista_personal_instancias = []
-    for rol, cantidad in config_data["personal"].items():
-        for i in range(1, cantidad + 1):
-            lista_personal_instancias.append(f"{rol}_{i}")
+    lista_personal_instancias = generar_instancias_personal(config_data)
     print(f"Instancias de personal generadas: {lista_personal_instancias}")
 
-    # Generar componentes del grafo
-    nodos = generar_nodos(config_data, horas_disponibles_un_dia, num_dias_planificacion,lista_personal_instancias,max_fases_por_dia_paciente)
-    if not nodos:
-        print("Error generando nodos. Verifique la configuración y las funciones de generación.")
-        exit(1)
-        
-    aristas = generar_aristas(nodos, map_paciente_info,
-                        duracion_consulta_minutos=config_data['intervalo_consultas_minutos'],
-                        horas_disponibles_str_list=horas_disponibles_un_dia)
-    
-    # Usar MinMaxGraph
-    min_max_graph = MinMaxGraph(
-        nodes=nodos,
-        edges=aristas,
-        pheromone_max=aco_params["pheromone_max"],  # Valor máximo de feromonas (tau_max)
-        pheromone_min=aco_params["pheromone_min"],   # Valor mínimo de feromonas (tau_min)
-    )
-    
-    # Configurar y ejecutar ACO
-    aco_minmax = MinMaxACO(
-        graph=min_max_graph,
-        config_data=config_data,
-        horas_disponibles=horas_disponibles_un_dia,
-        num_dias_planificacion=num_dias_planificacion,
-        lista_personal_instancias=lista_personal_instancias,
-        n_ants=aco_params["n_ants"],
-        iterations=aco_params["iterations"],
-        alpha=aco_params["alpha"],
-        beta=aco_params["beta"],
-        rho=aco_params["rho"],
-        Q=aco_params["Q"]
-    )
+    descomposicion = aco_params.get("descomposicion")
+    if resultado_cache is not None:
+        # Resultado ya calculado para este escenario, parámetros, semilla y código: no se ejecuta la colonia
+        aco_minmax = MinMaxACO(graph=None, config_data=config_data, horas_disponibles=horas_disponibles_un_dia,
+                               num_dias_planificacion=num_dias_planificacion, lista_personal_instancias=lista_personal_instancias,
+                               seed=aco_params["seed"])
+        restaurar_resultado(aco_minmax, resultado_cache)
+        print(f"Resultado recuperado de la caché ({clave_cache[:12]}); ACO_FORCE_RECOMPUTE=1 para recalcularlo.")
+        best_solution, best_cost = aco_minmax.best_solution, aco_minmax.best_cost
+    elif descomposicion and descomposicion.get("activo", True):
+        # Descomposición en subproblemas resueltos en paralelo: no se construye el grafo completo
+        aco_minmax = ejecutar_descomposicion("minmax", config_data, aco_params, horas_disponibles_un_dia, lista_personal_instancias)
+        imprimir_resumen_descomposicion(aco_minmax)
+        best_solution, best_cost = aco_minmax.best_solution, aco_minmax.best_cost
+    else:
+        # Resolución de grueso a fino: los nodos se restringen a los bloques de la solución gruesa
+        restriccion_nodos = None
+        multiresolucion = aco_params.get("multiresolucion")
+        if multiresolucion and multiresolucion.get("activo", True):
+            restriccion_nodos = lambda nodos, pacientes_por_plantilla: nodos_multiresolucion(
+                "minmax", config_data, aco_params, nodos, pacientes_por_plantilla)
+        # Grafo por clases de recursos (consulta genérica y una instancia de personal por rol) y/o
+        # con un único paciente plantilla por estudio
+        escenario = preparar_escenario(config_data, clases_recursos=aco_params.get("clases_recursos", False),
+                                       plantillas_estudio=aco_params.get("plantillas_estudio", False),
+                                       transformar_nombres=False, restriccion_nodos=restriccion_nodos)
+        if escenario is None:
+            print("Error generando nodos. Verifique la configuración y las funciones de generación.")
+            exit(1)
+        if escenario["capacidad_recursos"] is not None:
+            print(f"Grafo por clases de recursos: {escenario['personal_grafo']} (capacidades: {escenario['capacidad_recursos']})")
+        if escenario["pacientes_por_plantilla"] is not None:
+            print(f"Grafo por plantillas de estudio: {list(escenario['pacientes_por_plantilla'].keys())}")
+
+        # Configurar MinMaxACO
+        aco_minmax = crear_colonia("minmax", escenario, aco_params)
+        if solucion_previa_path or feromonas_previas_path:
+            aco_minmax.preparar_arranque_en_caliente(*cargar_arranque_en_caliente(solucion_previa_path, feromonas_previas_path))
     
-    print("Ejecutando MinMaxACO...")
-    best_solution, best_cost = aco_minmax.run()
+        islas_config = aco_params.get("islas")
+        if islas_config and islas_config.get("num_islas", 1) > 1:
+            print(f"Ejecutando MinMaxACO en modo islas ({islas_config['num_islas']} colonias)...")
+            resultados_islas = ejecutar_islas(aco_minmax, islas_config)
+            imprimir_resumen_islas(resultados_islas)
+            plot_convergencia_islas(resultados_islas, plot_dir_path, filename="convergencia_islas_MinMax.png")
+            best_solution, best_cost = aco_minmax.best_solution, aco_minmax.best_cost
+        else:
+            checkpoint_config = aco_params.get("checkpoint") or {}
+            if reanudar or checkpoint_config.get("cada_iteraciones") or checkpoint_config.get("cada_segundos") is not None:
+                aco_minmax.configurar_checkpoint(os.path.join(plot_dir_path, "checkpoint_minmax.pkl"),
+                                         cada_iteraciones=checkpoint_config.get("cada_iteraciones"),
+                                         cada_segundos=checkpoint_config.get("cada_segundos"),
+                                         reanudar=reanudar)
+            print("Ejecutando MinMaxACO...")
+            best_solution, best_cost = aco_minmax.run()
+            guardar_feromonas(os.path.join(plot_dir_path, "feromonas_minmax.json"), aco_minmax.graph)
     aco_minmax.plot_convergence(output_dir=plot_dir_path) # Llama al método de convergencia de MinMaxACO
+    guardar_registro_adaptativo(aco_minmax.registro_adaptativo, plot_dir_path, filename="ajustes_adaptativos_MinMax.json")
+    if clave_cache is not None and resultado_cache is None and best_solution:
+        guardar_resultado(cache_dir_path, clave_cache, aco_minmax)
 
     if best_solution:
         asignaciones_por_paciente = defaultdict(list)
@@ -238,10 +253,12 @@ if __name__ == "__main__":
                         f.write(f"  Día {dia_idx+1}, Fase {orden}. {fase} - {hora_str} ({duracion}min) - {consulta} - {personal_asignado}\n")
                 else:
                     f.write(f"  Información de estudio no encontrada para {paciente_id}\n")
+        # Solución en JSON, reutilizable para replanificar
+        guardar_solucion(os.path.join(plot_dir_path, "solucion_minmax.json"), best_solution, best_cost, variante="minmax")
         
         print(f"\nCosto total de la mejor solución (MinMaxACO): {best_cost:.2f}")
         if aco_minmax.execution_time is not None:
-            print(f"Tiempo de ejecución (MinMaxACO): {aco_minmax.execution_time:.2f}s")
+            print(f"Tiempo de ejecución (MinMaxACO): {aco_minmax.execution_time:.2f}s (motivo de parada: {aco_minmax.motivo_parada})")
 
         # Gráfico de Gantt combinado para todos los pacientes
         if plot_gantt_chart:
@@ -273,4 +290,4 @@ if __name__ == "__main__":
     else:
         print("\nNo se encontró ninguna solución válida con MinMaxACO.")
         if aco_minmax.execution_time is not None:
-            print(f"Tiempo de ejecución (MinMaxACO): {aco_minmax.execution_time:.2f}s")
\ No newline at end of file
+            print(f"Tiempo de ejecución (MinMaxACO): {aco_minmax.execution_time:.2f}s (motivo de parada: {aco_minmax.motivo_parada})")
\ No newline at end of file
@@ -0,0 +1,278 @@
+import argparse
+import copy
+import os
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple, Any, Optional, Set
+
+from utils.bounds import comprobar_viabilidad
+from utils.resource_classes import CONSULTA_GENERICA, clase_personal, componentes_grafo_clases, expandir_solucion
+from utils.scenario import (VARIANTES, crear_colonia, generar_horas_disponibles, generar_instancias_personal,
+                            preparar_escenario, transformar_nombres_pacientes)
+from utils.solution import cargar_solucion, guardar_solucion
+
+MODOS_REPLANIFICACION = ("congelar", "suave")
+
+
+class ReplanificacionMixin:
+    """
+    Mixin para las colonias (ACO o MinMaxACO) de una replanificación: la colonia construye sólo las
+    citas de los pacientes del delta, pero cada solución se evalúa junto a las asignaciones fijas
+    del plan anterior, y cada cita de un paciente existente que cambia de día u hora respecto al
+    plan anterior se penaliza con 'penalizacion_cambio'.
+    """
+    def configurar_replanificacion(self, asignaciones_fijas: List[Tuple], plan_anterior: Dict[Tuple[str, str], Tuple],
+                                   penalizacion_cambio: float, paciente_to_estudio_fijos: Dict[str, Dict[str, Any]]):
+        self.asignaciones_fijas = list(asignaciones_fijas)
+        self.plan_anterior = plan_anterior
+        self.penalizacion_cambio = penalizacion_cambio
+        # Las hormigas sólo recorren self.pacientes, así que añadir los pacientes fijos al mapeo
+        # sólo afecta a la evaluación de las soluciones completas
+        for paciente, info in paciente_to_estudio_fijos.items():
+            self.paciente_to_estudio.setdefault(paciente, info)
+
+    def contar_cambios(self, asignaciones) -> int:
+        """ Citas de pacientes del plan anterior con distinto día u hora (el personal y la consulta pueden cambiar) """
+        cambios = 0
+        for paciente, _, dia_idx, hora_str, _, fase in asignaciones:
+            anterior = self.plan_anterior.get((paciente, fase))
+            if anterior is not None and (anterior[2], anterior[3]) != (dia_idx, hora_str):
+                cambios += 1
+        return cambios
+
+    def calcular_coste(self, asignaciones, cutoff: float = float('inf')) -> float:
+        if not asignaciones:
+            return float('inf')
+        cambios = self.penalizacion_cambio * self.contar_cambios(asignaciones)
+        if cambios > cutoff:
+            return cambios
+        return super().calcular_coste(self.asignaciones_fijas + list(asignaciones), cutoff - cambios) + cambios
+
+    def _expandir_solucion(self, solution: List[Tuple]) -> List[Tuple]:
+        # El personal y las consultas de las asignaciones fijas ya están ocupados en sus huecos
+        if not self.clases_recursos or not self.asignaciones_fijas:
+            return super()._expandir_solucion(solution)
+        expandida = expandir_solucion(self.asignaciones_fijas + list(solution), self.lista_personal_instancias, self.consultas)
+        return expandida[len(self.asignaciones_fijas):]
+
+
+def paciente_a_estudio(config_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """ Información de estudio de cada paciente, con la misma forma que ACO.paciente_to_estudio """
+    return {paciente: {"nombre_estudio": estudio["nombre_estudio"], "fases": estudio["fases"],
+                       "orden_fases": estudio["orden_fases"]}
+            for estudio in config_data["tipos_estudio"] for paciente in estudio["pacientes"]}
+
+
+def analizar_plan(plan: List[Tuple], config_data: Dict[str, Any], horas_disponibles: List[str],
+                  lista_personal_instancias: List[str]) -> Tuple[Dict[str, List[Tuple]], Set[str], Dict[str, str]]:
+    """
+    Clasifica los pacientes de un plan anterior frente a la configuración actual (con los nombres ya
+    transformados). Devuelve las asignaciones de los pacientes que se conservan (todas sus fases
+    programadas en días, horas, personal y consultas que siguen existiendo), los pacientes nuevos
+    (sin plan completo y válido) y los pacientes del plan descartados con su motivo.
+    """
+    map_paciente_info = paciente_a_estudio(config_data)
+    personal_valido, consultas_validas = set(lista_personal_instancias), set(config_data["consultas"])
+    horas_validas = set(horas_disponibles)
+    asignaciones_plan = defaultdict(list)
+    for asignacion in plan:
+        asignaciones_plan[asignacion[0]].append(asignacion)
+
+    existentes, descartados = {}, {}
+    for paciente, asignaciones in asignaciones_plan.items():
+        info = map_paciente_info.get(paciente)
+        if info is None:
+            descartados[paciente] = "ya no está en la configuración"
+        elif sorted(a[5] for a in asignaciones) != sorted(info["fases"]):
+            descartados[paciente] = "plan incompleto, se programa de nuevo"
+        elif any(a[4] not in personal_valido or a[1] not in consultas_validas or a[3] not in horas_validas
+                 or not 0 <= a[2] < config_data["num_dias_planificacion"] for a in asignaciones):
+            descartados[paciente] = "recursos u horario que ya no existen, se programa de nuevo"
+        else:
+            existentes[paciente] = asignaciones
+    nuevos = set(map_paciente_info) - set(existentes)
+    return existentes, nuevos, descartados
+
+
+def configuracion_delta(config_data: Dict[str, Any], pacientes_delta: Set[str]) -> Dict[str, Any]:
+    """ Configuración con sólo los pacientes a programar (se omiten los estudios sin ninguno) """
+    config_delta = copy.deepcopy(config_data)
+    tipos_estudio = []
+    for estudio in config_delta["tipos_estudio"]:
+        estudio["pacientes"] = [p for p in estudio["pacientes"] if p in pacientes_delta]
+        if estudio["pacientes"]:
+            tipos_estudio.append(estudio)
+    config_delta["tipos_estudio"] = tipos_estudio
+    return config_delta
+
+
+def filtro_huecos_libres(asignaciones_fijas: List[Tuple], config_data: Dict[str, Any],
+                         lista_personal_instancias: List[str], clases_recursos: bool = False):
+    """
+    Filtro de nodos que descarta los huecos (día, hora) cuyo personal o consulta ya ocupa una
+    asignación fija. Con clases de recursos, una clase queda ocupada cuando las asignaciones
+    fijas agotan su capacidad en el hueco.
+    """
+    ocupacion = defaultdict(int) # (recurso, dia, hora) -> asignaciones fijas
+    for _, consulta, dia_idx, hora_str, personal, _ in asignaciones_fijas:
+        if clases_recursos:
+            personal, consulta = clase_personal(personal), CONSULTA_GENERICA
+        ocupacion[(personal, dia_idx, hora_str)] += 1
+        ocupacion[(consulta, dia_idx, hora_str)] += 1
+    capacidad = componentes_grafo_clases(config_data, lista_personal_instancias)[2] if clases_recursos else {}
+
+    def filtro(nodo: Tuple) -> bool:
+        _, consulta, dia_idx, hora_str, personal, _ = nodo
+        return (ocupacion.get((personal, dia_idx, hora_str), 0) < capacidad.get(personal, 1) and
+                ocupacion.get((consulta, dia_idx, hora_str), 0) < capacidad.get(consulta, 1))
+    return filtro
+
+
+def filtro_huecos_anteriores(existentes: Dict[str, List[Tuple]], horas_disponibles: List[str], radio_huecos: int = 0):
+    """
+    Filtro de nodos que limita cada fase de un paciente existente al día y la hora de su plan
+    anterior (± radio_huecos huecos en el mismo día)
+    """
+    indice_hora = {hora: i for i, hora in enumerate(horas_disponibles)}
+    huecos_permitidos = {}
+    for paciente, asignaciones in existentes.items():
+        for _, _, dia_idx, hora_str, _, fase in asignaciones:
+            i = indice_hora[hora_str]
+            huecos_permitidos[(paciente, fase)] = {(dia_idx, horas_disponibles[j]) for j in
+                                                   range(max(0, i - radio_huecos), min(len(horas_disponibles), i + radio_huecos + 1))}
+
+    def filtro(nodo: Tuple) -> bool:
+        if nodo[0] not in existentes:
+            return True
+        return (nodo[2], nodo[3]) in huecos_permitidos.get((nodo[0], nodo[5]), ())
+    return filtro
+
+
+def replanificar(variante: str, config_data: Dict[str, Any], aco_params: Dict[str, Any], plan: List[Tuple],
+                 modo: str = "congelar", penalizacion_cambio: float = 5000.0, radio_horas: float = 1.0,
+                 iteraciones: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Replanificación incremental a partir de un plan anterior (con los nombres de paciente sin
+    transformar en config_data, y ya transformados en el plan):
+      - 'congelar': las citas de los pacientes existentes se conservan tal cual y la colonia sólo
+        programa los pacientes nuevos en los huecos que quedan libres.
+      - 'suave': también se reprograman los pacientes existentes, limitando cada cita al día y la
+        hora de su plan anterior (± radio_horas) y con 'penalizacion_cambio' por cada cita que cambia
+        de hora. La colonia parte del plan anterior completado en modo 'congelar' si éste programa
+        a todos los pacientes nuevos, o sólo del plan anterior en caso contrario.
+    Devuelve un resumen con la solución completa (fijas + delta) y su coste, o None si no hay
+    nada que programar. Si no se puede construir el grafo del delta o la colonia no programa a
+    todos los pacientes, el resumen sólo lleva el motivo en 'error'.
+    """
+    if modo not in MODOS_REPLANIFICACION:
+        raise ValueError(f"Modo de replanificación desconocido '{modo}'. Disponibles: {', '.join(MODOS_REPLANIFICACION)}")
+    inicio = time.time()
+    config_original, config_data = config_data, copy.deepcopy(config_data)
+    transformar_nombres_pacientes(config_data)
+    horas = generar_horas_disponibles(config_data["hora_inicio"], config_data["hora_fin"], config_data["intervalo_consultas_minutos"])
+    lista_personal_instancias = generar_instancias_personal(config_data)
+    existentes, nuevos, descartados = analizar_plan(plan, config_data, horas, lista_personal_instancias)
+    for paciente, motivo in sorted(descartados.items()):
+        print(f"Aviso: paciente '{paciente}' del plan anterior: {motivo}.")
+    print(f"Plan anterior: {len(existentes)} pacientes conservados, {len(nuevos)} pacientes a programar.")
+
+    if modo == "congelar":
+        asignaciones_fijas = [a for asignaciones in existentes.values() for a in asignaciones]
+        pacientes_delta = nuevos
+        filtro = filtro_huecos_libres(asignaciones_fijas, config_data, lista_personal_instancias,
+                                      aco_params.get("clases_recursos", False))
+    else:
+        asignaciones_fijas = []
+        pacientes_delta = nuevos | set(existentes)
+        filtro = filtro_huecos_anteriores(existentes, horas, int(radio_horas * 60 // config_data["intervalo_consultas_minutos"]))
+    if not pacientes_delta:
+        print("No hay pacientes que programar: el plan anterior se conserva.")
+        return None
+
+    escenario = preparar_escenario(configuracion_delta(config_data, pacientes_delta),
+                                   clases_recursos=aco_params.get("clases_recursos", False),
+                                   plantillas_estudio=aco_params.get("plantillas_estudio", False),
+                                   transformar_nombres=False, filtro_nodos=filtro)
+    if escenario is None:
+        return {"modo": modo, "error": "no quedan huecos libres para los pacientes a programar"}
+    print(f"Grafo del delta: {len(escenario['nodos'])} nodos para {len(pacientes_delta)} pacientes.")
+
+    params_delta = dict(aco_params, iterations=iteraciones) if iteraciones else aco_params
+    colonia = crear_colonia(variante, escenario, params_delta, mixin=ReplanificacionMixin)
+    map_paciente_info = paciente_a_estudio(config_data)
+    semilla = None
+    if modo == "suave":
+        semilla = [a for asignaciones in existentes.values() for a in asignaciones]
+        if nuevos:
+            print("Completando el plan anterior con los pacientes nuevos como solución inicial...")
+            congelado = replanificar(variante, config_original, aco_params, plan, "congelar", iteraciones=iteraciones)
+            if congelado and "error" not in congelado:
+                semilla = congelado["best_solution"]
+            else:
+                print("Aviso: el modo 'congelar' no programa a todos los pacientes nuevos; se parte sólo del plan anterior.")
+    colonia.configurar_replanificacion(
+        asignaciones_fijas,
+        {(a[0], a[5]): a for asignaciones in existentes.values() for a in asignaciones},
+        penalizacion_cambio,
+        {paciente: map_paciente_info[paciente] for paciente in existentes})
+    if semilla:
+        colonia.preparar_arranque_en_caliente(semilla)
+    solucion_delta, coste = colonia.run()
+    if not solucion_delta or coste == float('inf') or not colonia.solucion_completa(solucion_delta):
+        return {"modo": modo, "error": "la colonia no encontró un plan que programe a todos los pacientes"}
+    return {
+        "modo": modo,
+        "best_solution": asignaciones_fijas + list(solucion_delta),
+        "best_cost": coste,
+        "cambios": colonia.contar_cambios(solucion_delta),
+        "pacientes_nuevos": sorted(nuevos),
+        "pacientes_descartados": descartados,
+        "execution_time": time.time() - inicio,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replanificación incremental a partir de un plan anterior.")
+    parser.add_argument("--variante", choices=VARIANTES, default="standard")
+    parser.add_argument("--plan", required=True, help="Solución JSON anterior (solucion.json de Standard o MinMax).")
+    parser.add_argument("--modo", choices=MODOS_REPLANIFICACION, default="congelar")
+    parser.add_argument("--penalizacion-cambio", type=float, default=5000.0,
+                        help="Coste por cita de un paciente existente que cambia de hora (modo suave).")
+    parser.add_argument("--radio-horas", type=float, default=1.0,
+                        help="Horas alrededor de cada cita del plan anterior, en el mismo día (modo suave).")
+    parser.add_argument("--iteraciones", type=int, default=None, help="Iteraciones de la colonia del delta.")
+    args = parser.parse_args()
+
+    if args.variante == "minmax":
+        from MinMax.main import get_configuration, get_aco_params
+        directorio_defecto = "src/MinMax"
+    else:
+        from Standard.main import get_configuration, get_aco_params
+        directorio_defecto = "src/Standard"
+    config_file_path = os.environ.get('ACO_CONFIG_PATH', os.path.join(directorio_defecto, 'config.json'))
+    aco_params_path = os.environ.get('ACO_PARAMS_PATH', os.path.join(directorio_defecto, 'params_config.json'))
+    plot_dir_path = os.environ.get('PLOT_DIR_PATH', 'plots/')
+
+    config_data = get_configuration(config_file_path)
+    if config_data is None:
+        print("No se pudo cargar la configuración.")
+        exit(1)
+    if not comprobar_viabilidad(config_data):
+        exit(1)
+    aco_params = get_aco_params(aco_params_path)
+    plan, coste_anterior, _ = cargar_solucion(args.plan)
+    print(f"Plan anterior: {len(plan)} asignaciones (coste {coste_anterior:.2f}).")
+
+    resultado = replanificar(args.variante, config_data, aco_params, plan, args.modo,
+                             args.penalizacion_cambio, args.radio_horas, args.iteraciones)
+    if resultado is None:
+        exit(0)
+    if "error" in resultado:
+        print(f"Error: {resultado['error']}. No se guarda ningún plan.")
+        exit(1)
+    print(f"\nCosto total replanificado: {resultado['best_cost']:.2f}")
+    print(f"Citas existentes cambiadas: {resultado['cambios']}")
+    print(f"Tiempo de replanificación: {resultado['execution_time']:.2f}s")
+    guardar_solucion(os.path.join(plot_dir_path, "solucion_replanificada.json"), resultado["best_solution"],
+                     resultado["best_cost"], variante=args.variante, modo=resultado["modo"],
+                     cambios=resultado["cambios"], pacientes_descartados=resultado["pacientes_descartados"])
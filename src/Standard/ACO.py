@@ -1,12 +1,24 @@
 import matplotlib.pyplot as plt 
 from utils.Ant import Ant
-from typing import Dict, List, Tuple
+from utils.rng import derivar_rng, derivar_semilla, SEMILLA_POR_DEFECTO
+from utils.adaptive import ControlAdaptativo
+from utils.greedy import construir_solucion_voraz
+from utils.resource_classes import (componentes_grafo_clases, contraer_solucion, expandir_solucion,
+                                    SUFIJO_CLASE_PERSONAL, CONSULTA_GENERICA)
+from utils.study_templates import AntPlantilla, componentes_grafo_plantillas, contraer_pacientes
+from utils.vectorized_colony import ColoniaVectorizada
+from utils.checkpoint import cargar_checkpoint, guardar_checkpoint, huella_escenario
+from utils.penalties import (PENALIZACION_PERSONAL_INCORRECTO, PENALIZACION_HORA_INVALIDA, PENALIZACION_ORDEN_NO_DEFINIDO,
+                             PENALIZACION_FASE_EXTRA_DIA, PENALIZACION_CONFLICTO_RECURSO, PENALIZACION_FASE_FALTANTE,
+                             PENALIZACION_ORDEN_INCORRECTO, COSTE_MINIMO, MINUTOS_POR_DIA, penalizacion_entre_fases)
+from typing import Dict, List, Tuple, Optional
 from collections import defaultdict
 import datetime
 import random
 import time 
 import os
 import math
+import numpy as np
 try:
     from Standard.Graph import Graph
 except ImportError:
@@ -14,11 +26,26 @@ except ImportError:
 
 
 class ACO:
+    # Atributos que no guarda un checkpoint: el grafo (sus feromonas se guardan aparte), cachés que se
+    # reconstruyen y la configuración de la propia ejecución (p. ej. para ampliar las iteraciones al reanudar)
+    ATRIBUTOS_SIN_CHECKPOINT = ("graph", "_colonia_vectorizada", "iterations",
+                                "checkpoint", "_ultimo_checkpoint")
+
     def __init__(self, graph: Graph, config_data: Dict, horas_disponibles: List[str], # Horas para un día tipo
                  num_dias_planificacion: int,
                  lista_personal_instancias: List[str],
                  n_ants: int = 10, iterations: int = 100,
-                 alpha: float = 1.0, beta: float = 3.0, rho: float = 0.1, Q: float = 1.0):
+                 alpha: float = 1.0, beta: float = 3.0, rho: float = 0.1, Q: float = 1.0,
+                 seed: Optional[int] = None,
+                 criterios_parada: Optional[Dict] = None,
+                 adaptativo: Optional[Dict] = None,
+                 inicializacion_voraz: bool = False,
+                 clases_recursos: bool = False,
+                 plantillas_estudio: bool = False,
+                 comprobacion_anticipada: bool = False,
+                 max_retrocesos: int = 0,
+                 margen_poda: Optional[float] = None,
+                 vectorizado: bool = False):
         self.graph = graph
         self.config_data = config_data
         
@@ -62,98 +89,537 @@ class ACO:
         self.best_solution = None
         self.total_costs = [] 
         self.best_cost = float('inf')
+        # Mejor solución de la última iteración ejecutada (tras la búsqueda local)
+        self.iteration_best_solution = None
+        self.iteration_best_cost = float('inf')
         self.execution_time = None
         self.max_fases_por_dia_paciente = config_data.get("max_fases_por_dia_paciente", 2)
 
+        # Semilla de la ejecución: cada hormiga y cada búsqueda local usan un generador derivado de ella
+        self.seed = seed if seed is not None else SEMILLA_POR_DEFECTO
+        self.rng = derivar_rng(self.seed)
+        self._llamadas_busqueda_local = 0
+
+        # Criterios de parada opcionales: max_segundos, max_iteraciones_sin_mejora, coste_objetivo,
+        # factor_ramificacion_min (con lambda_ramificacion para el factor de ramificación lambda)
+        self.criterios_parada = criterios_parada or {}
+        self.motivo_parada = None
+        self.iteraciones_ejecutadas = 0
+        self._iteraciones_sin_mejora = 0
+        self._mejor_coste_anterior = float('inf')
+        self._inicio_ejecucion = None
+
+        # Control adaptativo de alpha, beta, rho y n_ants (desactivado por defecto: parámetros fijos)
+        self.control_adaptativo = ControlAdaptativo(adaptativo) if adaptativo and adaptativo.get("activo", True) else None
+        self.registro_adaptativo = []
+        self.estadisticas_iteracion = {}
+
+
+        # Solución voraz inicial: siembra la mejor solución y un rastro de feromona antes de iterar
+        self.inicializacion_voraz = inicializacion_voraz
+        self.coste_voraz = None
+
+        # Modo por clases de recursos: el grafo usa una consulta genérica y una instancia por rol,
+        # y el personal y la consulta concretos se asignan al evaluar cada solución
+        self.clases_recursos = clases_recursos
+        self.capacidad_recursos = componentes_grafo_clases(config_data, lista_personal_instancias)[2] if clases_recursos else None
+
+        # Modo por plantillas de estudio: el grafo tiene un paciente plantilla por estudio y cada
+        # hormiga asigna los pacientes reales del estudio en orden al empezar cada plantilla
+        self.plantillas_estudio = plantillas_estudio
+        self.pacientes_por_plantilla = componentes_grafo_plantillas(config_data)[1] if plantillas_estudio else {}
+        self.plantilla_de_paciente = {paciente: plantilla for plantilla, pacientes in self.pacientes_por_plantilla.items()
+                                      for paciente in pacientes}
+
+        # Construcción de las hormigas: comprobación anticipada de que el paciente puede completar sus
+        # fases y reparación acotada (retrocesos) de las hormigas que aun así quedan bloqueadas
+        self.comprobacion_anticipada = comprobacion_anticipada
+        self.max_retrocesos = max_retrocesos
+        self.historial_validas = []
+        self._retrocesos_iteracion = 0
+
+        # Poda de hormigas: se abandona la construcción cuando el coste parcial (cota inferior de su
+        # coste final) supera el mejor coste conocido en más de margen_poda (fracción; None la desactiva)
+        self.margen_poda = margen_poda
+
+        # Construcción vectorizada: todas las hormigas avanzan a la vez sobre arrays de NumPy. No admite
+        # los modos que necesitan el estado de cada hormiga (plantillas, retrocesos y poda)
+        if vectorizado and (plantillas_estudio or max_retrocesos or margen_poda is not None):
+            print("Aviso: la construcción vectorizada no admite plantillas_estudio, max_retrocesos ni margen_poda; se construye hormiga a hormiga")
+            vectorizado = False
+        self.vectorizado = vectorizado
+        self._colonia_vectorizada = None
+
+        # Arranque en caliente: solución e instantánea de feromonas de una ejecución anterior, que se
+        # incorporan al iniciar la ejecución (preparar_arranque_en_caliente)
+        self.solucion_previa = None
+        self.feromonas_previas = None
+
+        # Checkpoints periódicos de la ejecución (configurar_checkpoint)
+        self.checkpoint = None
+        self._ultimo_checkpoint = None
+
+    def _crear_hormiga(self, rng: Optional[random.Random] = None) -> Ant:
+        """ Crea una hormiga sobre el grafo actual con los parámetros de la colonia """
+        if self.plantillas_estudio:
+            return AntPlantilla(self.graph, self.paciente_to_estudio, self.pacientes, self.duracion_consultas,
+                                self.num_dias_planificacion, self.alpha, self.beta, self.max_fases_por_dia_paciente,
+                                rng=rng, capacidad_recursos=self.capacidad_recursos,
+                                horas_disponibles=self.horas_un_dia,
+                                comprobacion_anticipada=self.comprobacion_anticipada,
+                                pacientes_por_plantilla=self.pacientes_por_plantilla)
+        return Ant(self.graph, self.paciente_to_estudio, self.pacientes, self.duracion_consultas,
+                   self.num_dias_planificacion, self.alpha, self.beta, self.max_fases_por_dia_paciente,
+                   rng=rng, capacidad_recursos=self.capacidad_recursos,
+                   horas_disponibles=self.horas_un_dia,
+                   comprobacion_anticipada=self.comprobacion_anticipada)
+
+    def _construir_solucion(self, ant: Ant, max_steps: int) -> int:
+        """
+        Construye el recorrido de una hormiga. Si se bloquea antes de programar todas las fases,
+        retrocede (hasta max_retrocesos veces) descartando la transición que llevó al bloqueo. Con
+        margen_poda, la hormiga se abandona en cuanto su coste parcial supera el umbral de poda.
+        Devuelve el número de retrocesos realizados.
+        """
+        ant.reiniciar()
+        umbral_poda = self.best_cost * (1 + self.margen_poda) \
+            if self.margen_poda is not None and self.best_cost != float('inf') else float('inf')
+
+        retrocesos = 0
+        while len(ant.visited) < max_steps and not ant.valid_solution:
+            next_node = ant.choose_next_node()
+            if next_node is None:
+                if retrocesos >= self.max_retrocesos or not ant.visited:
+                    break
+                ant.retroceder()
+                retrocesos += 1
+                continue
+            ant.move(next_node)
+            if ant.coste_parcial > umbral_poda:
+                ant.abandonada = True # No puede mejorar la mejor solución conocida
+                ant.valid_solution = False
+                break
+        return retrocesos
+
+    def _construir_soluciones(self, ants: List[Ant], iteration: int, max_steps: int):
+        """ Construye los recorridos de todas las hormigas de la iteración, en bloque si la construcción es vectorizada """
+        self._retrocesos_iteracion = 0
+        if not self.vectorizado:
+            for ant in ants:
+                self._retrocesos_iteracion += self._construir_solucion(ant, max_steps)
+            return
+
+        if self._colonia_vectorizada is None or self._colonia_vectorizada.graph is not self.graph:
+            self._colonia_vectorizada = ColoniaVectorizada(self.graph, self.paciente_to_estudio, self.pacientes,
+                                                           self.horas_un_dia, self.num_dias_planificacion,
+                                                           self.duracion_consultas, self.max_fases_por_dia_paciente,
+                                                           capacidad_recursos=self.capacidad_recursos,
+                                                           comprobacion_anticipada=self.comprobacion_anticipada)
+        for ant in ants:
+            ant.reiniciar()
+        rng = np.random.default_rng(derivar_semilla(self.seed, iteration, "colonia_vectorizada"))
+        self._colonia_vectorizada.construir(ants, self.alpha, self.beta, rng)
+
+    def _expandir_solucion(self, solution: List[Tuple]) -> List[Tuple]:
+        """ Convierte un recorrido del grafo en asignaciones concretas (sólo cambia en el modo por clases) """
+        if not self.clases_recursos:
+            return solution
+        return expandir_solucion(solution, self.lista_personal_instancias, self.consultas)
+
+    def _contraer_solucion(self, solution: List[Tuple]) -> List[Tuple]:
+        """ Convierte asignaciones concretas en nodos del grafo (cambia en los modos por clases y por plantillas) """
+        if self.clases_recursos:
+            solution = contraer_solucion(solution)
+        if self.plantillas_estudio:
+            solution = contraer_pacientes(solution, self.plantilla_de_paciente)
+        return solution
+
     def run(self):
         """" Ejecuta el algoritmo ACO para encontrar la mejor solución de planificación """
         start_time = time.time()
-        
-        for iteration in range(self.iterations):
-            ants = [Ant(self.graph, self.paciente_to_estudio, self.pacientes, self.duracion_consultas,
-                        self.num_dias_planificacion, self.alpha, self.beta, self.max_fases_por_dia_paciente) for _ in range(self.n_ants)]
-            
-            iteration_best_cost = float('inf')
-            iteration_best_solution = None
-
-            for ant_idx, ant in enumerate(ants):
-                max_steps = sum(len(self.paciente_to_estudio[p]["fases"]) for p in self.pacientes) * 2
-                steps = 0
-                # Reiniciar estado interno de la hormiga
-                ant.visited = []
-                ant.pacientes_progreso.clear()
-                ant.paciente_dia_fase_contador.clear()
-                ant.current_node = None
-                ant.valid_solution = False
-                
-                while steps < max_steps and not ant.valid_solution:
-                    next_node = ant.choose_next_node()
-                    if next_node is None:
-                        break
-                    ant.move(next_node)
-                    steps += 1
-
-                if ant.valid_solution:
-                    cost = self.calcular_coste(ant.visited)
-                    ant.total_cost = cost # Almacenar el coste total en la hormiga
-                    
-                    if cost < iteration_best_cost:
-                        iteration_best_cost = cost
-                        iteration_best_solution = ant.visited.copy()
-            
-            # Aplicar búsqueda local a la mejor solución de la iteración
-            if iteration_best_solution is not None:
-                current_solution_for_ls = iteration_best_solution
-                current_cost_for_ls = iteration_best_cost
-                
-                # Intentar mejoras locales
-                for _ in range(3): 
-                    improved_solution = self.local_search(current_solution_for_ls)
-                    improved_cost = self.calcular_coste(improved_solution)
-                    
-                    if improved_cost < current_cost_for_ls:
-                        current_solution_for_ls = improved_solution
-                        current_cost_for_ls = improved_cost
-                    else:
-                        break
-                
-                # Actualizar si la búsqueda local mejoró
-                if current_cost_for_ls < iteration_best_cost:
-                    iteration_best_cost = current_cost_for_ls
-                    iteration_best_solution = current_solution_for_ls
-                
-                # Actualizar mejor solución global
-                if iteration_best_cost < self.best_cost:
-                    self.best_cost = iteration_best_cost
-                    self.best_solution = iteration_best_solution.copy()
-                if self.best_solution is not None:
-                    # Solo la mejor hormiga de la iteración actualiza
-                    temp_ant_for_pheromone = Ant(self.graph, self.paciente_to_estudio, self.pacientes, self.duracion_consultas,
-                                                self.num_dias_planificacion, self.alpha, self.beta, self.max_fases_por_dia_paciente)
-                    temp_ant_for_pheromone.visited = iteration_best_solution # Mejor de la iteración
-                    temp_ant_for_pheromone.total_cost = iteration_best_cost
-                    self.graph.update_pheromone([temp_ant_for_pheromone], self.rho, self.Q)
-
-            else: # No se encontró solución válida en esta iteración por ninguna hormiga
-                self.graph.update_pheromone([], self.rho, self.Q) # Solo evaporar feromonas
-
-            if iteration % 10 == 0:
-                print(f"Iteración {iteration}/{self.iterations} - Mejor Costo Global: {self.best_cost if self.best_cost != float('inf') else 'N/A'}")
-            
-            # Registrar coste para gráfico de convergencia
-            current_iter_display_cost = self.best_cost if self.best_cost != float('inf') else (iteration_best_cost if iteration_best_cost != float('inf') else None)
-            if current_iter_display_cost is not None:
-                self.total_costs.append(current_iter_display_cost)
-            elif self.total_costs: # si no hay coste en esta iteración, repetir el último mejor conocido
-                self.total_costs.append(self.total_costs[-1])
+        iteracion_inicial = self._reanudar_checkpoint()
+        if iteracion_inicial is None:
+            self._iniciar_ejecucion()
+            iteracion_inicial = 0
+        else:
+            start_time = self._inicio_ejecucion # Incluye el tiempo de la ejecución interrumpida
+        self._ultimo_checkpoint = time.time()
+
+        for iteration in range(iteracion_inicial, self.iterations):
+            if self._tiempo_agotado():
+                self.motivo_parada = "tiempo_maximo"
+                break
+            self._ejecutar_iteracion(iteration)
+            if self._comprobar_parada(iteration):
+                break
+            self._guardar_checkpoint_periodico(iteration)
 
         end_time = time.time()
         self.execution_time = end_time - start_time
 
         return self.best_solution, self.best_cost
 
-    def calcular_coste(self, asignaciones: List[Tuple]) -> float:
-        """" Calcula el coste total de una solución de asignaciones """
+    def configurar_checkpoint(self, ruta: str, cada_iteraciones: Optional[int] = None,
+                              cada_segundos: Optional[float] = None, reanudar: bool = False):
+        """
+        Guarda un checkpoint en 'ruta' cada 'cada_iteraciones' iteraciones y/o 'cada_segundos'
+        segundos. Con 'reanudar', run() continúa desde el checkpoint existente en lugar de empezar.
+        """
+        self.checkpoint = {"ruta": ruta, "cada_iteraciones": cada_iteraciones,
+                           "cada_segundos": cada_segundos, "reanudar": reanudar}
+
+    def estado_checkpoint(self, iteration: int) -> Dict:
+        """
+        Estado completo de la ejecución tras la iteración dada: el estado de la colonia (mejor
+        solución y coste, total_costs, generador aleatorio, contadores de parada, control adaptativo,
+        límites de MinMax...) y las feromonas del grafo con su nivel base. Reanudar desde él
+        produce los mismos resultados que la ejecución sin interrumpir.
+        """
+        return {
+            "iteracion": iteration + 1,
+            "huella": huella_escenario(self.config_data, self.seed, len(self.graph.nodes)),
+            "tiempo_transcurrido": time.time() - self._inicio_ejecucion,
+            "colonia": {atributo: valor for atributo, valor in vars(self).items()
+                        if atributo not in self.ATRIBUTOS_SIN_CHECKPOINT},
+            "feromonas": self.graph.estado_feromonas(),
+        }
+
+    def _guardar_checkpoint_periodico(self, iteration: int):
+        """ Guarda el checkpoint si toca por número de iteraciones o por tiempo desde el anterior """
+        if not self.checkpoint:
+            return
+        cada_iteraciones, cada_segundos = self.checkpoint.get("cada_iteraciones"), self.checkpoint.get("cada_segundos")
+        if (cada_iteraciones and (iteration + 1) % cada_iteraciones == 0) or \
+                (cada_segundos is not None and time.time() - self._ultimo_checkpoint >= cada_segundos):
+            guardar_checkpoint(self.checkpoint["ruta"], self.estado_checkpoint(iteration))
+            self._ultimo_checkpoint = time.time()
+
+    def _reanudar_checkpoint(self) -> Optional[int]:
+        """
+        Restaura el estado del checkpoint configurado si se pidió reanudar. Devuelve la iteración
+        desde la que continuar, o None si hay que empezar desde el principio.
+        """
+        if not self.checkpoint or not self.checkpoint.get("reanudar"):
+            return None
+        estado = cargar_checkpoint(self.checkpoint["ruta"])
+        if estado is None:
+            return None
+        if estado["huella"] != huella_escenario(self.config_data, self.seed, len(self.graph.nodes)):
+            print("Aviso: el checkpoint es de otro escenario o semilla; la ejecución empieza desde el principio.")
+            return None
+        self.__dict__.update(estado["colonia"])
+        self.graph.restaurar_estado_feromonas(estado["feromonas"])
+        self._inicio_ejecucion = time.time() - estado["tiempo_transcurrido"]
+        print(f"Reanudando desde el checkpoint de la iteración {estado['iteracion']} - Mejor Costo Global: {self.best_cost:.2f}")
+        return estado["iteracion"]
+
+    def _iniciar_ejecucion(self):
+        """ Prepara el estado de la colonia antes de la primera iteración """
+        self._inicio_ejecucion = time.time()
+        self.motivo_parada = "iteraciones"
+        self.iteraciones_ejecutadas = 0
+        self._iteraciones_sin_mejora = 0
+        if self.inicializacion_voraz:
+            self._sembrar_solucion_voraz()
+        if self.solucion_previa is not None or self.feromonas_previas is not None:
+            self._aplicar_arranque_en_caliente()
+        self._mejor_coste_anterior = self.best_cost
+
+    def _sembrar_solucion_voraz(self):
+        """
+        Construye la planificación voraz y, si programa todas las fases, la incorpora como mejor
+        solución inicial depositando feromona sobre su recorrido. Con un presupuesto de tiempo
+        mínimo es la solución que devuelve la ejecución.
+        """
+        solucion, completa = construir_solucion_voraz(self.config_data, self.horas_un_dia, self.num_dias_planificacion,
+                                                      self.lista_personal_instancias,
+                                                      nodos_validos=None if self.clases_recursos or self.plantillas_estudio
+                                                                    else set(self.graph.nodes))
+        if not completa:
+            print("Solución voraz incompleta: no se usa como solución inicial.")
+            return
+        self.coste_voraz = self.calcular_coste(solucion)
+        self.incorporar_solucion(solucion, self.coste_voraz)
+        print(f"Solución voraz inicial - Coste: {self.coste_voraz:.2f}")
+
+    def preparar_arranque_en_caliente(self, solucion: Optional[List[Tuple]] = None, feromonas: Optional[Dict] = None):
+        """
+        Indica una solución y/o una instantánea de feromonas (Graph.exportar_feromonas) de una
+        ejecución anterior con las que empezar, en lugar de las feromonas uniformes.
+        """
+        self.solucion_previa = [tuple(asignacion) for asignacion in solucion] if solucion else None
+        self.feromonas_previas = feromonas
+
+    def mapear_solucion_previa(self, solucion: List[Tuple]) -> Tuple[List[Tuple], int, int]:
+        """
+        Adapta una solución anterior al grafo actual. Las asignaciones cuyo nodo sigue existiendo se
+        conservan. Las que usan personal o consultas que ya no existen, o cuyo nodo ya no está en el
+        grafo, pasan a otro nodo del mismo paciente, fase, día y hora, preferentemente uno cuyo
+        personal y consulta sigan libres en ese hueco y con el mismo rol. Si no hay ninguno libre se
+        acepta el conflicto: omitir la fase penalizaría más (fase faltante y orden incorrecto de las
+        siguientes). Las demás se descartan. Devuelve (solución adaptada, mapeadas, descartadas).
+        """
+        nodos_grafo = set(self.graph.nodes)
+        alternativas = defaultdict(list) # (paciente del grafo, día, hora, fase) -> nodos
+        for nodo in self.graph.nodes:
+            alternativas[(nodo[0], nodo[2], nodo[3], nodo[5])].append(nodo)
+        personal_valido, consultas_validas = set(self.lista_personal_instancias), set(self.consultas)
+        pacientes = set(self.pacientes)
+        instancias_por_rol = defaultdict(int)
+        for personal in self.lista_personal_instancias:
+            instancias_por_rol[personal.split('_')[0]] += 1
+
+        # Primera pasada: asignaciones que se conservan, y ocupación de los huecos por ellas
+        adaptada, pendientes = [], []
+        personal_ocupado, consultas_ocupadas = defaultdict(list), defaultdict(list) # (día, hora) -> recursos
+        descartadas = 0
+        for asignacion in solucion:
+            paciente, consulta, dia_idx, hora_str, personal, fase = asignacion
+            if paciente not in pacientes or fase not in self.paciente_to_estudio[paciente]["orden_fases"]:
+                descartadas += 1
+                continue
+            nodo = self._contraer_solucion([asignacion])[0]
+            if nodo in nodos_grafo and personal in personal_valido and consulta in consultas_validas:
+                adaptada.append(asignacion)
+                personal_ocupado[(dia_idx, hora_str)].append(personal)
+                consultas_ocupadas[(dia_idx, hora_str)].append(consulta)
+            else:
+                pendientes.append((asignacion, nodo))
+
+        def libre(candidato: Tuple) -> bool:
+            """ Personal y consulta del candidato libres en su hueco (las clases, si les quedan instancias) """
+            hueco = (candidato[2], candidato[3])
+            personal, consulta = candidato[4], candidato[1]
+            if personal.endswith(SUFIJO_CLASE_PERSONAL):
+                rol = personal.split('_')[0]
+                personal_libre = sum(p.split('_')[0] == rol for p in personal_ocupado[hueco]) < instancias_por_rol[rol]
+            else:
+                personal_libre = personal not in personal_ocupado[hueco]
+            if consulta == CONSULTA_GENERICA:
+                consulta_libre = len(consultas_ocupadas[hueco]) < len(self.consultas)
+            else:
+                consulta_libre = consulta not in consultas_ocupadas[hueco]
+            return personal_libre and consulta_libre
+
+        # Segunda pasada: las demás pasan a otro nodo del mismo hueco, libre si es posible
+        mapeadas = 0
+        for (paciente, consulta, dia_idx, hora_str, personal, fase), nodo in pendientes:
+            rol = personal.split('_')[0]
+            candidatos = alternativas.get((nodo[0], dia_idx, hora_str, fase))
+            if not candidatos:
+                descartadas += 1
+                continue
+            candidatos = [c for c in candidatos if libre(c)] or candidatos
+            elegido = next((c for c in candidatos if c[4].split('_')[0] == rol), candidatos[0])
+            adaptada.append((paciente, elegido[1], dia_idx, hora_str, elegido[4], fase))
+            personal_ocupado[(dia_idx, hora_str)].append(elegido[4])
+            consultas_ocupadas[(dia_idx, hora_str)].append(elegido[1])
+            mapeadas += 1
+        # En el modo por clases, las asignaciones mapeadas a un nodo de clase reciben personal y consulta concretos
+        return self._expandir_solucion(adaptada), mapeadas, descartadas
+
+    def solucion_completa(self, solucion: List[Tuple]) -> bool:
+        """ Indica si la solución programa todas las fases de todos los pacientes (calcular_coste no penaliza a los ausentes) """
+        fases_programadas = defaultdict(list)
+        for asignacion in solucion:
+            fases_programadas[asignacion[0]].append(asignacion[5])
+        return all(sorted(fases_programadas.get(paciente, [])) == sorted(self.paciente_to_estudio[paciente]["fases"])
+                   for paciente in self.pacientes)
+
+    def _aplicar_arranque_en_caliente(self):
+        """
+        Carga las feromonas anteriores y adopta la solución anterior (adaptada al grafo) como mejor
+        solución inicial, depositando feromona sobre su recorrido. Si la solución adaptada no
+        programa todas las fases de todos los pacientes, sólo se usa como rastro de feromona.
+        """
+        if self.feromonas_previas is not None:
+            cargadas, descartadas = self.graph.importar_feromonas(self.feromonas_previas)
+            print(f"Arranque en caliente: {cargadas} aristas con feromona cargadas ({descartadas} ya no existen).")
+        if not self.solucion_previa:
+            return
+        solucion, mapeadas, descartadas = self.mapear_solucion_previa(self.solucion_previa)
+        completa = self.solucion_completa(solucion)
+        coste = self.calcular_coste(solucion)
+        print(f"Arranque en caliente: {len(solucion)} asignaciones de la solución anterior "
+              f"({mapeadas} mapeadas a otros nodos, {descartadas} descartadas) - Coste: {coste:.2f}")
+        if completa:
+            self.incorporar_solucion(solucion, coste)
+        elif solucion and 0 < coste < float('inf'):
+            print("Solución anterior incompleta: sólo se usa como rastro de feromona.")
+            self.graph.deposit_pheromone(self._contraer_solucion(solucion), self.Q / coste)
+
+    def _tiempo_agotado(self) -> bool:
+        """ Indica si se ha superado el tiempo máximo de ejecución configurado """
+        max_segundos = self.criterios_parada.get("max_segundos")
+        return max_segundos is not None and time.time() - self._inicio_ejecucion >= max_segundos
+
+    def _comprobar_parada(self, iteration: int) -> bool:
+        """
+        Evalúa los criterios de parada tras una iteración. Si alguno se cumple, registra el
+        motivo en self.motivo_parada y devuelve True.
+        """
+        self.iteraciones_ejecutadas = iteration + 1
+        if self.best_cost < self._mejor_coste_anterior:
+            self._mejor_coste_anterior = self.best_cost
+            self._iteraciones_sin_mejora = 0
+        else:
+            self._iteraciones_sin_mejora += 1
+
+        motivo = None
+        coste_objetivo = self.criterios_parada.get("coste_objetivo")
+        max_sin_mejora = self.criterios_parada.get("max_iteraciones_sin_mejora")
+        factor_min = self.criterios_parada.get("factor_ramificacion_min")
+        if coste_objetivo is not None and self.best_cost <= coste_objetivo:
+            motivo = "coste_objetivo"
+        elif max_sin_mejora is not None and self._iteraciones_sin_mejora >= max_sin_mejora:
+            motivo = "sin_mejora"
+        elif factor_min is not None and self.best_solution and \
+                self.graph.branching_factor(self._contraer_solucion(self.best_solution), self.criterios_parada.get("lambda_ramificacion", 0.05)) <= factor_min:
+            motivo = "estancamiento"
+        elif self._tiempo_agotado():
+            motivo = "tiempo_maximo"
+
+        if motivo is not None:
+            self.motivo_parada = motivo
+            print(f"Parada en la iteración {iteration} ({motivo}) - Mejor Costo Global: {self.best_cost}")
+            return True
+        return False
+
+    def _ejecutar_iteracion(self, iteration: int):
+        """ Ejecuta una iteración completa: construcción de soluciones, búsqueda local y actualización de feromonas """
+        mejor_coste_inicial = self.best_cost
+        # Cada hormiga tiene su propio generador derivado de (semilla, iteración, índice de hormiga)
+        ants = [self._crear_hormiga(derivar_rng(self.seed, iteration, ant_idx)) for ant_idx in range(self.n_ants)]
+        
+        iteration_best_cost = float('inf')
+        iteration_best_solution = None
+
+        max_steps = sum(len(self.paciente_to_estudio[p]["fases"]) for p in self.pacientes) * 2
+        self._construir_soluciones(ants, iteration, max_steps)
+        for ant in ants:
+            if ant.valid_solution:
+                solucion = self._expandir_solucion(ant.solucion())
+                # Sólo interesa si mejora la mejor de la iteración: el coste es exacto en ese caso
+                cost = self.calcular_coste(solucion, cutoff=iteration_best_cost)
+                ant.total_cost = cost if cost < iteration_best_cost else float('inf') # Sólo el coste exacto; inf si se cortó
+                
+                if cost < iteration_best_cost:
+                    iteration_best_cost = cost
+                    iteration_best_solution = solucion # La hormiga no se reutiliza: no hace falta copiarla
+        
+        # Aplicar búsqueda local a la mejor solución de la iteración
+        if iteration_best_solution is not None:
+            current_solution_for_ls = iteration_best_solution
+            current_cost_for_ls = iteration_best_cost
+            
+            # Intentar mejoras locales
+            for ls_idx in range(3): 
+                improved_solution = self.local_search(current_solution_for_ls,
+                                                      rng=derivar_rng(self.seed, iteration, "busqueda_local", ls_idx))
+                improved_cost = self.calcular_coste(improved_solution, cutoff=current_cost_for_ls)
+                
+                if improved_cost < current_cost_for_ls:
+                    current_solution_for_ls = improved_solution
+                    current_cost_for_ls = improved_cost
+                else:
+                    break
+            
+            # Actualizar si la búsqueda local mejoró
+            if current_cost_for_ls < iteration_best_cost:
+                iteration_best_cost = current_cost_for_ls
+                iteration_best_solution = current_solution_for_ls
+            
+            # Actualizar mejor solución global
+            if iteration_best_cost < self.best_cost:
+                self.best_cost = iteration_best_cost
+                self.best_solution = list(iteration_best_solution)
+            if self.best_solution is not None:
+                # Solo la mejor hormiga de la iteración actualiza
+                temp_ant_for_pheromone = self._crear_hormiga()
+                temp_ant_for_pheromone.visited = self._contraer_solucion(iteration_best_solution) # Mejor de la iteración
+                temp_ant_for_pheromone.total_cost = iteration_best_cost
+                temp_ant_for_pheromone.valid_solution = True # Sin esto update_pheromone sólo evapora
+                self.graph.update_pheromone([temp_ant_for_pheromone], self.rho, self.Q)
+
+        else: # No se encontró solución válida en esta iteración por ninguna hormiga
+            self.graph.update_pheromone([], self.rho, self.Q) # Solo evaporar feromonas
+
+        self.iteration_best_solution = iteration_best_solution
+        self.iteration_best_cost = iteration_best_cost
+        self._registrar_estadisticas(iteration, ants, mejor_coste_inicial)
+
+        if iteration % 10 == 0:
+            print(f"Iteración {iteration}/{self.iterations} - Mejor Costo Global: {self.best_cost if self.best_cost != float('inf') else 'N/A'}{self._texto_validas()}")
+        
+        # Registrar coste para gráfico de convergencia
+        current_iter_display_cost = self.best_cost if self.best_cost != float('inf') else (iteration_best_cost if iteration_best_cost != float('inf') else None)
+        if current_iter_display_cost is not None:
+            self.total_costs.append(current_iter_display_cost)
+        elif self.total_costs: # si no hay coste en esta iteración, repetir el último mejor conocido
+            self.total_costs.append(self.total_costs[-1])
+
+    def _registrar_estadisticas(self, iteration: int, ants: List[Ant], mejor_coste_inicial: float):
+        """
+        Calcula las señales de la iteración (mejora, diversidad entre hormigas y proporción de hormigas
+        bloqueadas) y, si el modo adaptativo está activo, ajusta los parámetros y registra los cambios.
+        """
+        validas = [ant for ant in ants if ant.valid_solution]
+        abandonadas = sum(1 for ant in ants if ant.abandonada)
+        diversidad = None
+        if validas and self.iteration_best_solution:
+            # Distancia de Jaccard media de cada hormiga a la mejor solución de la iteración
+            mejor = set(self._contraer_solucion(self.iteration_best_solution))
+            distancias = []
+            for ant in validas:
+                nodos_ant = set(ant.visited)
+                distancias.append(1 - len(nodos_ant & mejor) / len(nodos_ant | mejor))
+            diversidad = sum(distancias) / len(distancias)
+        self.estadisticas_iteracion = {
+            "mejora": self.best_cost < mejor_coste_inicial,
+            "diversidad": diversidad,
+            "ratio_bloqueadas": (len(ants) - len(validas) - abandonadas) / len(ants) if ants else 0.0,
+            "abandonadas": abandonadas,
+            "retrocesos": self._retrocesos_iteracion,
+        }
+        self.historial_validas.append(len(validas) / len(ants) if ants else 0.0)
+
+        if self.control_adaptativo is not None:
+            registro = self.control_adaptativo.ajustar(self, iteration, self.estadisticas_iteracion)
+            self.registro_adaptativo.append(registro)
+            if registro["cambios"]:
+                print(f"Iteración {iteration} - Ajustes adaptativos: {', '.join(registro['cambios'])}")
+
+    def _texto_validas(self) -> str:
+        """ Texto con la proporción de hormigas válidas de la última iteración para los mensajes de progreso """
+        if not self.historial_validas:
+            return ""
+        texto = f" - Hormigas válidas: {self.historial_validas[-1]:.0%}"
+        if self.max_retrocesos:
+            texto += f" ({self.estadisticas_iteracion.get('retrocesos', 0)} retrocesos)"
+        if self.margen_poda is not None:
+            texto += f" - Hormigas podadas: {self.estadisticas_iteracion.get('abandonadas', 0)}"
+        return texto
+
+    def incorporar_solucion(self, solution: List[Tuple], cost: float):
+        """
+        Incorpora una solución externa (p. ej. migrada desde otra colonia): deposita feromona
+        sobre su recorrido y la adopta como mejor solución global si la mejora.
+        """
+        if not solution or cost == float('inf'):
+            return
+        if cost < self.best_cost:
+            self.best_cost = cost
+            self.best_solution = list(solution)
+        if cost > 0:
+            self.graph.deposit_pheromone(self._contraer_solucion(solution), self.Q / cost)
+
+    def calcular_coste(self, asignaciones: List[Tuple], cutoff: float = float('inf')) -> float:
+        """"
+        Calcula el coste total de una solución de asignaciones. Con 'cutoff', las comprobaciones se
+        hacen de las más baratas y con mayores penalizaciones a las más costosas, y se devuelve la
+        suma parcial en cuanto supera el cutoff (un valor mayor que él, no el coste exacto). Si el
+        coste no supera el cutoff, el resultado es el coste exacto.
+        """
         # Asignacion: (paciente, consulta, dia_idx, hora_str, personal, fase_nombre)
         if not asignaciones:
             return float('inf')
@@ -162,7 +628,7 @@ class ACO:
         tiempos_pacientes = defaultdict(list)
         hora_str_to_min_cache = {} 
         coste_total = 0.0
-        max_min_per_day = 24 * 60
+        max_min_per_day = MINUTOS_POR_DIA
 
         fases_por_paciente_dia = defaultdict(lambda: defaultdict(int))
 
@@ -174,7 +640,8 @@ class ACO:
             # Validar que el personal asignado puede realizar la fase
             rol_asignado = personal_instancia.split('_')[0]
             if rol_asignado not in self.cargos_config or fase_nombre not in self.cargos_config[rol_asignado]:
-                coste_total += 75000 # Penalización por personal incorrecto para la fase
+                coste_total += PENALIZACION_PERSONAL_INCORRECTO # Penalización por personal incorrecto para la fase
+                if coste_total > cutoff: return coste_total
                 continue
 
             # Contar fases por paciente y día
@@ -187,7 +654,8 @@ class ACO:
                     inicio_min_dia = hora_obj.hour * 60 + hora_obj.minute
                     hora_str_to_min_cache[hora_str] = inicio_min_dia
                 except ValueError:
-                    coste_total += 60000 # Penalización por formato de hora inválido
+                    coste_total += PENALIZACION_HORA_INVALIDA # Penalización por formato de hora inválido
+                    if coste_total > cutoff: return coste_total
                     continue
             else:
                 inicio_min_dia = hora_str_to_min_cache[hora_str]
@@ -198,7 +666,8 @@ class ACO:
             
             orden_fase = estudio_info_paciente["orden_fases"].get(fase_nombre)
             if orden_fase is None:
-                coste_total += 46000 # Penalización por orden no definido
+                coste_total += PENALIZACION_ORDEN_NO_DEFINIDO # Penalización por orden no definido
+                if coste_total > cutoff: return coste_total
                 continue
 
             # Guardar detalles de la fase para análisis posteriores
@@ -219,42 +688,20 @@ class ACO:
         for pac, dias_data in fases_por_paciente_dia.items():
             for dia, count in dias_data.items():
                 if count > self.max_fases_por_dia_paciente:
-                    coste_total += 30000 * (count - self.max_fases_por_dia_paciente) # Penalización fuerte
-
-        # PASO 2: Detectar conflictos de recursos (médicos, consultas) usando algoritmo de barrido sobre tiempo absoluto
-        eventos = []
-        # Crear eventos de inicio y fin para cada fase
-        for i, f_activa in enumerate(fases_activas_detalle):
-            # Eventos usan tiempo absoluto para que el barrido funcione entre días
-            eventos.append((f_activa['inicio_min_abs'], 'start', i, f_activa['personal'], f_activa['consulta']))
-            eventos.append((f_activa['fin_min_abs'], 'end', i, f_activa['personal'], f_activa['consulta']))
-        
-        eventos.sort() # Ordenar por tiempo
+                    coste_total += PENALIZACION_FASE_EXTRA_DIA * (count - self.max_fases_por_dia_paciente) # Penalización fuerte
+        if coste_total > cutoff: return coste_total
 
-        consultas_ocupadas = defaultdict(int) # Contador de fases activas por consulta
-        personal_ocupado = defaultdict(int) # Contador de fases activas por personal
-        for t_abs, tipo_evento, idx_fase, personal_evento, consulta_evento in eventos:
-            if tipo_evento == 'start':
-                if personal_ocupado[personal_evento] > 0: coste_total += 20000
-                personal_ocupado[personal_evento] += 1 # Personal ocupado
-                if consultas_ocupadas[consulta_evento] > 0: coste_total += 20000
-                consultas_ocupadas[consulta_evento] += 1 # Consulta ocupada
-            else:
-                personal_ocupado[personal_evento] -= 1
-                consultas_ocupadas[consulta_evento] -= 1
+        # PASO 2: Verificar que están todas las fases de cada estudio (no requiere ordenar)
+        for paciente, fases_programadas_paciente in tiempos_pacientes.items():
+            num_fases_definidas = len(self.paciente_to_estudio[paciente]["orden_fases"])
+            if len(fases_programadas_paciente) != num_fases_definidas:
+                coste_total += PENALIZACION_FASE_FALTANTE * abs(num_fases_definidas - len(fases_programadas_paciente))
+        if coste_total > cutoff: return coste_total
 
         # PASO 3: Verificar secuencia y tiempos por paciente
-        coste_por_dia_vacio = 500 # Penalización por cada día vacío entre citas del mismo paciente
-
         for paciente, fases_programadas_paciente in tiempos_pacientes.items():
-            estudio_info = self.paciente_to_estudio[paciente]
             fases_programadas_paciente.sort(key=lambda x: (x[0], x[1], x[2])) 
 
-            # Verificar que están todas las fases del estudio
-            num_fases_definidas = len(estudio_info["orden_fases"])
-            if len(fases_programadas_paciente) != num_fases_definidas:
-                coste_total += 15000 * abs(num_fases_definidas - len(fases_programadas_paciente))
-            
             orden_esperado = 1
             fin_fase_anterior_abs_min = -1
             dia_fase_anterior = -1
@@ -262,33 +709,42 @@ class ACO:
             for orden_actual, dia_actual, inicio_actual_abs_min, fin_actual_abs_min, fase_nombre_actual, inicio_actual_min_dia in fases_programadas_paciente:
                 # Verificar que las fases están en el orden correcto
                 if orden_actual != orden_esperado:
-                    coste_total += 100000 # Penalización por orden incorrecto
+                    coste_total += PENALIZACION_ORDEN_INCORRECTO # Penalización por orden incorrecto
                 
                 if fin_fase_anterior_abs_min != -1:  # No es la primera fase del paciente
-                    if inicio_actual_abs_min < fin_fase_anterior_abs_min:
-                        # Las fases se solapan 
-                        coste_total += 50000 * (fin_fase_anterior_abs_min - inicio_actual_abs_min)
-                    else:
-                        # Calcular tiempo de espera entre fases
-                        tiempo_espera_abs = inicio_actual_abs_min - fin_fase_anterior_abs_min
-                        
-                        if dia_actual == dia_fase_anterior: # Ambas fases en el MISMO DÍA
-                            # Aplicar penalizaciones de espera intra-día
-                            if tiempo_espera_abs > 120:  # Más de 2 horas de espera en el mismo día
-                                coste_total += (tiempo_espera_abs - 120) * 2  # Penalización creciente
-                            elif tiempo_espera_abs > 30:  # Más de 15 minutos en el mismo día
-                                 coste_total += tiempo_espera_abs * 0.5  # Penalización leve
-                        
-                        elif dia_actual > dia_fase_anterior: # Fases en días diferentes
-                            dias_vacios = dia_actual - dia_fase_anterior - 1
-                            if dias_vacios > 0: # Penalizar días vacíos entre fases
-                                coste_total += dias_vacios * coste_por_dia_vacio
+                    # Solape, espera en el mismo día o días vacíos entre fases
+                    coste_total += penalizacion_entre_fases(dia_fase_anterior, fin_fase_anterior_abs_min,
+                                                            dia_actual, inicio_actual_abs_min)
                             
                 fin_fase_anterior_abs_min = fin_actual_abs_min
                 dia_fase_anterior = dia_actual # Actualizar el día de la fase anterior
                 orden_esperado += 1
+            if coste_total > cutoff: return coste_total
+
+        # PASO 4: Detectar conflictos de recursos (médicos, consultas) usando algoritmo de barrido sobre tiempo absoluto
+        eventos = []
+        # Crear eventos de inicio y fin para cada fase
+        for i, f_activa in enumerate(fases_activas_detalle):
+            # Eventos usan tiempo absoluto para que el barrido funcione entre días
+            eventos.append((f_activa['inicio_min_abs'], 'start', i, f_activa['personal'], f_activa['consulta']))
+            eventos.append((f_activa['fin_min_abs'], 'end', i, f_activa['personal'], f_activa['consulta']))
         
-        return coste_total if coste_total > 0 else 0.1  # Evitar coste cero
+        eventos.sort() # Ordenar por tiempo
+
+        consultas_ocupadas = defaultdict(int) # Contador de fases activas por consulta
+        personal_ocupado = defaultdict(int) # Contador de fases activas por personal
+        for t_abs, tipo_evento, idx_fase, personal_evento, consulta_evento in eventos:
+            if tipo_evento == 'start':
+                if personal_ocupado[personal_evento] > 0: coste_total += PENALIZACION_CONFLICTO_RECURSO
+                personal_ocupado[personal_evento] += 1 # Personal ocupado
+                if consultas_ocupadas[consulta_evento] > 0: coste_total += PENALIZACION_CONFLICTO_RECURSO
+                consultas_ocupadas[consulta_evento] += 1 # Consulta ocupada
+                if coste_total > cutoff: return coste_total
+            else:
+                personal_ocupado[personal_evento] -= 1
+                consultas_ocupadas[consulta_evento] -= 1
+        
+        return coste_total if coste_total > 0 else COSTE_MINIMO  # Evitar coste cero
         
     def _identificar_asignaciones_conflictivas(self, solution: List[Tuple]) -> List[int]:
         """" Identifica los índices de asignaciones conflictivas en una solución """
@@ -343,13 +799,19 @@ class ACO:
         return list(conflictive_indices)
 
 
-    def local_search(self, solution: List[Tuple]) -> List[Tuple]:
-        """" Realiza una búsqueda local para intentar mejorar la solución dada """
+    def local_search(self, solution: List[Tuple], rng: Optional[random.Random] = None) -> List[Tuple]:
+        """"
+        Realiza una búsqueda local para intentar mejorar la solución dada. Trabaja sobre una única
+        copia: cada intento cambia una asignación en ella y la deshace si no mejora el coste.
+        """
+        if rng is None: # Generador propio por llamada si no se proporciona uno
+            rng = derivar_rng(self.seed, "busqueda_local", self._llamadas_busqueda_local)
+            self._llamadas_busqueda_local += 1
         # Asignacion: (paciente, consulta, dia_idx, hora_str, personal, fase_nombre)
         current_best_solution = list(solution) # Copia de la solución actual
         current_best_cost = self.calcular_coste(current_best_solution)
 
-        if not current_best_solution or current_best_cost == 0.1: # Si la solución es vacía o ya es óptima
+        if not current_best_solution or current_best_cost == COSTE_MINIMO: # Si la solución es vacía o ya es óptima
             return current_best_solution
 
         num_improvement_attempts = 15 # Limitar intentos
@@ -357,15 +819,15 @@ class ACO:
         for attempt in range(num_improvement_attempts):
             if not current_best_solution: break # Evitar error si la solución está vacía
             
-            temp_solution = list(current_best_solution) # Copia temporal de la solución actual
+            temp_solution = current_best_solution # Los cambios se prueban sobre la propia copia
             conflictive_indices = self._identificar_asignaciones_conflictivas(temp_solution)
             
             idx_to_change = -1
-            if conflictive_indices and random.random() < 0.9: # 90% de probabilidad de elegir un conflicto
-                idx_to_change = random.choice(conflictive_indices)
+            if conflictive_indices and rng.random() < 0.9: # 90% de probabilidad de elegir un conflicto
+                idx_to_change = rng.choice(conflictive_indices)
             else:
                 if not temp_solution: continue # Evitar error si temp_solution está vacía
-                idx_to_change = random.randrange(len(temp_solution))
+                idx_to_change = rng.randrange(len(temp_solution))
 
             if idx_to_change == -1 or idx_to_change >= len(temp_solution):
                 continue
@@ -377,7 +839,7 @@ class ACO:
             # Cambiar hora
             available_new_horas = [h for h in self.horas_un_dia if h != hora_str]
             if available_new_horas:
-                change_options.append(("hora", random.choice(available_new_horas)))
+                change_options.append(("hora", rng.choice(available_new_horas)))
             
             # Cambiar personal_instancia
             roles_compatibles_con_fase = self.fase_a_roles_compatibles.get(fase, [])
@@ -388,22 +850,22 @@ class ACO:
                     if p_rol in roles_compatibles_con_fase and p_inst != personal_actual_instancia:
                         available_new_personal_instancias.append(p_inst)
             if available_new_personal_instancias:
-                change_options.append(("personal", random.choice(available_new_personal_instancias)))
+                change_options.append(("personal", rng.choice(available_new_personal_instancias)))
 
             # Cambiar consulta
             available_new_consultas = [c for c in self.consultas if c != consulta]
             if available_new_consultas:
-                change_options.append(("consulta", random.choice(available_new_consultas)))
+                change_options.append(("consulta", rng.choice(available_new_consultas)))
             
             # Cambiar día
             available_new_dias = [d_idx for d_idx in range(self.num_dias_planificacion) if d_idx != dia_idx]
             if available_new_dias:
-                change_options.append(("dia", random.choice(available_new_dias)))
+                change_options.append(("dia", rng.choice(available_new_dias)))
 
             if not change_options:
                 continue # No hay opciones de cambio para esta asignación
 
-            change_type, new_value = random.choice(change_options)
+            change_type, new_value = rng.choice(change_options)
             
             new_asig = None
             if change_type == "hora": new_asig = (paciente, consulta, dia_idx, new_value, personal_actual_instancia, fase)
@@ -412,12 +874,12 @@ class ACO:
             elif change_type == "dia": new_asig = (paciente, consulta, new_value, hora_str, personal_actual_instancia, fase)
             
             if new_asig:
-                modified_solution_attempt = list(temp_solution)
-                modified_solution_attempt[idx_to_change] = new_asig
-                new_cost = self.calcular_coste(modified_solution_attempt)
+                temp_solution[idx_to_change] = new_asig
+                new_cost = self.calcular_coste(temp_solution, cutoff=current_best_cost)
                 if new_cost < current_best_cost:
                     current_best_cost = new_cost
-                    current_best_solution = modified_solution_attempt
+                else: # Deshacer el cambio
+                    temp_solution[idx_to_change] = original_assignment
         return current_best_solution
 
     def plot_convergence(self, output_dir: str = "/app/plots"):
@@ -1,16 +1,33 @@
-from typing import List, Dict, Tuple, Set
+import copy
+from typing import List, Dict, Tuple, Set, Optional
 from collections import defaultdict
 from utils.Ant import Ant
 
 class Graph:
-    def __init__(self, nodes: List[Tuple], edges: Dict[Tuple, List[Tuple]], initial_pheromone: float = 1.0):
+    # Atributos que cambian durante la ejecución y que guarda un checkpoint
+    ATRIBUTOS_ESTADO = ("pheromone", "current_base_pheromone")
+
+    def __init__(self, nodes: List[Tuple], edges: Dict[Tuple, List[Tuple]], initial_pheromone: float = 1.0,
+                 heuristica_estatica: Optional[Dict[Tuple[Tuple, Tuple], float]] = None):
         self.nodes = nodes
         self.edges = edges
+        # Componente estática de la heurística de cada arista (calcular_heuristica_estatica); sin ella
+        # las hormigas la calculan en cada paso
+        self.heuristica_estatica = heuristica_estatica
+        self._heuristica_beta = (None, None) # (beta, {arista: heuristica ** beta})
         self.initial_pheromone = initial_pheromone # El valor original de inicio
         self.current_base_pheromone = initial_pheromone # El nivel base que decae
         self.pheromone: Dict[Tuple[Tuple, Tuple], float] = {} 
         print("Graph initialized with nodes and edges.")
 
+    def heuristica_estatica_beta(self, beta: float) -> Optional[Dict[Tuple[Tuple, Tuple], float]]:
+        """ Potencias heuristica ** beta de la componente estática; se recalculan sólo si cambia beta """
+        if self.heuristica_estatica is None:
+            return None
+        if self._heuristica_beta[0] != beta:
+            self._heuristica_beta = (beta, {arista: valor ** beta for arista, valor in self.heuristica_estatica.items()})
+        return self._heuristica_beta[1]
+
     def get_pheromone(self, node1: Tuple, node2: Tuple) -> float:
         """Obtiene el nivel de feromona entre dos nodos."""
         # Si la arista tiene un valor explícito, se devuelve.
@@ -35,14 +52,70 @@ class Graph:
             else:
                 continue
 
-            for i in range(len(ant.visited) - 1):
-                node_from = ant.visited[i]
-                node_to = ant.visited[i+1]
-                edge = (node_from, node_to)
-
-                # Obtenemos el valor actual de la arista (explícito o el base_pheromone)
-                pheromone_before_deposit = self.get_pheromone(node_from, node_to)
-                new_explicit_value = pheromone_before_deposit + delta
-                
-                # Actualizamos la feromona de la arista con el nuevo valor explícito
-                self.pheromone[edge] = new_explicit_value
\ No newline at end of file
+            self.deposit_pheromone(ant.visited, delta)
+
+    def deposit_pheromone(self, path: List[Tuple], delta: float):
+        """Deposita la cantidad delta de feromona en cada arista recorrida por el camino dado, sin evaporación."""
+        for i in range(len(path) - 1):
+            node_from = path[i]
+            node_to = path[i+1]
+            edge = (node_from, node_to)
+
+            # Obtenemos el valor actual de la arista (explícito o el base_pheromone)
+            pheromone_before_deposit = self.get_pheromone(node_from, node_to)
+            new_explicit_value = pheromone_before_deposit + delta
+            
+            # Actualizamos la feromona de la arista con el nuevo valor explícito
+            self.pheromone[edge] = new_explicit_value
+
+    def estado_feromonas(self) -> Dict:
+        """ Copia del estado de las feromonas (ATRIBUTOS_ESTADO) para un checkpoint """
+        return {atributo: copy.copy(getattr(self, atributo)) for atributo in self.ATRIBUTOS_ESTADO}
+
+    def restaurar_estado_feromonas(self, estado: Dict):
+        """ Restaura exactamente un estado de estado_feromonas """
+        for atributo, valor in estado.items():
+            setattr(self, atributo, copy.copy(valor))
+
+    def exportar_feromonas(self) -> Dict:
+        """ Instantánea serializable (JSON) del nivel base y de las feromonas explícitas de las aristas """
+        return {
+            "base": self.current_base_pheromone,
+            "aristas": [[list(origen), list(destino), valor] for (origen, destino), valor in self.pheromone.items()],
+        }
+
+    def importar_feromonas(self, datos: Dict) -> Tuple[int, int]:
+        """
+        Carga una instantánea de exportar_feromonas. Las aristas que ya no existen en el grafo se
+        descartan. Devuelve (aristas cargadas, aristas descartadas).
+        """
+        self.current_base_pheromone = datos.get("base", self.current_base_pheromone)
+        cargadas = descartadas = 0
+        destinos = {}
+        for origen, destino, valor in datos.get("aristas", []):
+            origen, destino = tuple(origen), tuple(destino)
+            if origen not in destinos:
+                destinos[origen] = set(self.edges.get(origen, ()))
+            if destino in destinos[origen]:
+                self.pheromone[(origen, destino)] = valor
+                cargadas += 1
+            else:
+                descartadas += 1
+        return cargadas, descartadas
+
+    def branching_factor(self, nodes: List[Tuple], lambda_: float = 0.05) -> float:
+        """
+        Factor de ramificación lambda medio sobre los nodos dados: número de aristas salientes cuya
+        feromona supera tau_min + lambda * (tau_max - tau_min) de ese nodo. Valores cercanos a 1
+        indican que las feromonas han convergido (estancamiento).
+        """
+        factores = []
+        for node in nodes:
+            candidates = self.edges.get(node, [])
+            if not candidates:
+                continue
+            valores = [self.get_pheromone(node, candidate) for candidate in candidates]
+            tau_min, tau_max = min(valores), max(valores)
+            umbral = tau_min + lambda_ * (tau_max - tau_min)
+            factores.append(sum(1 for valor in valores if valor >= umbral))
+        return sum(factores) / len(factores) if factores else float('inf')
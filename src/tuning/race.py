@@ -0,0 +1,183 @@
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from typing import Dict, List, Tuple, Any, Optional
+
+from utils.scenario import VARIANTES, crear_colonia, preparar_escenario
+
+# Parámetros que se muestrean como enteros
+PARAMETROS_ENTEROS = {"n_ants", "iterations"}
+
+# Escenarios ya preparados en cada proceso del pool (la construcción del grafo es lo más costoso)
+_escenarios_cache: Dict[Tuple[str, bool], Dict[str, Any]] = {}
+
+
+def _cargar_modulo_main(variante: str):
+    if variante == "minmax":
+        import MinMax.main as modulo_main
+    else:
+        import Standard.main as modulo_main
+    return modulo_main
+
+
+def _evaluar(variante: str, ruta_escenario: str, params: Dict[str, Any], semilla: int) -> float:
+    """Ejecuta una colonia con los parámetros dados sobre un escenario y devuelve su mejor coste."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        clave = (ruta_escenario, bool(params.get("clases_recursos", False)), bool(params.get("plantillas_estudio", False)))
+        if clave not in _escenarios_cache:
+            config_data = _cargar_modulo_main(variante).get_configuration(ruta_escenario)
+            if config_data is None:
+                raise ValueError(f"No se pudo cargar el escenario {ruta_escenario}")
+            _escenarios_cache[clave] = preparar_escenario(config_data, clases_recursos=clave[1], plantillas_estudio=clave[2])
+        escenario = _escenarios_cache[clave]
+        if escenario is None:
+            raise ValueError(f"No se pudo preparar el escenario {ruta_escenario}")
+        aco = crear_colonia(variante, escenario, dict(params, seed=semilla))
+        _, best_cost = aco.run()
+    return best_cost
+
+
+def generar_candidatos(params_base: Dict[str, Any], rangos: Dict[str, List[float]],
+                       num_candidatos: int, semilla: int) -> List[Dict[str, Any]]:
+    """Genera candidatos muestreando uniformemente los rangos; el primero es siempre la configuración base."""
+    rng = random.Random(semilla)
+    candidatos = [dict(params_base)]
+    while len(candidatos) < num_candidatos:
+        candidato = dict(params_base)
+        for parametro, (minimo, maximo) in rangos.items():
+            if parametro in PARAMETROS_ENTEROS:
+                candidato[parametro] = rng.randint(int(minimo), int(maximo))
+            else:
+                candidato[parametro] = round(rng.uniform(minimo, maximo), 4)
+        candidatos.append(candidato)
+    return candidatos
+
+
+def _rangos_bloque(costes: List[float]) -> List[float]:
+    """Rangos (1 = mejor) de los costes de un bloque, promediando empates."""
+    orden = sorted(range(len(costes)), key=lambda i: costes[i])
+    rangos = [0.0] * len(costes)
+    i = 0
+    while i < len(orden):
+        j = i
+        while j + 1 < len(orden) and costes[orden[j + 1]] == costes[orden[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            rangos[orden[k]] = (i + j) / 2 + 1
+        i = j + 1
+    return rangos
+
+
+def _cuantil_chi2(probabilidad: float, grados: int) -> float:
+    """Aproximación de Wilson-Hilferty al cuantil de la chi-cuadrado."""
+    z = NormalDist().inv_cdf(probabilidad)
+    return grados * (1 - 2 / (9 * grados) + z * math.sqrt(2 / (9 * grados))) ** 3
+
+
+def _cuantil_t(probabilidad: float, grados: int) -> float:
+    """Aproximación de Cornish-Fisher al cuantil de la t de Student."""
+    z = NormalDist().inv_cdf(probabilidad)
+    return z + (z ** 3 + z) / (4 * grados)
+
+
+def eliminar_peores(resultados: List[List[float]], confianza: float) -> Tuple[List[int], Optional[float]]:
+    """
+    Test de Friedman sobre los bloques evaluados (filas = bloques, columnas = candidatos vivos) y,
+    si es significativo, comparación post-hoc de Conover de cada candidato con el de menor suma de
+    rangos, como en F-race. Devuelve los índices de columna que sobreviven y el estadístico.
+    """
+    num_bloques = len(resultados)
+    num_candidatos = len(resultados[0])
+    if num_candidatos < 2 or num_bloques < 2:
+        return list(range(num_candidatos)), None
+
+    rangos = [_rangos_bloque(fila) for fila in resultados]
+    sumas = [sum(fila[j] for fila in rangos) for j in range(num_candidatos)]
+    a = sum(r * r for fila in rangos for r in fila)
+    c = num_bloques * num_candidatos * (num_candidatos + 1) ** 2 / 4
+    if a - c <= 0: # Todos los candidatos empatados en todos los bloques
+        return list(range(num_candidatos)), 0.0
+    media = num_bloques * (num_candidatos + 1) / 2
+    estadistico = (num_candidatos - 1) * sum((s - media) ** 2 for s in sumas) / (a - c)
+    if estadistico <= _cuantil_chi2(confianza, num_candidatos - 1):
+        return list(range(num_candidatos)), estadistico
+
+    grados = (num_bloques - 1) * (num_candidatos - 1)
+    diferencia_critica = _cuantil_t(1 - (1 - confianza) / 2, grados) * math.sqrt(
+        2 * num_bloques * (a - c) / grados * (1 - estadistico / (num_bloques * (num_candidatos - 1))))
+    mejor = min(sumas)
+    return [j for j in range(num_candidatos) if sumas[j] - mejor <= diferencia_critica], estadistico
+
+
+def ejecutar_carrera(spec: Dict[str, Any], procesos: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Ejecuta la carrera: en cada bloque (escenario, semilla) se evalúan en paralelo todos los
+    candidatos vivos y, a partir de 'min_bloques', se eliminan los estadísticamente peores.
+    """
+    variante = spec.get("algoritmo", "standard")
+    if variante not in VARIANTES:
+        raise ValueError(f"Algoritmo desconocido '{variante}'. Disponibles: {', '.join(VARIANTES)}")
+    params_base = _cargar_modulo_main(variante).get_aco_params(spec["parametros_base"])
+    candidatos = generar_candidatos(params_base, spec["rangos"], spec.get("num_candidatos", 10),
+                                    spec.get("semilla_muestreo", 777))
+    bloques = [(escenario, semilla) for semilla in spec["semillas"] for escenario in spec["escenarios"]]
+    min_bloques = spec.get("min_bloques", 3)
+    confianza = spec.get("nivel_confianza", 0.95)
+
+    vivos = list(range(len(candidatos)))
+    resultados: Dict[int, List[float]] = {i: [] for i in vivos}
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        for num_bloque, (escenario, semilla) in enumerate(bloques, start=1):
+            futuros = {i: pool.submit(_evaluar, variante, escenario, candidatos[i], semilla) for i in vivos}
+            for i, futuro in futuros.items():
+                resultados[i].append(futuro.result())
+            print(f"Bloque {num_bloque}/{len(bloques)} ({os.path.basename(escenario)}, semilla {semilla}) evaluado con {len(vivos)} candidatos")
+
+            if num_bloque >= min_bloques and len(vivos) > 1:
+                matriz = [[resultados[i][b] for i in vivos] for b in range(num_bloque)]
+                supervivientes, estadistico = eliminar_peores(matriz, confianza)
+                eliminados = [vivos[j] for j in range(len(vivos)) if j not in supervivientes]
+                vivos = [vivos[j] for j in supervivientes]
+                if eliminados:
+                    print(f"Bloque {num_bloque}/{len(bloques)}: Friedman={estadistico:.2f}, eliminados {eliminados}, quedan {len(vivos)}")
+            if len(vivos) == 1:
+                break
+
+    # Ganador: menor rango medio entre los supervivientes sobre los bloques comunes
+    num_evaluados = min(len(resultados[i]) for i in vivos)
+    rangos = [_rangos_bloque([resultados[i][b] for i in vivos]) for b in range(num_evaluados)]
+    rango_medio = {i: sum(fila[j] for fila in rangos) / num_evaluados for j, i in enumerate(vivos)}
+    ganador = min(vivos, key=lambda i: (rango_medio[i], i))
+    return {
+        "ganador": candidatos[ganador],
+        "indice_ganador": ganador,
+        "supervivientes": vivos,
+        "candidatos": candidatos,
+        "resultados": resultados,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Carrera de hiperparámetros (F-race) para Standard.ACO y MinMax.MinMaxACO.")
+    parser.add_argument("spec", help="Fichero JSON con algoritmo, escenarios, parametros_base, rangos, semillas...")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos del pool (por defecto, número de CPUs).")
+    parser.add_argument("--salida", default=None, help="Ruta del params_config.json ganador.")
+    args = parser.parse_args()
+
+    with open(args.spec, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    resultado = ejecutar_carrera(spec, procesos=args.procesos)
+
+    salida = args.salida or spec.get("salida", "params_config_tuned.json")
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(resultado["ganador"], f, indent=4)
+    costes = resultado["resultados"][resultado["indice_ganador"]]
+    print(f"\nCandidato ganador {resultado['indice_ganador']} (supervivientes: {resultado['supervivientes']})")
+    print(f"Costes del ganador por bloque: {costes}")
+    print(f"Parámetros guardados en {salida}")
@@ -1,8 +1,11 @@
 import random
-from typing import List, Dict, Tuple, Set, TYPE_CHECKING
+from typing import List, Dict, Tuple, Set, Optional, TYPE_CHECKING
 from collections import defaultdict
 import datetime
 
+from utils.penalties import PENALIZACION_CONFLICTO_RECURSO, MINUTOS_POR_DIA, penalizacion_entre_fases
+from utils.generate_graph_components import heuristica_transicion, HEURISTICA_BASE, HEURISTICA_MINIMA
+
 if TYPE_CHECKING:
     from Standard.Graph import Graph
 
@@ -11,8 +14,14 @@ class Ant:
                  pacientes: List[str], duracion_consultas: int,
                  num_dias_planificacion: int,
                  alpha: float = 1.0, beta: float = 1.0,
-                 max_fases_por_dia_paciente: int = 2):
+                 max_fases_por_dia_paciente: int = 2,
+                 rng: Optional[random.Random] = None,
+                 capacidad_recursos: Optional[Dict[str, int]] = None,
+                 horas_disponibles: Optional[List[str]] = None,
+                 comprobacion_anticipada: bool = False):
         self.graph = graph
+        # Generador propio de la hormiga para que sus decisiones no dependan del orden de ejecución
+        self.rng = rng if rng is not None else random.Random()
         self.alpha = alpha
         self.beta = beta
         self.visited: List[Tuple] = [] # Tuple: (pac, cons, day, hora_str, personal, fase)
@@ -31,22 +40,99 @@ class Ant:
         self.total_cost: float = 0.0
         self.valid_solution = False
         self.max_fases_por_dia_paciente = max_fases_por_dia_paciente
+        # Capacidad de cada recurso del grafo (clases de recursos); sin ella cada recurso es único
+        self.capacidad_recursos = capacidad_recursos or {}
+
+        # Comprobación anticipada: descarta movimientos tras los que el paciente ya no puede completar
+        # sus fases en el horizonte. Necesita las horas de un día tipo para contar los huecos restantes.
+        self.comprobacion_anticipada = comprobacion_anticipada and bool(horas_disponibles)
+        self._indice_hora = {h: i for i, h in enumerate(horas_disponibles or [])}
+        self._fases_por_dia_completo = min(max_fases_por_dia_paciente, len(self._indice_hora))
+        # Transiciones que llevaron a un callejón sin salida en la reparación: {nodo_origen: {nodos}}
+        self.transiciones_descartadas: Dict[Optional[Tuple], Set[Tuple]] = defaultdict(set)
+
+        # Coste parcial de la construcción (conflictos de recursos, esperas y días vacíos) con las mismas
+        # penalizaciones que calcular_coste: como sólo puede crecer, es una cota inferior del coste final
+        self.coste_parcial = 0.0
+        self.abandonada = False
+        self._ocupacion_recursos = defaultdict(int) # (recurso, dia, hora_str) -> asignaciones
+        self._ultima_fase_paciente: Dict[str, Tuple[int, int]] = {} # paciente -> (dia, fin en minutos absolutos)
+        self._incrementos_coste: List[Tuple[float, Optional[Tuple[int, int]]]] = [] # Para deshacer movimientos
+        self._minutos_hora: Dict[str, int] = {}
+
+        # Potencias heuristica ** beta de la componente estática de cada arista, compartidas por el grafo
+        self._tabla_beta = graph.heuristica_estatica_beta(beta)
+        self._heuristica_minima_beta = HEURISTICA_MINIMA ** beta
+
+    def reiniciar(self):
+        """ Deja la hormiga lista para construir un nuevo recorrido """
+        self.visited = []
+        self.pacientes_progreso.clear()
+        self.paciente_dia_fase_contador.clear()
+        self.current_node = None
+        self.valid_solution = False
+        self.transiciones_descartadas.clear()
+        self.coste_parcial = 0.0
+        self.abandonada = False
+        self._ocupacion_recursos.clear()
+        self._ultima_fase_paciente.clear()
+        self._incrementos_coste = []
+
+    def _paciente_de(self, node: Tuple) -> Optional[str]:
+        """ Paciente al que corresponde un nodo del grafo si la hormiga lo visita """
+        return node[0]
+
+    def _registrar_asignacion(self, node: Tuple, paciente: str):
+        """ Se llama al visitar un nodo, con el paciente asignado (para subclases) """
+        pass
+
+    def _deshacer_asignacion(self, node: Tuple) -> str:
+        """ Se llama al deshacer la visita de un nodo; devuelve el paciente que tenía asignado """
+        return node[0]
+
+    def solucion(self) -> List[Tuple]:
+        """ Asignaciones (paciente, consulta, dia, hora, personal, fase) de la hormiga en orden de visita """
+        return self.visited
+
+    def _completable_tras(self, node: Tuple, paciente: str) -> bool:
+        """
+        Comprobación anticipada: indica si, tras visitar 'node', las fases restantes del paciente aún
+        caben en los huecos libres de ese día y en los días siguientes con el máximo de fases por día.
+        El límite diario es por paciente, así que un movimiento sólo puede dejar sin completar a su
+        propio paciente; los demás pacientes sin programar conservan todas sus opciones.
+        """
+        orden_fases = self.paciente_to_estudio_info[paciente]["orden_fases"]
+        fases_restantes = max(orden_fases.values()) - orden_fases.get(node[5], 0)
+        if fases_restantes <= 0:
+            return True
+        dia_idx, hora_idx = node[2], self._indice_hora.get(node[3])
+        if hora_idx is None:
+            return True
+        fases_hoy = self.paciente_dia_fase_contador[paciente][dia_idx] + 1
+        huecos_hoy = min(self.max_fases_por_dia_paciente - fases_hoy, len(self._indice_hora) - 1 - hora_idx)
+        huecos_dias_siguientes = (self.num_dias_planificacion - 1 - dia_idx) * self._fases_por_dia_completo
+        return fases_restantes <= max(0, huecos_hoy) + huecos_dias_siguientes
 
     def choose_next_node(self) -> Tuple:
         """ Elige el siguiente nodo basado en la heurística y las feromonas."""
         if self.current_node is None:
-            valid_initial_nodes = [
-                node for node in self.graph.nodes
-                if node[0] in self.paciente_to_estudio_info and \
-                   self.paciente_to_estudio_info[node[0]]["orden_fases"].get(node[5]) == 1
-            ]
-            return random.choice(valid_initial_nodes) if valid_initial_nodes else None
+            valid_initial_nodes = []
+            descartados = self.transiciones_descartadas.get(None, ())
+            for node in self.graph.nodes:
+                paciente = self._paciente_de(node)
+                if paciente in self.paciente_to_estudio_info and \
+                   self.paciente_to_estudio_info[paciente]["orden_fases"].get(node[5]) == 1 and \
+                   node not in descartados and \
+                   (not self.comprobacion_anticipada or self._completable_tras(node, paciente)):
+                    valid_initial_nodes.append(node)
+            return self.rng.choice(valid_initial_nodes) if valid_initial_nodes else None
         else:
             candidates = self.graph.edges.get(self.current_node, [])
+            descartados = self.transiciones_descartadas.get(self.current_node, ())
 
             filtered_candidates = []
             for node_candidate in candidates:
-                paciente_candidato = node_candidate[0]
+                paciente_candidato = self._paciente_de(node_candidate)
                 dia_candidato = node_candidate[2]
                 fase_candidata = node_candidate[5]
 
@@ -64,6 +150,12 @@ class Ant:
                 # Maximo N fases por paciente por día
                 if self.paciente_dia_fase_contador[paciente_candidato][dia_candidato] >= self.max_fases_por_dia_paciente:
                     continue 
+
+                if node_candidate in descartados:
+                    continue # Lleva a un callejón sin salida desde el nodo actual
+
+                if self.comprobacion_anticipada and not self._completable_tras(node_candidate, paciente_candidato):
+                    continue # El paciente no podría completar sus fases restantes
                 
                 filtered_candidates.append(node_candidate)
 
@@ -75,96 +167,81 @@ class Ant:
             total_prob_weight = 0.0
 
             for node_cand in filtered_candidates:
-                heuristic = self.calcular_heuristica(node_cand)
                 pheromone = self.graph.get_pheromone(self.current_node, node_cand)
-                candidate_weight = (pheromone ** self.alpha) * (heuristic ** self.beta)
+                candidate_weight = (pheromone ** self.alpha) * self._heuristica_beta(node_cand)
 
                 candidate_list.append(node_cand)
                 probabilities.append(candidate_weight)
                 total_prob_weight += candidate_weight
 
             normalized_probabilities = [p / total_prob_weight for p in probabilities]
-            return random.choices(candidate_list, weights=normalized_probabilities, k=1)[0]
+            return self.rng.choices(candidate_list, weights=normalized_probabilities, k=1)[0]
 
 
     def calcular_heuristica(self, node_to_evaluate: Tuple) -> float:
         """
         Calcula la heurística para un nodo dado, considerando restricciones de tiempo y recursos.
         Nodo: (paciente, consulta, dia_idx, hora_str, personal_instancia, fase_nombre)
+        Combina la componente estática de la transición desde el nodo actual (precalculada en el
+        grafo) con la dinámica: un conflicto de recursos con lo ya visitado la lleva al mínimo.
         """
-        pac_eval, con_eval, day_eval, hora_eval_str, personal_instancia_eval, fase_eval = node_to_evaluate
-
-        score = 10.0
-
+        pac_eval = self._paciente_de(node_to_evaluate)
         if pac_eval not in self.paciente_to_estudio_info:
              return 0.001 
         
         # Máximo N fases por paciente por día
-        if self.paciente_dia_fase_contador[pac_eval][day_eval] >= self.max_fases_por_dia_paciente:
+        if self.paciente_dia_fase_contador[pac_eval][node_to_evaluate[2]] >= self.max_fases_por_dia_paciente:
             return 0.0001 # Heurística muy baja
 
-        try:
-            hora_parts_eval = hora_eval_str.split(':')
-            node_eval_mins_of_day = int(hora_parts_eval[0]) * 60 + int(hora_parts_eval[1])
-        except Exception:
-            raise ValueError(f"Cadena de hora mal formada: {hora_eval_str}")
-        if self.current_node:
-            # curr_node: (pac, cons, day, hora_str, personal_instancia, fase)
-            curr_pac, _, curr_day, curr_hora_str, _, curr_fase = self.current_node
-
-            if pac_eval == curr_pac: # Mismo paciente
-                try:
-                    current_hora_parts = curr_hora_str.split(':')
-                    current_node_mins_of_day = int(current_hora_parts[0]) * 60 + int(current_hora_parts[1])
-                    current_node_end_mins_of_day = current_node_mins_of_day + self.duracion_consultas
-                except ValueError: return 0.001
-
-                if day_eval == curr_day:
-                    if node_eval_mins_of_day < current_node_end_mins_of_day:
-                         score -= 1000.0 # Fuerte penalización por solapamiento del mismo paciente en el mismo día
-                    else:
-                        tiempo_espera_mismo_paciente_dia = node_eval_mins_of_day - current_node_end_mins_of_day
-                        bonus_menor_tiempo_espera = 100.0
-                        if tiempo_espera_mismo_paciente_dia <= 120: # Hasta 2 horas
-                            factor_prontitud = (120.0 - tiempo_espera_mismo_paciente_dia) / 120.0
-                            score += factor_prontitud * bonus_menor_tiempo_espera
-                elif day_eval < curr_day:
-                    score -= 2000.0 # Penalización por ir hacia atrás en días para el mismo paciente
-
-        node_eval_end_mins_of_day = node_eval_mins_of_day + self.duracion_consultas
-
-        # Chequear conflictos de recursos (personal/consulta) con nodos ya visitados
-        for v_node in self.visited:
-            v_pac, v_con, v_day, v_hora_str, v_personal_instancia, v_fase = v_node
-
-            if v_day == day_eval: # Conflicto de recurso solo si es en el mismo día
-                try:
-                    v_hora_parts = v_hora_str.split(':')
-                    v_mins_of_day = int(v_hora_parts[0]) * 60 + int(v_hora_parts[1])
-                    v_end_mins_of_day = v_mins_of_day + self.duracion_consultas
-                except ValueError: continue
-
-                # Comprobar superposición de tiempo
-                time_overlap = (node_eval_mins_of_day < v_end_mins_of_day and
-                                v_mins_of_day < node_eval_end_mins_of_day)
-
-                if time_overlap:
-                    if v_personal_instancia == personal_instancia_eval: # Misma instancia de personal
-                        score -= 10000.0
-                    if v_con == con_eval and v_pac != pac_eval: # Misma consulta
-                        score -= 10000.0
-
-        return max(0.001, score)
+        if self._conflicto_recursos(node_to_evaluate):
+            return HEURISTICA_MINIMA
+        return self._heuristica_estatica(node_to_evaluate)
+
+    def _heuristica_estatica(self, node: Tuple) -> float:
+        """ Componente estática de la heurística de la transición desde el nodo actual """
+        if self.current_node is None:
+            return HEURISTICA_BASE
+        tabla = self.graph.heuristica_estatica
+        if tabla is not None:
+            valor = tabla.get((self.current_node, node))
+            if valor is not None:
+                return valor
+        mismo_paciente = self._paciente_de(node) == self.solucion()[-1][0]
+        return heuristica_transicion(self.current_node, node, self.duracion_consultas, mismo_paciente)
+
+    def _heuristica_beta(self, node: Tuple) -> float:
+        """ heuristica ** beta de un candidato ya filtrado, usando las potencias precalculadas del grafo """
+        if self._conflicto_recursos(node):
+            return self._heuristica_minima_beta
+        if self._tabla_beta is not None and self.current_node is not None:
+            valor = self._tabla_beta.get((self.current_node, node))
+            if valor is not None:
+                return valor
+        return self._heuristica_estatica(node) ** self.beta
+
+    def _conflicto_recursos(self, node: Tuple) -> bool:
+        """
+        Componente dinámica: el personal o la consulta del nodo ya están llenos en ese hueco según la
+        tabla de ocupación de la hormiga (cada cita ocupa exactamente un hueco del día).
+        """
+        _, consulta, dia_idx, hora_str, personal_instancia, _ = node
+        return self._ocupacion_recursos.get((personal_instancia, dia_idx, hora_str), 0) >= \
+               self.capacidad_recursos.get(personal_instancia, 1) or \
+               self._ocupacion_recursos.get((consulta, dia_idx, hora_str), 0) >= \
+               self.capacidad_recursos.get(consulta, 1)
 
 
     def move(self, node: Tuple):
         """ Mueve la hormiga al siguiente nodo, actualizando su estado y progreso."""
+        paciente = self._paciente_de(node)
         self.current_node = node
         self.visited.append(node)
+        self._registrar_asignacion(node, paciente)
         # Nodo: (paciente, consulta, dia_idx, hora_str, personal_instancia, fase_nombre)
-        paciente, _, dia_idx, hora_str, _, fase = node
+        _, _, dia_idx, hora_str, _, fase = node
         self.pacientes_progreso[paciente][fase] = (dia_idx, hora_str)
         self.paciente_dia_fase_contador[paciente][dia_idx] += 1
+        self._acumular_coste_parcial(self.solucion()[-1])
         
         num_total_fases_programadas = sum(len(fases_dict) for fases_dict in self.pacientes_progreso.values())
         
@@ -176,4 +253,66 @@ class Ant:
         if num_total_fases_programadas == num_total_fases_esperadas and num_total_fases_esperadas > 0 :
             self.valid_solution = True
         else:
-            self.valid_solution = False
\ No newline at end of file
+            self.valid_solution = False
+    def deshacer_movimiento(self) -> Tuple:
+        """ Deshace la última visita de la hormiga, restaurando su progreso, y devuelve el nodo deshecho """
+        node = self.visited.pop()
+        paciente = self._deshacer_asignacion(node)
+        _, _, dia_idx, _, _, fase = node
+        self.pacientes_progreso[paciente].pop(fase, None)
+        if not self.pacientes_progreso[paciente]:
+            del self.pacientes_progreso[paciente]
+        self.paciente_dia_fase_contador[paciente][dia_idx] -= 1
+        self._descontar_coste_parcial(node, paciente)
+        self.current_node = self.visited[-1] if self.visited else None
+        self.valid_solution = False
+        return node
+
+    def retroceder(self):
+        """
+        Reparación de un callejón sin salida: deshace la última visita y prohíbe esa transición desde
+        el nodo anterior, de modo que la hormiga elija otra alternativa al reanudar la construcción.
+        """
+        node = self.deshacer_movimiento()
+        self.transiciones_descartadas[self.current_node].add(node)
+
+    def _minutos_del_dia(self, hora_str: str) -> int:
+        if hora_str not in self._minutos_hora:
+            horas, minutos = hora_str.split(':')
+            self._minutos_hora[hora_str] = int(horas) * 60 + int(minutos)
+        return self._minutos_hora[hora_str]
+
+    def _acumular_coste_parcial(self, asignacion: Tuple):
+        """
+        Suma al coste parcial lo que la nueva asignación añade con seguridad al coste final: un
+        conflicto por cada recurso ya lleno en ese hueco y la penalización respecto a la fase anterior
+        del paciente (las fases de un paciente se visitan en orden).
+        """
+        paciente, consulta, dia_idx, hora_str, personal_instancia, _ = asignacion
+        incremento = 0.0
+        for recurso in (personal_instancia, consulta):
+            clave = (recurso, dia_idx, hora_str)
+            if self._ocupacion_recursos[clave] >= self.capacidad_recursos.get(recurso, 1):
+                incremento += PENALIZACION_CONFLICTO_RECURSO
+            self._ocupacion_recursos[clave] += 1
+
+        inicio_abs = dia_idx * MINUTOS_POR_DIA + self._minutos_del_dia(hora_str)
+        fase_anterior = self._ultima_fase_paciente.get(paciente)
+        if fase_anterior is not None:
+            incremento += penalizacion_entre_fases(fase_anterior[0], fase_anterior[1], dia_idx, inicio_abs)
+        self._ultima_fase_paciente[paciente] = (dia_idx, inicio_abs + self.duracion_consultas)
+
+        self._incrementos_coste.append((incremento, fase_anterior))
+        self.coste_parcial += incremento
+
+    def _descontar_coste_parcial(self, node: Tuple, paciente: str):
+        """ Revierte la contribución al coste parcial de la última asignación deshecha """
+        _, consulta, dia_idx, hora_str, personal_instancia, _ = node
+        incremento, fase_anterior = self._incrementos_coste.pop()
+        self.coste_parcial -= incremento
+        for recurso in (personal_instancia, consulta):
+            self._ocupacion_recursos[(recurso, dia_idx, hora_str)] -= 1
+        if fase_anterior is None:
+            self._ultima_fase_paciente.pop(paciente, None)
+        else:
+            self._ultima_fase_paciente[paciente] = fase_anterior
@@ -0,0 +1,90 @@
+import json
+import os
+from typing import Dict, List, Any
+
+# Límites por defecto de los parámetros ajustables
+LIMITES_POR_DEFECTO = {
+    "alpha": [0.5, 3.0],
+    "beta": [1.0, 8.0],
+    "rho": [0.01, 0.3],
+    "n_ants": [10, 100],
+}
+
+
+class ControlAdaptativo:
+    """
+    Ajusta alpha, beta, rho y n_ants durante la ejecución a partir de las señales de cada iteración:
+    - Muchas hormigas bloqueadas (sin solución válida): más peso a la heurística (beta) y más hormigas.
+    - Poca diversidad entre hormigas: menos peso a las feromonas (alpha) y evaporación más rápida (rho).
+    - Mucha diversidad sin mejoras: más peso a las feromonas y evaporación más lenta.
+    - Mejora del mejor coste: se reduce la colonia; estancamiento prolongado: se amplía.
+    Cada ajuste multiplica el parámetro por (1 ± factor) y se limita al rango configurado.
+    """
+    def __init__(self, config: Dict[str, Any]):
+        self.factor = config.get("factor", 0.1)
+        self.diversidad_min = config.get("diversidad_min", 0.1)
+        self.diversidad_max = config.get("diversidad_max", 0.6)
+        self.ratio_bloqueo_max = config.get("ratio_bloqueo_max", 0.3)
+        self.iteraciones_sin_mejora = config.get("iteraciones_sin_mejora", 5)
+        self.limites = dict(LIMITES_POR_DEFECTO)
+        self.limites.update(config.get("limites", {}))
+        self._sin_mejora = 0
+
+    def _escalar(self, aco, parametro: str, factor: float, cambios: List[str]):
+        minimo, maximo = self.limites[parametro]
+        actual = getattr(aco, parametro)
+        nuevo = min(max(actual * factor, minimo), maximo)
+        if parametro == "n_ants":
+            nuevo = int(round(nuevo))
+        if nuevo != actual:
+            setattr(aco, parametro, nuevo)
+            cambios.append(f"{parametro}: {actual:.4g} -> {nuevo:.4g}")
+
+    def ajustar(self, aco, iteration: int, estadisticas: Dict[str, Any]) -> Dict[str, Any]:
+        """Aplica los ajustes a la colonia y devuelve el registro de la iteración."""
+        mejora = estadisticas["mejora"]
+        diversidad = estadisticas["diversidad"]
+        ratio_bloqueadas = estadisticas["ratio_bloqueadas"]
+        self._sin_mejora = 0 if mejora else self._sin_mejora + 1
+
+        cambios = []
+        if ratio_bloqueadas > self.ratio_bloqueo_max:
+            self._escalar(aco, "beta", 1 + self.factor, cambios)
+            self._escalar(aco, "n_ants", 1 + self.factor, cambios)
+        if diversidad is not None and diversidad < self.diversidad_min:
+            self._escalar(aco, "alpha", 1 - self.factor, cambios)
+            self._escalar(aco, "rho", 1 + self.factor, cambios)
+        elif diversidad is not None and diversidad > self.diversidad_max and not mejora:
+            self._escalar(aco, "alpha", 1 + self.factor, cambios)
+            self._escalar(aco, "rho", 1 - self.factor, cambios)
+        if mejora:
+            self._escalar(aco, "n_ants", 1 - self.factor, cambios)
+        elif self._sin_mejora >= self.iteraciones_sin_mejora:
+            self._escalar(aco, "n_ants", 1 + self.factor, cambios)
+            self._sin_mejora = 0
+
+        return {
+            "iteracion": iteration,
+            "mejora": mejora,
+            "diversidad": diversidad,
+            "ratio_bloqueadas": ratio_bloqueadas,
+            "alpha": aco.alpha,
+            "beta": aco.beta,
+            "rho": aco.rho,
+            "n_ants": aco.n_ants,
+            "cambios": cambios,
+        }
+
+
+def guardar_registro_adaptativo(registro: List[Dict[str, Any]], output_dir: str, filename: str = "ajustes_adaptativos.json"):
+    """Guarda en JSON el registro por iteración de los ajustes adaptativos para poder auditarlos."""
+    if not registro:
+        return
+    os.makedirs(output_dir, exist_ok=True)
+    ruta = os.path.join(output_dir, filename)
+    try:
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(registro, f, ensure_ascii=False, indent=2)
+        print(f"Registro de ajustes adaptativos guardado en {ruta}")
+    except Exception as e:
+        print(f"Error guardando registro de ajustes adaptativos: {e}")
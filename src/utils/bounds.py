@@ -0,0 +1,123 @@
+import math
+from itertools import combinations
+from typing import List, Dict, Any, Optional, FrozenSet
+
+from utils.scenario import generar_horas_disponibles
+
+# Por encima de este número de roles no se enumeran todos los subconjuntos
+MAX_ROLES_ENUMERABLES = 16
+
+
+def analizar_capacidad(config_data: Dict[str, Any], horas_disponibles: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Compara la demanda de huecos (una fase ocupa un hueco de personal y uno de consulta) con la
+    oferta del escenario:
+    - consultas: fases totales frente a consultas x horas x días.
+    - roles: para cada conjunto de roles, las fases que sólo pueden hacer esos roles frente a los
+      huecos de su personal (condición de Hall; basta con que un conjunto no llegue).
+    - pacientes: fases de cada paciente frente a los días x max_fases_por_dia_paciente disponibles.
+    """
+    if horas_disponibles is None:
+        horas_disponibles = generar_horas_disponibles(config_data["hora_inicio"], config_data["hora_fin"],
+                                                      config_data["intervalo_consultas_minutos"])
+    num_slots = len(horas_disponibles)
+    num_dias = config_data["num_dias_planificacion"]
+    huecos_por_recurso = num_slots * num_dias
+    max_fases_por_dia = config_data.get("max_fases_por_dia_paciente", 2)
+    personal = config_data["personal"]
+
+    # Roles con personal que pueden hacer cada fase
+    roles_por_fase: Dict[str, FrozenSet[str]] = {}
+    for rol, fases in config_data["cargos"].items():
+        if personal.get(rol, 0) <= 0:
+            continue
+        for fase in fases:
+            roles_por_fase[fase] = roles_por_fase.get(fase, frozenset()) | {rol}
+
+    demanda_por_roles: Dict[FrozenSet[str], int] = {}
+    fases_sin_personal = set()
+    pacientes = []
+    total_fases = 0
+    for estudio in config_data["tipos_estudio"]:
+        fases_estudio = list(estudio["orden_fases"])
+        for paciente in estudio["pacientes"]:
+            total_fases += len(fases_estudio)
+            for fase in fases_estudio:
+                roles = roles_por_fase.get(fase)
+                if not roles:
+                    fases_sin_personal.add(fase)
+                    continue
+                demanda_por_roles[roles] = demanda_por_roles.get(roles, 0) + 1
+            max_fases = num_dias * min(max_fases_por_dia, num_slots)
+            pacientes.append({
+                "paciente": paciente,
+                "estudio": estudio["nombre_estudio"],
+                "fases": len(fases_estudio),
+                "max_fases": max_fases,
+                "dias_minimos": math.ceil(len(fases_estudio) / max_fases_por_dia) if max_fases_por_dia > 0 else None,
+                "deficit": max(0, len(fases_estudio) - max_fases),
+            })
+
+    # Condición de Hall sobre conjuntos de roles: basta con las uniones de los conjuntos demandados
+    roles_implicados = sorted(set().union(*demanda_por_roles)) if demanda_por_roles else []
+    if len(roles_implicados) <= MAX_ROLES_ENUMERABLES:
+        conjuntos = [frozenset(c) for k in range(1, len(roles_implicados) + 1)
+                     for c in combinations(roles_implicados, k)]
+    else:
+        conjuntos = list(demanda_por_roles) + [frozenset(roles_implicados)]
+    roles = []
+    for conjunto in conjuntos:
+        demanda = sum(n for roles_fase, n in demanda_por_roles.items() if roles_fase <= conjunto)
+        if demanda == 0:
+            continue
+        oferta = sum(personal[rol] for rol in conjunto) * huecos_por_recurso
+        roles.append({"roles": sorted(conjunto), "demanda": demanda, "oferta": oferta, "exceso": max(0, demanda - oferta)})
+
+    oferta_consultas = len(config_data["consultas"]) * huecos_por_recurso
+    return {
+        "consultas": {"demanda": total_fases, "oferta": oferta_consultas, "exceso": max(0, total_fases - oferta_consultas)},
+        "roles": roles,
+        "pacientes": pacientes,
+        "fases_sin_personal": sorted(fases_sin_personal),
+    }
+
+
+def diagnosticar_inviabilidad(analisis: Dict[str, Any]) -> List[str]:
+    """Devuelve un mensaje por cada motivo por el que el escenario no admite una planificación sin penalizaciones."""
+    problemas = []
+    if analisis["fases_sin_personal"]:
+        problemas.append(f"Fases sin personal disponible: {', '.join(analisis['fases_sin_personal'])}.")
+    consultas = analisis["consultas"]
+    if consultas["exceso"] > 0:
+        problemas.append(f"Consultas: se necesitan {consultas['demanda']} huecos y hay {consultas['oferta']} "
+                         f"(faltan {consultas['exceso']}).")
+    # Sólo los conjuntos de roles mínimos: los que los contienen heredan su falta de huecos
+    violados = [set(r["roles"]) for r in analisis["roles"] if r["exceso"] > 0]
+    for r in analisis["roles"]:
+        if r["exceso"] > 0 and not any(v < set(r["roles"]) for v in violados):
+            problemas.append(f"Roles {'/'.join(r['roles'])}: {r['demanda']} fases sólo pueden hacerlas estos roles "
+                             f"y tienen {r['oferta']} huecos (faltan {r['exceso']}).")
+    for p in analisis["pacientes"]:
+        if p["deficit"] > 0:
+            problemas.append(f"Paciente {p['paciente']} ({p['estudio']}): {p['fases']} fases y sólo caben {p['max_fases']} "
+                             f"en los días de planificación (necesita al menos {p['dias_minimos']} días).")
+    return problemas
+
+
+def comprobar_viabilidad(config_data: Dict[str, Any]) -> bool:
+    """
+    Comprobación previa a la construcción del grafo: compara la demanda de huecos con la oferta
+    del escenario y muestra un diagnóstico de cada restricción que no puede cumplirse.
+    """
+    horas = generar_horas_disponibles(config_data["hora_inicio"], config_data["hora_fin"],
+                                      config_data["intervalo_consultas_minutos"])
+    if not horas:
+        print("Error: El escenario no tiene horas disponibles. Revise hora_inicio, hora_fin e intervalo.")
+        return False
+    problemas = diagnosticar_inviabilidad(analizar_capacidad(config_data, horas))
+    if problemas:
+        print("Error: El escenario no tiene capacidad suficiente para una planificación válida:")
+        for problema in problemas:
+            print(f"  - {problema}")
+        return False
+    return True
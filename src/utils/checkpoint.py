@@ -0,0 +1,47 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from typing import Dict, Any, Optional
+
+
+def huella_escenario(config_data: Dict[str, Any], seed: int, num_nodos: int) -> str:
+    """ Huella del escenario de una colonia: un checkpoint sólo se reanuda sobre el mismo escenario """
+    material = json.dumps([config_data, seed, num_nodos], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def guardar_checkpoint(ruta: str, estado: Dict[str, Any]):
+    """
+    Escribe el checkpoint de forma atómica: se serializa en un archivo temporal del mismo
+    directorio y se sustituye el anterior con os.replace, así que una interrupción a mitad de la
+    escritura deja intacto el último checkpoint completo.
+    """
+    directorio = os.path.dirname(ruta) or "."
+    os.makedirs(directorio, exist_ok=True)
+    descriptor, ruta_temporal = tempfile.mkstemp(dir=directorio, prefix=".checkpoint_", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            pickle.dump(estado, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(ruta_temporal, 0o644)
+        os.replace(ruta_temporal, ruta)
+    except BaseException:
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+        raise
+
+
+def cargar_checkpoint(ruta: str) -> Optional[Dict[str, Any]]:
+    """ Carga un checkpoint de guardar_checkpoint, o None (con un aviso) si no existe o no se puede leer """
+    if not os.path.exists(ruta):
+        print(f"Aviso: no existe el checkpoint '{ruta}'; la ejecución empieza desde el principio.")
+        return None
+    try:
+        with open(ruta, "rb") as f:
+            return pickle.load(f)
+    except Exception as e:
+        print(f"Aviso: no se pudo leer el checkpoint '{ruta}' ({e}); la ejecución empieza desde el principio.")
+        return None
@@ -0,0 +1,267 @@
+import copy
+import math
+import multiprocessing as mp
+import time
+from collections import defaultdict
+from typing import List, Dict, Tuple, Any
+
+from utils.rng import derivar_semilla, derivar_rng
+from utils.scenario import preparar_escenario, crear_colonia
+
+MODOS_DESCOMPOSICION = ("dias", "estudios")
+
+
+def _carga_estudio(estudio: Dict[str, Any]) -> int:
+    return len(estudio["pacientes"]) * len(estudio["orden_fases"])
+
+
+def _subconfiguracion(config_data: Dict[str, Any], pacientes: set, **cambios) -> Dict[str, Any]:
+    """ Copia de la configuración con sólo los pacientes indicados (y sin los estudios que quedan vacíos) """
+    sub_config = copy.deepcopy(config_data)
+    sub_config["tipos_estudio"] = [dict(estudio, pacientes=[p for p in estudio["pacientes"] if p in pacientes])
+                                   for estudio in sub_config["tipos_estudio"]]
+    sub_config["tipos_estudio"] = [estudio for estudio in sub_config["tipos_estudio"] if estudio["pacientes"]]
+    sub_config.update(cambios)
+    return sub_config
+
+
+def particionar_por_dias(config_data: Dict[str, Any], dias_por_ventana: int) -> List[Dict[str, Any]]:
+    """
+    Divide el horizonte en ventanas consecutivas de 'dias_por_ventana' días y reparte los pacientes
+    entre ellas en proporción a su número de días. Cada paciente se planifica entero dentro de su
+    ventana y las ventanas no se solapan en el tiempo, así que no compiten por los recursos.
+    Devuelve una sola ventana si algún estudio no cabe en la ventana más corta.
+    """
+    num_dias = config_data["num_dias_planificacion"]
+    dias_por_ventana = max(1, min(dias_por_ventana, num_dias))
+    ventanas = [(inicio, min(dias_por_ventana, num_dias - inicio)) for inicio in range(0, num_dias, dias_por_ventana)]
+    max_fases_por_dia = config_data.get("max_fases_por_dia_paciente", 2)
+    dias_minimos = max((math.ceil(len(estudio["orden_fases"]) / max_fases_por_dia)
+                        for estudio in config_data["tipos_estudio"]), default=1)
+    if min(dias for _, dias in ventanas) < dias_minimos:
+        print(f"Aviso: algún estudio necesita {dias_minimos} días y no cabe en las ventanas de {dias_por_ventana} días; "
+              f"se usa una única ventana.")
+        ventanas = [(0, num_dias)]
+
+    # Reparto voraz: los pacientes con más fases primero, a la ventana con menos carga por día
+    pacientes = sorted(((len(estudio["orden_fases"]), paciente) for estudio in config_data["tipos_estudio"]
+                        for paciente in estudio["pacientes"]), key=lambda x: (-x[0], x[1]))
+    carga = [0] * len(ventanas)
+    pacientes_ventana = [set() for _ in ventanas]
+    for fases, paciente in pacientes:
+        idx = min(range(len(ventanas)), key=lambda i: ((carga[i] + fases) / ventanas[i][1], i))
+        carga[idx] += fases
+        pacientes_ventana[idx].add(paciente)
+
+    subproblemas = []
+    for (inicio, dias), pacientes_sub in zip(ventanas, pacientes_ventana):
+        if not pacientes_sub:
+            continue
+        subproblemas.append({
+            "nombre": f"días {inicio + 1}-{inicio + dias}",
+            "config": _subconfiguracion(config_data, pacientes_sub, num_dias_planificacion=dias),
+            "desplazamiento_dias": inicio,
+            "personal": {},
+        })
+    return subproblemas
+
+
+def particionar_por_estudios(config_data: Dict[str, Any], num_grupos: int) -> List[Dict[str, Any]]:
+    """
+    Agrupa los estudios en 'num_grupos' grupos que comparten pocos roles y reparte entre los grupos
+    el personal de los roles compartidos y las consultas cuando hay suficientes para todos. Los
+    recursos que no alcanzan se comparten, y sus conflictos se reparan al fusionar.
+    """
+    roles_por_fase = defaultdict(set)
+    for rol, fases in config_data["cargos"].items():
+        if config_data["personal"].get(rol, 0) > 0:
+            for fase in fases:
+                roles_por_fase[fase].add(rol)
+    estudios = sorted(config_data["tipos_estudio"], key=lambda e: (-_carga_estudio(e), e["nombre_estudio"]))
+    num_grupos = max(1, min(num_grupos, len(estudios)))
+    carga_total = sum(_carga_estudio(e) for e in estudios) or 1
+
+    # Reparto voraz: los estudios más grandes abren los grupos y el resto va al grupo con menos carga
+    # y con menos roles en común con los demás grupos
+    grupos = [{"estudios": [], "roles": set(), "carga": 0} for _ in range(num_grupos)]
+    for idx_estudio, estudio in enumerate(estudios):
+        roles_estudio = set().union(*(roles_por_fase[f] for f in estudio["orden_fases"])) if estudio["orden_fases"] else set()
+        def coste_grupo(i: int) -> Tuple[float, int]:
+            roles_otros = set().union(*(g["roles"] for j, g in enumerate(grupos) if j != i))
+            compartidos = len(roles_estudio & roles_otros) / max(1, len(roles_estudio))
+            return (grupos[i]["carga"] + _carga_estudio(estudio)) / carga_total + compartidos, i
+        grupo = grupos[idx_estudio] if idx_estudio < num_grupos else grupos[min(range(num_grupos), key=coste_grupo)]
+        grupo["estudios"].append(estudio)
+        grupo["roles"] |= roles_estudio
+        grupo["carga"] += _carga_estudio(estudio)
+
+    # Reparto de recursos: personal de cada rol y consultas, en turno rotatorio si llegan para todos
+    instancias_grupo = [defaultdict(list) for _ in grupos]
+    for rol, cantidad in config_data["personal"].items():
+        usuarios = [i for i, g in enumerate(grupos) if rol in g["roles"]]
+        instancias = [f"{rol}_{n}" for n in range(1, cantidad + 1)]
+        for k, i in enumerate(usuarios):
+            instancias_grupo[i][rol] = instancias[k::len(usuarios)] if cantidad >= len(usuarios) else instancias
+    consultas = list(config_data["consultas"])
+    consultas_grupo = [consultas[i::len(grupos)] if len(consultas) >= len(grupos) else consultas
+                       for i in range(len(grupos))]
+
+    subproblemas = []
+    for i, grupo in enumerate(grupos):
+        pacientes_sub = {p for estudio in grupo["estudios"] for p in estudio["pacientes"]}
+        personal_sub = {rol: len(instancias) for rol, instancias in instancias_grupo[i].items()}
+        # Las instancias del subproblema se numeran desde 1: se traducen a las reales al fusionar
+        traduccion = {f"{rol}_{n}": instancia for rol, instancias in instancias_grupo[i].items()
+                      for n, instancia in enumerate(instancias, start=1)}
+        subproblemas.append({
+            "nombre": "estudios " + ", ".join(e["nombre_estudio"] for e in grupo["estudios"]),
+            "config": _subconfiguracion(config_data, pacientes_sub, personal=personal_sub, consultas=consultas_grupo[i]),
+            "desplazamiento_dias": 0,
+            "personal": traduccion,
+        })
+    return subproblemas
+
+
+def _resolver_subproblema(tarea: Tuple[int, str, Dict[str, Any], Dict[str, Any]]) -> Dict[str, Any]:
+    """ Resuelve un subproblema en un proceso trabajador (configuración con los nombres ya transformados) """
+    idx, variante, subproblema, aco_params = tarea
+    inicio = time.time()
+    try:
+        escenario = preparar_escenario(subproblema["config"], clases_recursos=aco_params.get("clases_recursos", False),
+                                       plantillas_estudio=aco_params.get("plantillas_estudio", False),
+                                       transformar_nombres=False)
+        if escenario is None:
+            return {"idx": idx, "nombre": subproblema["nombre"], "error": "no se pudieron generar los nodos"}
+        params_sub = dict(aco_params, seed=derivar_semilla(aco_params.get("seed", 0), "subproblema", idx))
+        colonia = crear_colonia(variante, escenario, params_sub)
+        solucion, coste = colonia.run()
+    except Exception as e:
+        return {"idx": idx, "nombre": subproblema["nombre"], "error": repr(e)}
+    return {
+        "idx": idx,
+        "nombre": subproblema["nombre"],
+        "pacientes": sum(len(e["pacientes"]) for e in subproblema["config"]["tipos_estudio"]),
+        "nodos": len(escenario["nodos"]),
+        "best_solution": solucion,
+        "best_cost": coste,
+        "execution_time": time.time() - inicio,
+        "desplazamiento_dias": subproblema["desplazamiento_dias"],
+        "personal": subproblema["personal"],
+    }
+
+
+def fusionar_soluciones(resultados: List[Dict[str, Any]]) -> List[Tuple]:
+    """ Une las soluciones de los subproblemas: desplaza los días y traduce el personal a las instancias reales """
+    fusionada = []
+    for resultado in resultados:
+        desplazamiento, traduccion = resultado["desplazamiento_dias"], resultado["personal"]
+        for paciente, consulta, dia_idx, hora_str, personal, fase in resultado["best_solution"] or []:
+            fusionada.append((paciente, consulta, dia_idx + desplazamiento, hora_str, traduccion.get(personal, personal), fase))
+    return fusionada
+
+
+def reparar_solucion(colonia, solucion: List[Tuple], iteraciones: int, semilla: int) -> Tuple[List[Tuple], List[float]]:
+    """
+    Repara los conflictos de la solución fusionada (recursos compartidos entre subproblemas) con la
+    búsqueda local de la colonia, que prioriza las asignaciones en conflicto. Devuelve la solución
+    reparada y la evolución de su coste.
+    """
+    coste = colonia.calcular_coste(solucion)
+    costes = [coste]
+    for i in range(iteraciones):
+        candidata = colonia.local_search(solucion, rng=derivar_rng(semilla, "reparacion", i))
+        coste_candidata = colonia.calcular_coste(candidata, cutoff=coste)
+        if coste_candidata < coste:
+            solucion, coste = candidata, coste_candidata
+        costes.append(coste)
+    return solucion, costes
+
+
+def resolver_problema_completo(variante: str, config_data: Dict[str, Any], aco_params: Dict[str, Any]):
+    """ Resuelve el problema completo con la colonia de la variante (respaldo de la descomposición) """
+    params_completo = {k: v for k, v in aco_params.items() if k != "descomposicion"}
+    escenario = preparar_escenario(config_data, clases_recursos=params_completo.get("clases_recursos", False),
+                                   plantillas_estudio=params_completo.get("plantillas_estudio", False),
+                                   transformar_nombres=False)
+    if escenario is None:
+        raise RuntimeError("no se pudieron generar los nodos del problema completo")
+    colonia = crear_colonia(variante, escenario, params_completo)
+    colonia.run()
+    return colonia
+
+
+def ejecutar_descomposicion(variante: str, config_data: Dict[str, Any], aco_params: Dict[str, Any],
+                            horas_disponibles: List[str], lista_personal_instancias: List[str]):
+    """
+    Descompone el problema ('modo': "dias" o "estudios"), resuelve los subproblemas en paralelo con
+    la colonia de la variante y fusiona y repara sus soluciones con calcular_coste. Devuelve una
+    colonia sin grafo sobre el problema completo con la solución fusionada como mejor solución,
+    y su resumen por subproblema en 'resultados_descomposicion'. Si algún subproblema falla o la
+    solución fusionada no programa todas las fases de todos los pacientes, se resuelve el problema
+    completo (calcular_coste no penaliza a los pacientes ausentes de la solución).
+    """
+    from Standard.ACO import ACO
+
+    opciones = aco_params.get("descomposicion") or {}
+    modo = opciones.get("modo", "dias")
+    if modo == "dias":
+        subproblemas = particionar_por_dias(config_data, opciones.get("dias_por_ventana", 5))
+    elif modo == "estudios":
+        subproblemas = particionar_por_estudios(config_data, opciones.get("num_grupos", 2))
+    else:
+        raise ValueError(f"Modo de descomposición desconocido '{modo}'. Disponibles: {', '.join(MODOS_DESCOMPOSICION)}")
+
+    # Los subproblemas ejecutan su colonia con los parámetros generales, sin islas ni descomposición
+    params_sub = {k: v for k, v in aco_params.items() if k not in ("islas", "descomposicion", "multiresolucion")}
+    tareas = [(idx, variante, subproblema, params_sub) for idx, subproblema in enumerate(subproblemas)]
+    num_procesos = max(1, min(len(tareas), opciones.get("procesos") or mp.cpu_count()))
+    print(f"Resolviendo {len(tareas)} subproblemas (modo '{modo}') en {num_procesos} procesos...")
+    inicio = time.time()
+    if num_procesos > 1:
+        with mp.Pool(num_procesos) as pool:
+            resultados = pool.map(_resolver_subproblema, tareas)
+    else:
+        resultados = [_resolver_subproblema(tarea) for tarea in tareas]
+
+    fallidos = [r for r in resultados if "error" in r]
+    for resultado in fallidos:
+        print(f"Error en el subproblema '{resultado['nombre']}': {resultado['error']}")
+
+    colonia = ACO(graph=None, config_data=config_data, horas_disponibles=horas_disponibles,
+                  num_dias_planificacion=config_data["num_dias_planificacion"],
+                  lista_personal_instancias=lista_personal_instancias, seed=aco_params.get("seed"))
+    colonia.coste_fusion = None
+    if fallidos:
+        print(f"Aviso: {len(fallidos)} subproblemas sin solución; se resuelve el problema completo.")
+    else:
+        fusionada = fusionar_soluciones(resultados)
+        if colonia.solucion_completa(fusionada):
+            reparada, costes = reparar_solucion(colonia, fusionada, opciones.get("iteraciones_reparacion", 30), colonia.seed)
+            colonia.best_solution, colonia.best_cost = reparada, costes[-1]
+            colonia.total_costs = costes
+            colonia.coste_fusion = costes[0]
+            colonia.motivo_parada = "descomposicion"
+        else:
+            print("Aviso: la solución fusionada no programa todas las fases de todos los pacientes; "
+                  "se resuelve el problema completo.")
+    if colonia.coste_fusion is None:
+        colonia = resolver_problema_completo(variante, config_data, aco_params)
+        colonia.coste_fusion = None
+    colonia.execution_time = time.time() - inicio
+    colonia.resultados_descomposicion = resultados
+    return colonia
+
+
+def imprimir_resumen_descomposicion(colonia):
+    """ Imprime el tiempo y el coste de cada subproblema y el coste de la solución fusionada """
+    print("\nResumen de la descomposición:")
+    for resultado in colonia.resultados_descomposicion:
+        if "error" in resultado:
+            print(f"  {resultado['nombre']}: error ({resultado['error']})")
+            continue
+        print(f"  {resultado['nombre']}: {resultado['pacientes']} pacientes, {resultado['nodos']} nodos, "
+              f"coste {resultado['best_cost']:.2f}, tiempo {resultado['execution_time']:.2f}s")
+    if colonia.coste_fusion is None:
+        print(f"  Resuelto el problema completo - coste: {colonia.best_cost:.2f}")
+    else:
+        print(f"  Coste fusionado: {colonia.coste_fusion:.2f} - tras reparar: {colonia.best_cost:.2f}")
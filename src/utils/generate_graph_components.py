@@ -1,7 +1,6 @@
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional
 from collections import defaultdict
 import datetime
-import math
 
 def construir_mapeo_paciente_info(tipos_estudio_data: List[Dict]) -> Dict:
     """
@@ -39,6 +38,9 @@ def generar_nodos(config_data: Dict[str, Any],
     cargos_fases_config = config_data["cargos"]
 
     num_slots_por_dia = len(horas_disponibles_un_dia)
+    # Fases que caben en un día completo para un paciente
+    fases_por_dia_completo = min(max_fases_por_dia_paciente, num_slots_por_dia)
+    nodos_podados = 0
 
     for estudio_config_info in config_data["tipos_estudio"]:
         pacientes_del_estudio = estudio_config_info["pacientes"]
@@ -51,9 +53,7 @@ def generar_nodos(config_data: Dict[str, Any],
         num_fases_para_este_estudio = len(orden_fases_estudio)
         if num_fases_para_este_estudio == 0:
             continue
-            
-        # Mínimo de días necesarios solo por la restricción de fases/día
-        min_dias_necesarios_por_limite_fases = math.ceil(num_fases_para_este_estudio / max_fases_por_dia_paciente)
+        max_orden_estudio = max(orden_fases_estudio.values())
 
         for p in pacientes_del_estudio:
             for f_nombre in fases_del_estudio_nombres: 
@@ -62,27 +62,21 @@ def generar_nodos(config_data: Dict[str, Any],
                     print(f"Advertencia: Fase '{f_nombre}' del estudio '{estudio_config_info['nombre_estudio']}' para paciente '{p}' no tiene orden definido. Se omite.")
                     continue
 
-                es_primera_fase_del_paciente = (orden_actual_fase == 1)
+                fases_anteriores = orden_actual_fase - 1
+                fases_posteriores = max_orden_estudio - orden_actual_fase
 
                 for c in consultas:
                     for dia_idx in range(num_dias_planificacion):
-                        # Optimización de viabilidad para la PRIMERA fase del estudio
-                        if es_primera_fase_del_paciente:
-                            dias_restantes_reales = num_dias_planificacion - dia_idx
-                            if dias_restantes_reales < min_dias_necesarios_por_limite_fases:
-                                break # No hay suficientes días para completar el estudio
-
                         for h_idx, h_str in enumerate(horas_disponibles_un_dia):
-                            if es_primera_fase_del_paciente:
-                                # Optimización de viabilidad para la PRIMERA fase del paciente, verificando si hay suficientes horas disponibles
-                                fases_posibles_en_slots_dia_actual = min(max_fases_por_dia_paciente, num_slots_por_dia - h_idx)
-                                dias_completos_futuros = num_dias_planificacion - 1 - dia_idx
-                                fases_posibles_en_slots_dias_futuros = dias_completos_futuros * max_fases_por_dia_paciente
-                                
-                                total_fases_alojables_globalmente = fases_posibles_en_slots_dia_actual + fases_posibles_en_slots_dias_futuros
-                                
-                                if total_fases_alojables_globalmente < num_fases_para_este_estudio:
-                                    break # No hay suficientes slots/días restantes para el estudio desde esta hora
+                            # Poda por alcanzabilidad: las fases anteriores deben caber antes de este
+                            # slot y las posteriores después, respetando el máximo de fases por día
+                            fases_alojables_antes = min(max_fases_por_dia_paciente - 1, h_idx) + \
+                                                    dia_idx * fases_por_dia_completo
+                            fases_alojables_despues = min(max_fases_por_dia_paciente - 1, num_slots_por_dia - 1 - h_idx) + \
+                                                      (num_dias_planificacion - 1 - dia_idx) * fases_por_dia_completo
+                            if fases_anteriores > fases_alojables_antes or fases_posteriores > fases_alojables_despues:
+                                nodos_podados += 1
+                                continue
 
                             for personal_instancia in lista_personal_instancias:
                                 rol_actual = personal_instancia.split('_')[0]
@@ -95,18 +89,31 @@ def generar_nodos(config_data: Dict[str, Any],
                                 # Si el personal puede realizar la fase, se crea el nodo
                                 nodos.append((p, c, dia_idx, h_str, personal_instancia, f_nombre))
 
-    print(f"Generados {len(nodos)} nodos a lo largo de {num_dias_planificacion} días con roles.")
+    print(f"Generados {len(nodos)} nodos a lo largo de {num_dias_planificacion} días con roles "
+          f"({nodos_podados} combinaciones de paciente, fase, consulta, día y hora descartadas por alcanzabilidad).")
     return nodos
 
 def generar_aristas(nodos: List[Tuple],
                     paciente_info: Dict[str, Dict[str, Any]],
                     duracion_consulta_minutos: int,
-                    horas_disponibles_str_list: List[str]
+                    horas_disponibles_str_list: List[str],
+                    capacidad_recursos: Optional[Dict[str, int]] = None,
+                    pacientes_plantilla: bool = False
                    ) -> Dict[Tuple, List[Tuple]]:
     """
     Genera las aristas del grafo considerando días, horas y roles de personal.
     Nodo: (paciente, consulta, dia_idx, hora_str, personal_instancia, fase_nombre)
+    Con 'capacidad_recursos' (grafo por clases de recursos), sólo los recursos de capacidad 1
+    impiden que dos pacientes distintos empiecen a la misma hora.
+    Con 'pacientes_plantilla' (grafo por plantillas de estudio) cada paciente del grafo representa
+    a todos los de su estudio, así que su última fase también enlaza con su primera fase (el
+    siguiente paciente del mismo estudio).
     """
+    capacidad_recursos = capacidad_recursos or {}
+
+    def comparten_recurso_unico(c1, personal1, c2, personal2) -> bool:
+        return (personal1 == personal2 and capacidad_recursos.get(personal1, 1) <= 1) or \
+               (c1 == c2 and capacidad_recursos.get(c1, 1) <= 1)
     aristas = defaultdict(list)
     num_nodos = len(nodos)
     if num_nodos == 0:
@@ -158,7 +165,7 @@ def generar_aristas(nodos: List[Tuple],
 
             # Restricción de recursos GENERAL para diferentes pacientes en la misma hora de inicio
             if p1 != p2 and day1 == day2 and h1_str == h2_str: # Mismo día y hora
-                if personal1 == personal2 or c1 == c2: # Misma instancia de personal o misma consulta
+                if comparten_recurso_unico(c1, personal1, c2, personal2): # Misma instancia de personal o misma consulta
                     continue
 
             info_p2 = paciente_info.get(p2)
@@ -182,6 +189,11 @@ def generar_aristas(nodos: List[Tuple],
                             aristas[nodo1].append(nodo2)
                     elif day2 > day1: # Fase 2 en día posterior
                         aristas[nodo1].append(nodo2)
+                elif pacientes_plantilla and orden_f1 == max_orden_p1 and orden_f2 == 1:
+                    # Plantilla de estudio: paso al siguiente paciente del mismo estudio
+                    if day1 == day2 and h1_str == h2_str and comparten_recurso_unico(c1, personal1, c2, personal2):
+                        continue
+                    aristas[nodo1].append(nodo2)
 
             # Caso 2: Diferentes pacientes (p1 != p2)
             else: # p1 != p2
@@ -192,4 +204,117 @@ def generar_aristas(nodos: List[Tuple],
                     aristas[nodo1].append(nodo2)
 
     print(f"Generadas {sum(len(v) for v in aristas.values())} aristas.")
-    return aristas
\ No newline at end of file
+    return aristas
+
+def podar_nodos_sin_aristas(nodos: List[Tuple],
+                            aristas: Dict[Tuple, List[Tuple]],
+                            paciente_info: Dict[str, Dict[str, Any]]
+                           ) -> Tuple[List[Tuple], Dict[Tuple, List[Tuple]]]:
+    """
+    Elimina de forma iterativa los nodos que no pueden formar parte de una solución completa:
+    los que no son la última fase del paciente y no tienen aristas salientes, y los que no son
+    la primera fase y no tienen aristas entrantes. Devuelve los nodos y aristas restantes.
+    """
+    def orden_de(nodo):
+        return paciente_info[nodo[0]]["orden_fases"].get(nodo[5])
+
+    entrantes = defaultdict(int)
+    for origen, destinos in aristas.items():
+        for destino in destinos:
+            entrantes[destino] += 1
+
+    vivos = set(nodos)
+    pendientes = list(nodos)
+    while pendientes:
+        eliminados = set()
+        for nodo in pendientes:
+            if nodo not in vivos or nodo[0] not in paciente_info:
+                continue
+            orden = orden_de(nodo)
+            sin_salida = orden != paciente_info[nodo[0]]["max_orden"] and \
+                         not any(destino in vivos for destino in aristas.get(nodo, []))
+            sin_entrada = orden != 1 and entrantes[nodo] == 0
+            if sin_salida or sin_entrada:
+                eliminados.add(nodo)
+        if not eliminados:
+            break
+        vivos -= eliminados
+        # Sólo pueden quedar sin aristas los vecinos de los nodos eliminados
+        pendientes = []
+        for nodo in eliminados:
+            for destino in aristas.get(nodo, []):
+                entrantes[destino] -= 1
+                pendientes.append(destino)
+        pendientes.extend(origen for origen, destinos in aristas.items()
+                          if origen in vivos and any(destino in eliminados for destino in destinos))
+
+    if len(vivos) == len(nodos):
+        return nodos, aristas
+    nodos_restantes = [nodo for nodo in nodos if nodo in vivos]
+    aristas_restantes = defaultdict(list)
+    for origen, destinos in aristas.items():
+        if origen in vivos:
+            aristas_restantes[origen] = [destino for destino in destinos if destino in vivos]
+    print(f"Eliminados {len(nodos) - len(nodos_restantes)} nodos sin aristas entrantes o salientes. "
+          f"Quedan {len(nodos_restantes)} nodos y {sum(len(v) for v in aristas_restantes.values())} aristas.")
+    return nodos_restantes, aristas_restantes
+
+# Componente estática de la heurística: valor base, bonificación por espera corta y penalizaciones
+# por solape o por retroceder de día entre fases consecutivas del mismo paciente
+HEURISTICA_BASE = 10.0
+HEURISTICA_MINIMA = 0.001
+BONUS_ESPERA_CORTA = 100.0
+ESPERA_BONIFICADA_MINUTOS = 120
+PENALIZACION_HEURISTICA_SOLAPE = 1000.0
+PENALIZACION_HEURISTICA_DIA_ANTERIOR = 2000.0
+
+
+def heuristica_transicion(nodo_actual: Tuple, nodo: Tuple, duracion_consulta_minutos: int,
+                          mismo_paciente: bool) -> float:
+    """
+    Parte de la heurística de pasar de 'nodo_actual' a 'nodo' que sólo depende de los dos nodos.
+    Nodo: (paciente, consulta, dia_idx, hora_str, personal_instancia, fase_nombre)
+    """
+    score = HEURISTICA_BASE
+    if mismo_paciente:
+        _, _, dia_actual, hora_actual_str, _, _ = nodo_actual
+        _, _, dia, hora_str, _, _ = nodo
+        if dia == dia_actual:
+            fin_actual_min = _minutos_del_dia(hora_actual_str) + duracion_consulta_minutos
+            inicio_min = _minutos_del_dia(hora_str)
+            if inicio_min < fin_actual_min:
+                score -= PENALIZACION_HEURISTICA_SOLAPE # Solapamiento del mismo paciente en el mismo día
+            else:
+                tiempo_espera = inicio_min - fin_actual_min
+                if tiempo_espera <= ESPERA_BONIFICADA_MINUTOS:
+                    score += (ESPERA_BONIFICADA_MINUTOS - tiempo_espera) / ESPERA_BONIFICADA_MINUTOS * BONUS_ESPERA_CORTA
+        elif dia < dia_actual:
+            score -= PENALIZACION_HEURISTICA_DIA_ANTERIOR # Ir hacia atrás en días para el mismo paciente
+    return max(HEURISTICA_MINIMA, score)
+
+
+def _minutos_del_dia(hora_str: str) -> int:
+    try:
+        horas, minutos = hora_str.split(':')
+        return int(horas) * 60 + int(minutos)
+    except ValueError:
+        raise ValueError(f"Cadena de hora mal formada: {hora_str}")
+
+
+def calcular_heuristica_estatica(aristas: Dict[Tuple, List[Tuple]],
+                                 paciente_info: Dict[str, Dict[str, Any]],
+                                 duracion_consulta_minutos: int
+                                ) -> Dict[Tuple[Tuple, Tuple], float]:
+    """
+    Precalcula la componente estática de la heurística de cada arista, que no depende del estado
+    de la hormiga. Una arista entre nodos del mismo paciente que llega a su primera fase sólo existe
+    en el grafo por plantillas y corresponde a otro paciente del estudio.
+    """
+    heuristica = {}
+    for origen, destinos in aristas.items():
+        for destino in destinos:
+            mismo_paciente = origen[0] == destino[0] and \
+                             paciente_info[destino[0]]["orden_fases"].get(destino[5]) != 1
+            heuristica[(origen, destino)] = heuristica_transicion(origen, destino, duracion_consulta_minutos, mismo_paciente)
+    print(f"Heurística estática precalculada para {len(heuristica)} aristas.")
+    return heuristica
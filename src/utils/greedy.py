@@ -0,0 +1,75 @@
+from typing import List, Dict, Tuple, Any, Optional, Set
+
+
+def construir_solucion_voraz(config_data: Dict[str, Any],
+                             horas_disponibles: List[str],
+                             num_dias_planificacion: int,
+                             lista_personal_instancias: List[str],
+                             nodos_validos: Optional[Set[Tuple]] = None) -> Tuple[List[Tuple], bool]:
+    """
+    Construye una planificación de forma voraz y determinista (list scheduling): recorre los
+    pacientes en el orden de la configuración y asigna cada fase, en orden, al primer
+    (día, hora, personal, consulta) libre según las tablas de ocupación. Si ningún hueco está
+    libre, usa el primero que respeta el orden aunque genere un conflicto de recursos.
+    Si se pasa 'nodos_validos', sólo se usan asignaciones que existen como nodo del grafo.
+    Devuelve la lista de asignaciones (en orden de recorrido del grafo) y si está completa.
+    """
+    max_fases_por_dia = config_data.get("max_fases_por_dia_paciente", 2)
+    consultas = config_data["consultas"]
+    cargos_config = config_data["cargos"]
+    num_slots = len(horas_disponibles)
+
+    # Instancias de personal que pueden realizar cada fase
+    personal_por_fase: Dict[str, List[str]] = {}
+    for estudio in config_data["tipos_estudio"]:
+        for fase in estudio["fases"]:
+            if fase not in personal_por_fase:
+                personal_por_fase[fase] = [p for p in lista_personal_instancias
+                                           if fase in cargos_config.get(p.split('_')[0], [])]
+
+    # Tablas de ocupación: (dia, slot, recurso)
+    personal_ocupado: Set[Tuple[int, int, str]] = set()
+    consultas_ocupadas: Set[Tuple[int, int, str]] = set()
+
+    def buscar_hueco(paciente, fase, dia_minimo, slot_minimo, fases_en_dia, estricto):
+        """Primer (día, slot) que respeta el orden y el máximo de fases por día; si es estricto, sin conflictos."""
+        for dia in range(dia_minimo, num_dias_planificacion):
+            if dia > dia_minimo:
+                slot_inicio, fases_previas = 0, 0
+            elif fases_en_dia >= max_fases_por_dia:
+                continue
+            else:
+                slot_inicio, fases_previas = slot_minimo, fases_en_dia
+            for slot in range(slot_inicio, num_slots):
+                personal_libre = [p for p in personal_por_fase.get(fase, []) if (dia, slot, p) not in personal_ocupado]
+                consultas_libres = [c for c in consultas if (dia, slot, c) not in consultas_ocupadas]
+                if estricto and (not personal_libre or not consultas_libres):
+                    continue
+                # Sin hueco libre se acepta el conflicto de recursos (lo penaliza calcular_coste)
+                for personal in personal_libre or personal_por_fase.get(fase, []):
+                    for consulta in consultas_libres or consultas:
+                        nodo = (paciente, consulta, dia, horas_disponibles[slot], personal, fase)
+                        if nodos_validos is None or nodo in nodos_validos:
+                            return nodo, dia, slot, fases_previas
+        return None
+
+    solucion = []
+    completa = True
+    for estudio in config_data["tipos_estudio"]:
+        fases_ordenadas = sorted(estudio["orden_fases"], key=estudio["orden_fases"].get)
+        for paciente in estudio["pacientes"]:
+            dia_minimo, slot_minimo = 0, 0
+            fases_en_dia = 0 # Fases del paciente ya asignadas en dia_minimo
+            for fase in fases_ordenadas:
+                asignacion = buscar_hueco(paciente, fase, dia_minimo, slot_minimo, fases_en_dia, estricto=True) or \
+                             buscar_hueco(paciente, fase, dia_minimo, slot_minimo, fases_en_dia, estricto=False)
+                if asignacion is None:
+                    completa = False
+                    break # El resto de fases del paciente no pueden programarse en orden
+                nodo, dia, slot, fases_previas = asignacion
+                personal_ocupado.add((dia, slot, nodo[4]))
+                consultas_ocupadas.add((dia, slot, nodo[1]))
+                solucion.append(nodo)
+                dia_minimo, slot_minimo, fases_en_dia = dia, slot + 1, fases_previas + 1
+
+    return solucion, completa
@@ -0,0 +1,184 @@
+import multiprocessing as mp
+import os
+import queue
+import time
+from typing import Dict, List, Any
+
+import matplotlib.pyplot as plt
+
+from utils.rng import derivar_semilla, derivar_rng
+
+PARAMETROS_VARIABLES = ("alpha", "beta", "rho", "Q", "n_ants")
+
+
+def configurar_isla(aco, idx_isla: int, config_islas: Dict[str, Any]):
+    """ Aplica a la colonia de la isla su semilla propia y, si existen, sus variaciones de parámetros """
+    variaciones = config_islas.get("variaciones") or []
+    if variaciones:
+        for parametro, valor in variaciones[idx_isla % len(variaciones)].items():
+            if parametro not in PARAMETROS_VARIABLES:
+                raise ValueError(f"Parámetro '{parametro}' no se puede variar por isla. Permitidos: {', '.join(PARAMETROS_VARIABLES)}")
+            setattr(aco, parametro, valor)
+    aco.seed = derivar_semilla(aco.seed, "isla", idx_isla)
+    aco.rng = derivar_rng(aco.seed)
+
+
+def _proceso_isla(idx_isla: int, aco, config_islas: Dict[str, Any],
+                  bandeja_entrada, bandeja_siguiente, cola_resultados):
+    """
+    Ejecuta una colonia independiente. Cada 'intervalo_migracion' iteraciones envía su mejor
+    solución a la isla siguiente del anillo y recibe la de la anterior.
+    """
+    try:
+        configurar_isla(aco, idx_isla, config_islas)
+        intervalo_migracion = max(1, int(config_islas.get("intervalo_migracion", 10)))
+        espera_maxima = config_islas.get("espera_maxima_migracion_s", 300)
+        num_islas = config_islas["num_islas"]
+        migraciones_recibidas = 0
+
+        # Si la isla termina antes (criterios de parada), no se bloquea a la isla siguiente
+        bandeja_siguiente.cancel_join_thread()
+        vecino_activo = True
+
+        start_time = time.time()
+        aco._iniciar_ejecucion()
+        for iteration in range(aco.iterations):
+            if aco._tiempo_agotado():
+                aco.motivo_parada = "tiempo_maximo"
+                break
+            aco._ejecutar_iteracion(iteration)
+            parar = aco._comprobar_parada(iteration)
+
+            if num_islas > 1 and not parar and (iteration + 1) % intervalo_migracion == 0 and iteration + 1 < aco.iterations:
+                bandeja_siguiente.put((idx_isla, aco.best_solution, aco.best_cost, True))
+                if vecino_activo:
+                    try:
+                        _, solucion_migrada, coste_migrado, vecino_activo = bandeja_entrada.get(timeout=espera_maxima)
+                    except queue.Empty:
+                        print(f"Isla {idx_isla}: no se recibió migración en la iteración {iteration}.")
+                        solucion_migrada = None
+                    if solucion_migrada is not None:
+                        aco.incorporar_solucion(solucion_migrada, coste_migrado)
+                        migraciones_recibidas += 1
+            if parar:
+                break
+        if num_islas > 1: # Aviso final: esta isla no enviará más migraciones
+            bandeja_siguiente.put((idx_isla, aco.best_solution, aco.best_cost, False))
+        aco.execution_time = time.time() - start_time
+
+        cola_resultados.put({
+            "isla": idx_isla,
+            "best_solution": aco.best_solution,
+            "best_cost": aco.best_cost,
+            "total_costs": aco.total_costs,
+            "execution_time": aco.execution_time,
+            "parametros": {p: getattr(aco, p) for p in PARAMETROS_VARIABLES},
+            "migraciones_recibidas": migraciones_recibidas,
+            "motivo_parada": aco.motivo_parada,
+            "iteraciones_ejecutadas": aco.iteraciones_ejecutadas,
+            "registro_adaptativo": aco.registro_adaptativo,
+        })
+    except Exception as e:
+        if config_islas.get("num_islas", 1) > 1: # La isla siguiente no debe esperar migraciones de esta
+            bandeja_siguiente.put((idx_isla, None, float('inf'), False))
+        cola_resultados.put({"isla": idx_isla, "error": repr(e)})
+
+
+def ejecutar_islas(aco, config_islas: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Ejecuta 'num_islas' colonias independientes (copias de la colonia dada, cada una con su propio
+    estado de feromonas) en procesos separados, con migración periódica de la mejor solución en anillo.
+    Al terminar, la colonia dada recibe la mejor solución global y una curva de convergencia combinada.
+    Devuelve el resumen por isla.
+    """
+    num_islas = int(config_islas.get("num_islas", 1))
+    if num_islas < 1:
+        raise ValueError("'num_islas' debe ser un entero positivo.")
+    config_islas = dict(config_islas, num_islas=num_islas)
+
+    bandejas = [mp.Queue() for _ in range(num_islas)]
+    cola_resultados = mp.Queue()
+    procesos = []
+    start_time = time.time()
+    for idx_isla in range(num_islas):
+        proceso = mp.Process(
+            target=_proceso_isla,
+            args=(idx_isla, aco, config_islas, bandejas[idx_isla], bandejas[(idx_isla + 1) % num_islas], cola_resultados),
+        )
+        proceso.start()
+        procesos.append(proceso)
+
+    # Recoger los resultados antes de hacer join para no bloquear las colas
+    resultados = []
+    while len(resultados) < num_islas:
+        try:
+            resultados.append(cola_resultados.get(timeout=1.0))
+        except queue.Empty:
+            if not any(p.is_alive() for p in procesos) and cola_resultados.empty():
+                print("Error: Alguna isla terminó sin devolver resultados.")
+                break
+    for proceso in procesos:
+        proceso.join()
+
+    resultados.sort(key=lambda r: r["isla"])
+    for resultado in resultados:
+        if "error" in resultado:
+            print(f"Error en la isla {resultado['isla']}: {resultado['error']}")
+    validos = [r for r in resultados if "error" not in r]
+
+    # La colonia original recibe el mejor resultado global
+    aco.execution_time = time.time() - start_time
+    aco.motivo_parada = ", ".join(sorted({r["motivo_parada"] for r in validos}))
+    aco.registro_adaptativo = [dict(registro, isla=r["isla"]) for r in validos for registro in r["registro_adaptativo"]]
+    for resultado in validos:
+        if resultado["best_cost"] < aco.best_cost:
+            aco.best_cost = resultado["best_cost"]
+            aco.best_solution = resultado["best_solution"]
+    longitud = max((len(r["total_costs"]) for r in validos), default=0)
+    aco.total_costs = []
+    for i in range(longitud):
+        costes_iteracion = [r["total_costs"][min(i, len(r["total_costs"]) - 1)] for r in validos if r["total_costs"]]
+        aco.total_costs.append(min(costes_iteracion))
+
+    return validos
+
+
+def imprimir_resumen_islas(resultados: List[Dict[str, Any]]):
+    """ Muestra la convergencia de cada isla: parámetros, mejor coste e iteración en la que se alcanzó """
+    print("\nResumen por isla:")
+    for r in resultados:
+        costes = r["total_costs"]
+        iteracion_mejor = costes.index(r["best_cost"]) if r["best_cost"] in costes else None
+        parametros = ", ".join(f"{k}={v}" for k, v in r["parametros"].items())
+        coste_str = f"{r['best_cost']:.2f}" if r["best_cost"] != float('inf') else "N/A"
+        print(f"  Isla {r['isla']}: coste {coste_str} (alcanzado en iteración {iteracion_mejor}) - "
+              f"{r['execution_time']:.2f}s - {r['iteraciones_ejecutadas']} iteraciones (parada: {r['motivo_parada']}) - "
+              f"migraciones recibidas {r['migraciones_recibidas']} - {parametros}")
+
+
+def plot_convergencia_islas(resultados: List[Dict[str, Any]], output_dir: str, filename: str = "convergencia_islas.png"):
+    """ Genera un gráfico con la curva de convergencia de cada isla """
+    if not resultados:
+        print("No hay datos para graficar convergencia de las islas.")
+        return
+
+    plt.figure(figsize=(10, 6))
+    for r in resultados:
+        costes = [c for c in r["total_costs"] if c != float('inf')]
+        if costes:
+            plt.plot(costes, linestyle='-', label=f"Isla {r['isla']}")
+    plt.xlabel('Iteración')
+    plt.ylabel('Mejor Costo Encontrado')
+    plt.title('Convergencia por isla')
+    plt.grid(True)
+    plt.legend()
+
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+
+    try:
+        plt.savefig(os.path.join(output_dir, filename))
+        print(f"Gráfico guardado en {os.path.join(output_dir, filename)}")
+    except Exception as e:
+        print(f"Error guardando gráfico: {e}")
+    plt.close()
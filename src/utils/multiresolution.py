@@ -0,0 +1,143 @@
+import copy
+from collections import defaultdict
+from datetime import datetime
+from typing import List, Dict, Tuple, Any, Optional, Set
+
+from utils.scenario import preparar_escenario, crear_colonia
+
+# Consultas adicionales de la malla gruesa: un bloque admite tantas citas por consulta como huecos
+# finos contiene, así que cada consulta se replica en carriles ("Consulta 1", "Consulta 1#2"...)
+SEPARADOR_CARRIL = "#"
+
+
+def _minutos(hora_str: str) -> int:
+    hora = datetime.strptime(hora_str, "%H:%M")
+    return hora.hour * 60 + hora.minute
+
+
+def huecos_por_bloque(config_data: Dict[str, Any], bloque_minutos: int) -> Optional[int]:
+    """ Huecos finos por bloque grueso, o None si el bloque no es un múltiplo mayor del intervalo """
+    intervalo = config_data["intervalo_consultas_minutos"]
+    if bloque_minutos <= intervalo or bloque_minutos % intervalo != 0:
+        return None
+    return bloque_minutos // intervalo
+
+
+def configuracion_gruesa(config_data: Dict[str, Any], bloque_minutos: int) -> Dict[str, Any]:
+    """
+    Configuración de la malla gruesa: cada hueco dura un bloque y cada miembro del personal y cada
+    consulta se replican tantas veces como huecos finos caben en el bloque, de modo que la capacidad
+    de un bloque grueso es la de sus huecos finos.
+    """
+    factor = huecos_por_bloque(config_data, bloque_minutos)
+    config_gruesa = copy.deepcopy(config_data)
+    config_gruesa["intervalo_consultas_minutos"] = bloque_minutos
+    config_gruesa["personal"] = {rol: cantidad * factor for rol, cantidad in config_data["personal"].items()}
+    config_gruesa["consultas"] = [consulta if carril == 1 else f"{consulta}{SEPARADOR_CARRIL}{carril}"
+                                  for consulta in config_data["consultas"] for carril in range(1, factor + 1)]
+    return config_gruesa
+
+
+def resolver_malla_gruesa(variante: str, config_data: Dict[str, Any], aco_params: Dict[str, Any],
+                          opciones: Dict[str, Any]) -> Optional[List[Tuple]]:
+    """
+    Ejecuta la colonia ('standard' o 'minmax') sobre la malla gruesa de una configuración con los
+    nombres de paciente ya transformados. El grafo grueso es siempre por clases de recursos: los
+    carriles de un recurso son intercambiables y sin clases multiplicarían los nodos.
+    Devuelve su mejor solución o None si no encuentra ninguna.
+    """
+    config_gruesa = configuracion_gruesa(config_data, opciones["bloque_minutos"])
+    escenario = preparar_escenario(config_gruesa, clases_recursos=True,
+                                   plantillas_estudio=aco_params.get("plantillas_estudio", False),
+                                   transformar_nombres=False)
+    if escenario is None:
+        return None
+    params_gruesos = dict(aco_params, clases_recursos=True)
+    if opciones.get("iteraciones"):
+        params_gruesos["iterations"] = opciones["iteraciones"]
+    colonia = crear_colonia(variante, escenario, params_gruesos)
+    solucion, coste = colonia.run()
+    print(f"Malla gruesa ({opciones['bloque_minutos']} min): coste {coste:.2f}")
+    return solucion
+
+
+def ventanas_refinamiento(solucion_gruesa: List[Tuple], hora_inicio: str, bloque_minutos: int,
+                          radio_bloques: int = 0,
+                          paciente_grafo: Optional[Dict[str, str]] = None) -> Dict[Tuple[str, str], Set[Tuple[int, int]]]:
+    """
+    Bloques (día, bloque) en los que puede programarse cada (paciente, fase) en la malla fina: el
+    bloque de la solución gruesa, los 'radio_bloques' contiguos del mismo día y los bloques de las
+    fases anterior y siguiente del paciente. En la malla gruesa cada fase ocupa un bloque entero,
+    así que dos fases seguidas quedan en bloques distintos; en la fina pueden juntarse en uno y
+    evitar la espera. Con 'paciente_grafo' (grafo por plantillas) las ventanas de los pacientes de
+    una plantilla se unen en la plantilla.
+    """
+    paciente_grafo = paciente_grafo or {}
+    inicio_min = _minutos(hora_inicio)
+    bloques_paciente = defaultdict(list)
+    for paciente, _, dia_idx, hora_str, _, fase in solucion_gruesa:
+        bloque = (_minutos(hora_str) - inicio_min) // bloque_minutos
+        bloques_paciente[paciente].append((dia_idx, bloque, fase))
+
+    ventanas = defaultdict(set)
+    for paciente, bloques in bloques_paciente.items():
+        bloques.sort() # Las fases de una solución válida quedan en orden de día y bloque
+        for i, (dia_idx, bloque, fase) in enumerate(bloques):
+            ventana = ventanas[(paciente_grafo.get(paciente, paciente), fase)]
+            ventana.update((dia_idx, vecino) for vecino in range(bloque - radio_bloques, bloque + radio_bloques + 1))
+            for j in (i - 1, i + 1): # Bloques de las fases contiguas del mismo día
+                if 0 <= j < len(bloques) and bloques[j][0] == dia_idx:
+                    ventana.add(bloques[j][:2])
+    return ventanas
+
+
+def restringir_nodos(nodos: List[Tuple], ventanas: Dict[Tuple[str, str], Set[Tuple[int, int]]],
+                     hora_inicio: str, bloque_minutos: int) -> List[Tuple]:
+    """
+    Conserva los nodos finos cuyo bloque está en la ventana de su (paciente, fase). Las fases sin
+    ventana (ausentes de la solución gruesa) conservan todos sus nodos.
+    """
+    inicio_min = _minutos(hora_inicio)
+    bloque_de_hora = {}
+    restringidos = []
+    for nodo in nodos:
+        paciente, _, dia_idx, hora_str, _, fase = nodo
+        ventana = ventanas.get((paciente, fase))
+        if ventana is not None:
+            if hora_str not in bloque_de_hora:
+                bloque_de_hora[hora_str] = (_minutos(hora_str) - inicio_min) // bloque_minutos
+            if (dia_idx, bloque_de_hora[hora_str]) not in ventana:
+                continue
+        restringidos.append(nodo)
+    return restringidos
+
+
+def nodos_multiresolucion(variante: str, config_data: Dict[str, Any], aco_params: Dict[str, Any],
+                          nodos: List[Tuple],
+                          pacientes_por_plantilla: Optional[Dict[str, List[str]]] = None) -> List[Tuple]:
+    """
+    Resolución de grueso a fino: resuelve el problema en bloques de 'bloque_minutos' y restringe los
+    nodos de la malla fina a los bloques elegidos (más 'radio_bloques' a cada lado), de modo que las
+    aristas y la colonia final trabajan sobre un grafo mucho menor. Si la malla gruesa no es válida
+    o no encuentra solución, devuelve los nodos sin restringir.
+    """
+    opciones = aco_params.get("multiresolucion") or {}
+    bloque_minutos = opciones.get("bloque_minutos", 120)
+    if huecos_por_bloque(config_data, bloque_minutos) is None:
+        print(f"Aviso: 'bloque_minutos' ({bloque_minutos}) debe ser un múltiplo mayor que 'intervalo_consultas_minutos' "
+              f"({config_data['intervalo_consultas_minutos']}); se resuelve sobre la malla completa.")
+        return nodos
+
+    print(f"Resolviendo la malla gruesa en bloques de {bloque_minutos} minutos...")
+    solucion_gruesa = resolver_malla_gruesa(variante, config_data, aco_params, dict(opciones, bloque_minutos=bloque_minutos))
+    if not solucion_gruesa:
+        print("Aviso: la malla gruesa no encontró solución; se resuelve sobre la malla completa.")
+        return nodos
+
+    paciente_grafo = {paciente: plantilla for plantilla, pacientes in (pacientes_por_plantilla or {}).items()
+                      for paciente in pacientes}
+    ventanas = ventanas_refinamiento(solucion_gruesa, config_data["hora_inicio"], bloque_minutos,
+                                     opciones.get("radio_bloques", 0), paciente_grafo)
+    restringidos = restringir_nodos(nodos, ventanas, config_data["hora_inicio"], bloque_minutos)
+    print(f"Malla fina restringida a {len(restringidos)} de {len(nodos)} nodos.")
+    return restringidos
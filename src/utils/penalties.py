@@ -0,0 +1,40 @@
+# Penalizaciones de la función de coste (ACO.calcular_coste). El coste parcial que acumulan las
+# hormigas durante la construcción usa las mismas constantes para ser una cota inferior válida.
+PENALIZACION_PERSONAL_INCORRECTO = 75000 # Personal que no puede realizar la fase
+PENALIZACION_HORA_INVALIDA = 60000 # Hora con formato inválido
+PENALIZACION_ORDEN_NO_DEFINIDO = 46000 # Fase sin orden en su estudio
+PENALIZACION_FASE_EXTRA_DIA = 30000 # Cada fase por encima de max_fases_por_dia_paciente
+PENALIZACION_CONFLICTO_RECURSO = 20000 # Personal o consulta ocupados
+PENALIZACION_FASE_FALTANTE = 15000 # Cada fase del estudio sin programar
+PENALIZACION_ORDEN_INCORRECTO = 100000 # Fase fuera de orden
+PENALIZACION_SOLAPE_POR_MINUTO = 50000 # Fases del mismo paciente solapadas
+ESPERA_LARGA_MINUTOS = 120 # Espera en el mismo día a partir de la cual la penalización crece
+FACTOR_ESPERA_LARGA = 2
+ESPERA_CORTA_MINUTOS = 30 # Espera en el mismo día a partir de la cual se penaliza levemente
+FACTOR_ESPERA_CORTA = 0.5
+PENALIZACION_DIA_VACIO = 500 # Cada día vacío entre citas del mismo paciente
+COSTE_MINIMO = 0.1 # Suelo del coste para evitar coste cero
+
+MINUTOS_POR_DIA = 24 * 60
+
+
+def penalizacion_entre_fases(dia_anterior: int, fin_anterior_abs_min: int,
+                             dia_actual: int, inicio_actual_abs_min: int) -> float:
+    """
+    Penalización entre dos fases consecutivas de un paciente (minutos absolutos de la planificación):
+    solape, espera dentro del mismo día o días vacíos entre ellas.
+    """
+    if inicio_actual_abs_min < fin_anterior_abs_min:
+        return PENALIZACION_SOLAPE_POR_MINUTO * (fin_anterior_abs_min - inicio_actual_abs_min)
+
+    tiempo_espera_abs = inicio_actual_abs_min - fin_anterior_abs_min
+    if dia_actual == dia_anterior: # Ambas fases en el MISMO DÍA
+        if tiempo_espera_abs > ESPERA_LARGA_MINUTOS:
+            return (tiempo_espera_abs - ESPERA_LARGA_MINUTOS) * FACTOR_ESPERA_LARGA # Penalización creciente
+        if tiempo_espera_abs > ESPERA_CORTA_MINUTOS:
+            return tiempo_espera_abs * FACTOR_ESPERA_CORTA # Penalización leve
+    elif dia_actual > dia_anterior: # Fases en días diferentes
+        dias_vacios = dia_actual - dia_anterior - 1
+        if dias_vacios > 0:
+            return dias_vacios * PENALIZACION_DIA_VACIO
+    return 0.0
@@ -0,0 +1,72 @@
+from typing import List, Dict, Tuple, Any
+from collections import defaultdict
+
+# Identificadores de clase: el rol se sigue obteniendo con personal.split('_')[0]
+SUFIJO_CLASE_PERSONAL = "_*"
+CONSULTA_GENERICA = "*"
+
+
+def clase_personal(personal_instancia: str) -> str:
+    """Clase de un miembro del personal ("MG_2" -> "MG_*")."""
+    return personal_instancia.split('_')[0] + SUFIJO_CLASE_PERSONAL
+
+
+def componentes_grafo_clases(config_data: Dict[str, Any],
+                             lista_personal_instancias: List[str]
+                            ) -> Tuple[Dict[str, Any], List[str], Dict[str, int]]:
+    """
+    Prepara la construcción del grafo por clases de recursos: el personal de un mismo rol y las
+    consultas son intercambiables, así que los nodos usan una consulta genérica y una instancia
+    de clase por rol. Devuelve la configuración y el personal con los que generar los nodos y la
+    capacidad (número de instancias reales) de cada clase.
+    """
+    config_grafo = dict(config_data, consultas=[CONSULTA_GENERICA])
+    capacidad_recursos = defaultdict(int)
+    for personal_instancia in lista_personal_instancias:
+        capacidad_recursos[clase_personal(personal_instancia)] += 1
+    capacidad_recursos[CONSULTA_GENERICA] = len(config_data["consultas"])
+    personal_grafo = list(capacidad_recursos.keys())
+    personal_grafo.remove(CONSULTA_GENERICA)
+    return config_grafo, personal_grafo, dict(capacidad_recursos)
+
+
+def contraer_solucion(solucion: List[Tuple]) -> List[Tuple]:
+    """Sustituye el personal y la consulta de cada asignación por sus clases (nodos del grafo por clases)."""
+    return [(paciente, CONSULTA_GENERICA, dia, hora, clase_personal(personal), fase)
+            for paciente, _, dia, hora, personal, fase in solucion]
+
+
+def expandir_solucion(solucion: List[Tuple], lista_personal_instancias: List[str], consultas: List[str]) -> List[Tuple]:
+    """
+    Asigna personal y consulta concretos a una solución por clases. Cada asignación de un hueco
+    (día, hora) necesita una instancia de su rol y una consulta, así que el emparejamiento por
+    hueco se resuelve repartiendo las instancias libres en orden. Si en un hueco hay más
+    asignaciones que instancias, se reutilizan (conflicto que penaliza calcular_coste).
+    Las asignaciones que ya son concretas se conservan.
+    """
+    instancias_por_clase = defaultdict(list)
+    for personal_instancia in lista_personal_instancias:
+        instancias_por_clase[clase_personal(personal_instancia)].append(personal_instancia)
+
+    personal_usado = defaultdict(set) # (dia, hora) -> instancias ocupadas
+    consultas_usadas = defaultdict(set)
+    for _, consulta, dia, hora, personal, _ in solucion:
+        if consulta != CONSULTA_GENERICA:
+            consultas_usadas[(dia, hora)].add(consulta)
+        if not personal.endswith(SUFIJO_CLASE_PERSONAL):
+            personal_usado[(dia, hora)].add(personal)
+
+    expandida = []
+    for paciente, consulta, dia, hora, personal, fase in solucion:
+        hueco = (dia, hora)
+        if personal.endswith(SUFIJO_CLASE_PERSONAL):
+            candidatas = instancias_por_clase.get(personal, [])
+            libre = next((p for p in candidatas if p not in personal_usado[hueco]), None)
+            personal = libre if libre is not None else (candidatas[0] if candidatas else personal)
+            personal_usado[hueco].add(personal)
+        if consulta == CONSULTA_GENERICA:
+            libre = next((c for c in consultas if c not in consultas_usadas[hueco]), None)
+            consulta = libre if libre is not None else consultas[0]
+            consultas_usadas[hueco].add(consulta)
+        expandida.append((paciente, consulta, dia, hora, personal, fase))
+    return expandida
@@ -0,0 +1,103 @@
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Any, Optional
+
+# Raíz del código (src): la versión del código es el hash de todos sus módulos
+DIRECTORIO_CODIGO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@functools.lru_cache(maxsize=1)
+def version_codigo() -> str:
+    """ Hash del contenido de los .py del programa: cualquier cambio en el código invalida la caché """
+    resumen = hashlib.sha256()
+    for raiz, directorios, archivos in os.walk(DIRECTORIO_CODIGO):
+        directorios[:] = sorted(d for d in directorios if d != "__pycache__")
+        for archivo in sorted(archivos):
+            if archivo.endswith(".py"):
+                ruta = os.path.join(raiz, archivo)
+                resumen.update(os.path.relpath(ruta, DIRECTORIO_CODIGO).replace(os.sep, "/").encode("utf-8"))
+                with open(ruta, "rb") as f:
+                    resumen.update(f.read())
+    return resumen.hexdigest()
+
+
+def clave_resultado(variante: str, config_data: Dict[str, Any], aco_params: Dict[str, Any]) -> str:
+    """
+    Clave de la caché: hash del escenario (con los nombres de paciente sin transformar) y de los
+    parámetros normalizados (claves ordenadas), la semilla, la variante y la versión del código.
+    """
+    material = json.dumps({"variante": variante, "config": config_data, "params": aco_params,
+                           "seed": aco_params.get("seed"), "codigo": version_codigo()},
+                          sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def motivo_sin_cache(aco_params: Dict[str, Any], arranque_en_caliente: bool = False, reanudar: bool = False) -> Optional[str]:
+    """ Motivo por el que el resultado de una ejecución no es reproducible a partir de su clave, o None """
+    if (aco_params.get("criterios_parada") or {}).get("max_segundos") is not None:
+        return "el criterio de parada max_segundos depende del tiempo de ejecución"
+    if arranque_en_caliente:
+        return "la ejecución parte de una solución o feromonas anteriores"
+    if reanudar:
+        return "la ejecución se reanuda desde un checkpoint"
+    return None
+
+
+def cargar_resultado(directorio: str, clave: str) -> Optional[Dict[str, Any]]:
+    """ Resultado guardado para la clave, o None si no existe o no se puede leer """
+    ruta = os.path.join(directorio, f"{clave}.json")
+    if not os.path.exists(ruta):
+        return None
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            datos = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Aviso: no se pudo leer el resultado en caché '{ruta}' ({e}); se recalcula.")
+        return None
+    datos["best_solution"] = [tuple(asignacion) for asignacion in datos.get("best_solution", [])]
+    return datos
+
+
+def guardar_resultado(directorio: str, clave: str, colonia):
+    """
+    Guarda la mejor solución, el coste, la curva de convergencia y el tiempo de una colonia. La
+    escritura es atómica (archivo temporal y os.replace) para que dos ejecuciones simultáneas con
+    la misma clave no dejen un archivo a medias.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    datos = {
+        "clave": clave,
+        "version_codigo": version_codigo(),
+        "best_solution": [list(asignacion) for asignacion in (colonia.best_solution or [])],
+        "best_cost": colonia.best_cost,
+        "total_costs": list(colonia.total_costs),
+        "execution_time": colonia.execution_time,
+        "motivo_parada": colonia.motivo_parada,
+        "iteraciones_ejecutadas": colonia.iteraciones_ejecutadas,
+        "guardado": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    descriptor, ruta_temporal = tempfile.mkstemp(dir=directorio, prefix=".resultado_", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8") as f:
+            json.dump(datos, f, ensure_ascii=False)
+        os.chmod(ruta_temporal, 0o644)
+        os.replace(ruta_temporal, os.path.join(directorio, f"{clave}.json"))
+    except BaseException:
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+        raise
+    print(f"Resultado guardado en la caché ({clave[:12]}).")
+
+
+def restaurar_resultado(colonia, datos: Dict[str, Any]):
+    """ Vuelca en una colonia sin grafo un resultado de la caché, para generar las mismas salidas """
+    colonia.best_solution = datos["best_solution"] or None
+    colonia.best_cost = datos["best_cost"]
+    colonia.total_costs = datos["total_costs"]
+    colonia.execution_time = datos["execution_time"]
+    colonia.motivo_parada = datos["motivo_parada"]
+    colonia.iteraciones_ejecutadas = datos.get("iteraciones_ejecutadas", len(datos["total_costs"]))
@@ -0,0 +1,20 @@
+import hashlib
+import random
+
+# Semilla de las ejecuciones que no fijan 'seed': los resultados son reproducibles por defecto
+SEMILLA_POR_DEFECTO = 777
+
+
+def derivar_semilla(semilla: int, *claves) -> int:
+    """
+    Deriva una semilla entera a partir de la semilla de la ejecución y de una serie de claves
+    (iteración, índice de hormiga...). El resultado no depende del orden en que se pidan las semillas.
+    """
+    material = ":".join(str(clave) for clave in (semilla,) + claves)
+    digest = hashlib.sha256(material.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def derivar_rng(semilla: int, *claves) -> random.Random:
+    """Crea un generador random.Random independiente para la combinación (semilla, claves...)."""
+    return random.Random(derivar_semilla(semilla, *claves))
@@ -0,0 +1,187 @@
+from typing import List, Dict, Tuple, Any, Optional, Callable
+from datetime import datetime, timedelta
+
+from utils.resource_classes import componentes_grafo_clases
+from utils.study_templates import componentes_grafo_plantillas
+from utils.generate_graph_components import (generar_nodos, generar_aristas, construir_mapeo_paciente_info,
+                                             podar_nodos_sin_aristas, calcular_heuristica_estatica)
+
+
+def transformar_nombres_pacientes(config_data: Dict[str, Any]):
+    """
+    Antepone el nombre del estudio a cada paciente ("Estudio Polio_P1") para que los
+    identificadores sean únicos entre estudios. Modifica config_data en el sitio.
+    """
+    for i in range(len(config_data['tipos_estudio'])):
+        estudio_config = config_data['tipos_estudio'][i]
+        nombre_estudio = estudio_config.get("nombre_estudio", f"EstudioDesconocido_{i}")
+
+        # Transformar nombres de pacientes
+        if "pacientes" in estudio_config and isinstance(estudio_config["pacientes"], list):
+            transformed_pacientes_list = []
+            for p_generic in estudio_config["pacientes"]:
+                transformed_name = f"{nombre_estudio}_{p_generic}"
+                transformed_pacientes_list.append(transformed_name)
+
+            config_data['tipos_estudio'][i]["pacientes"] = transformed_pacientes_list
+
+
+def generar_instancias_personal(config_data: Dict[str, Any]) -> List[str]:
+    """Genera las instancias de personal ("MG_1", "MG_2"...) a partir de la cantidad configurada por rol."""
+    lista_personal_instancias = []
+    for rol, cantidad in config_data["personal"].items():
+        for i in range(1, cantidad + 1):
+            lista_personal_instancias.append(f"{rol}_{i}")
+    return lista_personal_instancias
+
+
+def generar_horas_disponibles(hora_inicio_str: str, hora_fin_str: str, intervalo_minutos: int) -> List[str]:
+    """Genera una lista de strings de tiempo ("HH:MM") entre hora_inicio y hora_fin con el intervalo dado."""
+    horas = []
+    try:
+        start_time_obj = datetime.strptime(hora_inicio_str, "%H:%M").time()
+        end_time_obj = datetime.strptime(hora_fin_str, "%H:%M").time()
+    except ValueError: print("Error formato hora en generar_horas_disponibles."); return []
+    if intervalo_minutos <= 0: print("Error intervalo en generar_horas_disponibles."); return []
+
+    current_dt = datetime.combine(datetime.today(), start_time_obj)
+    # El último slot debe empezar estrictamente antes de end_time_obj
+    end_datetime_limit = datetime.combine(datetime.today(), end_time_obj)
+
+    while current_dt < end_datetime_limit:
+        horas.append(current_dt.strftime("%H:%M"))
+        current_dt += timedelta(minutes=intervalo_minutos)
+
+    return horas
+
+
+def preparar_escenario(config_data: Dict[str, Any], clases_recursos: bool = False,
+                       plantillas_estudio: bool = False, transformar_nombres: bool = True,
+                       filtro_nodos: Optional[Callable[[Tuple], bool]] = None,
+                       restriccion_nodos: Optional[Callable[[List[Tuple], Optional[Dict[str, List[str]]]], List[Tuple]]] = None
+                       ) -> Optional[Dict[str, Any]]:
+    """
+    Prepara todos los componentes necesarios para construir una colonia a partir de una
+    configuración validada (con los nombres de paciente sin transformar): horas, instancias
+    de personal, mapeo de pacientes, nodos y aristas del grafo. Con 'clases_recursos' el grafo
+    se construye por clases de recursos (personal por rol y consulta genérica) y con
+    'plantillas_estudio' con un único paciente plantilla por estudio. Con transformar_nombres=False
+    los nombres de paciente se consideran ya transformados. 'filtro_nodos' descarta nodos antes
+    de generar las aristas (p. ej. huecos ya ocupados al replanificar) y 'restriccion_nodos' recibe
+    la lista de nodos y los pacientes por plantilla y devuelve los nodos que se conservan (p. ej.
+    la resolución de grueso a fino).
+    Devuelve None si no se pueden generar las horas o los nodos.
+    """
+    if transformar_nombres:
+        transformar_nombres_pacientes(config_data)
+    horas_disponibles_un_dia = generar_horas_disponibles(
+        config_data['hora_inicio'],
+        config_data['hora_fin'],
+        config_data['intervalo_consultas_minutos']
+    )
+    if not horas_disponibles_un_dia:
+        return None
+
+    num_dias_planificacion = config_data['num_dias_planificacion']
+    lista_personal_instancias = generar_instancias_personal(config_data)
+    map_paciente_info = construir_mapeo_paciente_info(config_data['tipos_estudio'])
+    config_grafo, personal_grafo, capacidad_recursos = config_data, lista_personal_instancias, None
+    if clases_recursos:
+        config_grafo, personal_grafo, capacidad_recursos = componentes_grafo_clases(config_data, lista_personal_instancias)
+    paciente_info_grafo, pacientes_por_plantilla = map_paciente_info, None
+    if plantillas_estudio:
+        config_grafo, pacientes_por_plantilla = componentes_grafo_plantillas(config_grafo)
+        paciente_info_grafo = construir_mapeo_paciente_info(config_grafo['tipos_estudio'])
+
+    nodos = generar_nodos(
+        config_grafo,
+        horas_disponibles_un_dia,
+        num_dias_planificacion,
+        personal_grafo,
+        max_fases_por_dia_paciente=config_data.get('max_fases_por_dia_paciente', 2)
+    )
+    if filtro_nodos is not None:
+        nodos = [nodo for nodo in nodos if filtro_nodos(nodo)]
+    if nodos and restriccion_nodos is not None:
+        nodos = restriccion_nodos(nodos, pacientes_por_plantilla)
+    if not nodos:
+        return None
+    aristas = generar_aristas(nodos, paciente_info_grafo,
+                              duracion_consulta_minutos=config_data['intervalo_consultas_minutos'],
+                              horas_disponibles_str_list=horas_disponibles_un_dia,
+                              capacidad_recursos=capacidad_recursos,
+                              pacientes_plantilla=plantillas_estudio)
+    nodos, aristas = podar_nodos_sin_aristas(nodos, aristas, paciente_info_grafo)
+    heuristica_estatica = calcular_heuristica_estatica(aristas, paciente_info_grafo, config_data['intervalo_consultas_minutos'])
+    return {
+        "config_data": config_data,
+        "horas_disponibles": horas_disponibles_un_dia,
+        "num_dias_planificacion": num_dias_planificacion,
+        "lista_personal_instancias": lista_personal_instancias,
+        "map_paciente_info": map_paciente_info,
+        "nodos": nodos,
+        "aristas": aristas,
+        "heuristica_estatica": heuristica_estatica,
+        "personal_grafo": personal_grafo,
+        "capacidad_recursos": capacidad_recursos,
+        "pacientes_por_plantilla": pacientes_por_plantilla,
+    }
+
+
+VARIANTES = ("standard", "minmax")
+
+
+def crear_colonia(variante: str, escenario: Dict[str, Any], aco_params: Dict[str, Any], mixin: Optional[type] = None):
+    """
+    Construye el grafo y la colonia ('standard' -> Graph + ACO, 'minmax' -> MinMaxGraph + MinMaxACO)
+    sobre un escenario preparado, con los mismos parámetros que usan los main de cada versión.
+    Con 'mixin', la colonia es de una subclase que combina el mixin con la clase de la variante.
+    """
+    if variante == "standard":
+        from Standard.ACO import ACO
+        from Standard.Graph import Graph
+        graph = Graph(escenario["nodos"], escenario["aristas"], initial_pheromone=1.0,
+                      heuristica_estatica=escenario.get("heuristica_estatica"))
+        clase_aco = ACO
+        kwargs_variante = {}
+    elif variante == "minmax":
+        from MinMax.MinMaxAco import MinMaxACO
+        from MinMax.MinMaxGraph import MinMaxGraph
+        graph = MinMaxGraph(nodes=escenario["nodos"], edges=escenario["aristas"],
+                            pheromone_max=aco_params["pheromone_max"], pheromone_min=aco_params["pheromone_min"],
+                            heuristica_estatica=escenario.get("heuristica_estatica"))
+        clase_aco = MinMaxACO
+        kwargs_variante = {
+            "reinicio_estancamiento": aco_params.get("reinicio_estancamiento"),
+            "limites_dinamicos": aco_params.get("limites_dinamicos", False),
+            "p_best": aco_params.get("p_best", 0.05),
+        }
+    else:
+        raise ValueError(f"Variante desconocida '{variante}'. Disponibles: {', '.join(VARIANTES)}")
+
+    if mixin is not None:
+        clase_aco = type(mixin.__name__ + clase_aco.__name__, (mixin, clase_aco), {})
+    return clase_aco(
+        graph=graph,
+        config_data=escenario["config_data"],
+        horas_disponibles=escenario["horas_disponibles"],
+        num_dias_planificacion=escenario["num_dias_planificacion"],
+        lista_personal_instancias=escenario["lista_personal_instancias"],
+        n_ants=aco_params["n_ants"],
+        iterations=aco_params["iterations"],
+        alpha=aco_params["alpha"],
+        beta=aco_params["beta"],
+        rho=aco_params["rho"],
+        Q=aco_params["Q"],
+        seed=aco_params.get("seed"),
+        criterios_parada=aco_params.get("criterios_parada"),
+        adaptativo=aco_params.get("adaptativo"),
+        inicializacion_voraz=aco_params.get("inicializacion_voraz", False),
+        clases_recursos=aco_params.get("clases_recursos", False),
+        plantillas_estudio=aco_params.get("plantillas_estudio", False),
+        comprobacion_anticipada=aco_params.get("comprobacion_anticipada", False),
+        max_retrocesos=aco_params.get("max_retrocesos", 0),
+        margen_poda=aco_params.get("margen_poda"),
+        vectorizado=aco_params.get("vectorizado", False),
+        **kwargs_variante
+    )
@@ -0,0 +1,22 @@
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def guardar_solucion(ruta: str, solucion: Optional[Iterable[Tuple]], coste: float, **datos):
+    """ Guarda una solución en JSON (mismas claves que la mejor solución distribuida) con datos adicionales """
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(dict(datos, best_cost=coste, best_solution=[list(asignacion) for asignacion in (solucion or [])]),
+                  f, ensure_ascii=False, indent=2)
+    print(f"Solución guardada en {ruta}")
+
+
+def cargar_solucion(ruta: str) -> Tuple[List[Tuple], float, Dict[str, Any]]:
+    """ Carga una solución guardada con guardar_solucion: (asignaciones como tuplas, coste, datos completos) """
+    with open(ruta, "r", encoding="utf-8") as f:
+        datos = json.load(f)
+    solucion = [tuple(asignacion) for asignacion in datos.get("best_solution", [])]
+    return solucion, datos.get("best_cost", float('inf')), datos
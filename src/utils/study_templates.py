@@ -0,0 +1,86 @@
+import copy
+from typing import List, Dict, Tuple, Any, Optional
+
+from utils.Ant import Ant
+
+# Identificador de la plantilla de un estudio en los nodos del grafo ("Estudio Polio_*")
+SUFIJO_PLANTILLA = "_*"
+
+
+def componentes_grafo_plantillas(config_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+    """
+    Prepara la construcción del grafo por plantillas de estudio: todos los pacientes de un estudio
+    tienen las mismas fases y orden, así que el grafo se genera con un único paciente plantilla
+    por estudio. Devuelve la configuración con la que generar el grafo y los pacientes reales de
+    cada plantilla, en el orden en que se asignan.
+    """
+    config_grafo = copy.deepcopy(config_data)
+    pacientes_por_plantilla = {}
+    for estudio in config_grafo["tipos_estudio"]:
+        plantilla = estudio["nombre_estudio"] + SUFIJO_PLANTILLA
+        pacientes_por_plantilla[plantilla] = list(estudio["pacientes"])
+        estudio["pacientes"] = [plantilla]
+    return config_grafo, pacientes_por_plantilla
+
+
+def contraer_pacientes(solucion: List[Tuple], plantilla_de_paciente: Dict[str, str]) -> List[Tuple]:
+    """Sustituye cada paciente por la plantilla de su estudio (nodos del grafo por plantillas)."""
+    return [(plantilla_de_paciente.get(asignacion[0], asignacion[0]),) + tuple(asignacion[1:]) for asignacion in solucion]
+
+
+class AntPlantilla(Ant):
+    """
+    Hormiga sobre el grafo por plantillas de estudio: al elegir la primera fase de una plantilla
+    se le asigna el siguiente paciente sin programar de ese estudio, y el resto de fases de la
+    plantilla corresponden a ese paciente hasta que termina. Los pacientes de un estudio son
+    equivalentes, así que asignarlos en orden no pierde soluciones.
+    """
+    def __init__(self, *args, pacientes_por_plantilla: Optional[Dict[str, List[str]]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pacientes_por_plantilla = pacientes_por_plantilla or {}
+        self._siguiente_paciente = {plantilla: 0 for plantilla in self.pacientes_por_plantilla}
+        self._paciente_activo: Dict[str, str] = {}
+        self._orden_fases_plantilla = {
+            plantilla: self.paciente_to_estudio_info[pacientes[0]]["orden_fases"]
+            for plantilla, pacientes in self.pacientes_por_plantilla.items() if pacientes
+        }
+        self.asignaciones: List[Tuple] = []
+
+    def reiniciar(self):
+        super().reiniciar()
+        self._siguiente_paciente = {plantilla: 0 for plantilla in self.pacientes_por_plantilla}
+        self._paciente_activo = {}
+        self.asignaciones = []
+
+    def _paciente_de(self, node: Tuple) -> Optional[str]:
+        plantilla, fase = node[0], node[5]
+        orden_fases = self._orden_fases_plantilla.get(plantilla)
+        if orden_fases is None:
+            return None
+        if orden_fases.get(fase) == 1: # Empieza el siguiente paciente del estudio
+            pacientes = self.pacientes_por_plantilla[plantilla]
+            idx = self._siguiente_paciente[plantilla]
+            return pacientes[idx] if idx < len(pacientes) else None
+        return self._paciente_activo.get(plantilla)
+
+    def _registrar_asignacion(self, node: Tuple, paciente: str):
+        plantilla, fase = node[0], node[5]
+        if self._orden_fases_plantilla[plantilla].get(fase) == 1:
+            self._paciente_activo[plantilla] = paciente
+            self._siguiente_paciente[plantilla] += 1
+        self.asignaciones.append((paciente,) + tuple(node[1:]))
+
+    def _deshacer_asignacion(self, node: Tuple) -> str:
+        plantilla, fase = node[0], node[5]
+        paciente = self.asignaciones.pop()[0]
+        if self._orden_fases_plantilla[plantilla].get(fase) == 1: # Se devuelve el paciente al estudio
+            self._siguiente_paciente[plantilla] -= 1
+            idx_anterior = self._siguiente_paciente[plantilla] - 1
+            if idx_anterior >= 0:
+                self._paciente_activo[plantilla] = self.pacientes_por_plantilla[plantilla][idx_anterior]
+            else:
+                self._paciente_activo.pop(plantilla, None)
+        return paciente
+
+    def solucion(self) -> List[Tuple]:
+        return self.asignaciones
@@ -0,0 +1,211 @@
+from typing import List, Dict, Tuple, Optional, TYPE_CHECKING
+
+import numpy as np
+
+from utils.generate_graph_components import heuristica_transicion, HEURISTICA_MINIMA
+
+if TYPE_CHECKING:
+    from Standard.Graph import Graph
+    from utils.Ant import Ant
+
+
+class ColoniaVectorizada:
+    """
+    Construcción en bloque de las soluciones de una iteración: todas las hormigas avanzan un paso a la
+    vez sobre arrays de NumPy en lugar de recorrer el grafo una a una en Python.
+    Los nodos se codifican como enteros (posición en graph.nodes) y las aristas en formato CSR
+    (inicio de la lista de cada nodo en 'inicio_aristas' y destinos en 'destinos'). El estado de las
+    hormigas son arrays 2D/4D: fases programadas por paciente, fases por paciente y día, y ocupación
+    de cada miembro del personal y consulta por día y hueco.
+    Aplica los mismos filtros que Ant.choose_next_node y la misma heurística (componente estática por
+    arista y conflicto de recursos), y deja en cada hormiga un recorrido de nodos del grafo.
+    """
+    def __init__(self, graph: "Graph", paciente_to_estudio: Dict[str, Dict], pacientes: List[str],
+                 horas_disponibles: List[str], num_dias_planificacion: int, duracion_consultas: int,
+                 max_fases_por_dia_paciente: int = 2,
+                 capacidad_recursos: Optional[Dict[str, int]] = None,
+                 comprobacion_anticipada: bool = False):
+        self.graph = graph
+        self.nodos: List[Tuple] = list(graph.nodes)
+        self.num_dias = num_dias_planificacion
+        self.num_huecos = len(horas_disponibles)
+        self.max_fases_por_dia_paciente = max_fases_por_dia_paciente
+        self.comprobacion_anticipada = comprobacion_anticipada
+        capacidad_recursos = capacidad_recursos or {}
+
+        indice_paciente = {paciente: i for i, paciente in enumerate(pacientes)}
+        indice_hora = {hora: i for i, hora in enumerate(horas_disponibles)}
+        personal = sorted({nodo[4] for nodo in self.nodos})
+        consultas = sorted({nodo[1] for nodo in self.nodos})
+        indice_personal = {p: i for i, p in enumerate(personal)}
+        indice_consulta = {c: i for i, c in enumerate(consultas)}
+
+        # Atributos de cada nodo
+        num_nodos = len(self.nodos)
+        self.paciente = np.zeros(num_nodos, dtype=np.int32)
+        self.orden = np.zeros(num_nodos, dtype=np.int16)
+        self.dia = np.zeros(num_nodos, dtype=np.int16)
+        self.hueco = np.zeros(num_nodos, dtype=np.int16)
+        self.personal = np.zeros(num_nodos, dtype=np.int32)
+        self.consulta = np.zeros(num_nodos, dtype=np.int32)
+        self.nodo_valido = np.zeros(num_nodos, dtype=bool) # Paciente, orden de fase y hora conocidos
+        for i, (paciente, consulta, dia_idx, hora_str, personal_instancia, fase) in enumerate(self.nodos):
+            orden = paciente_to_estudio[paciente]["orden_fases"].get(fase) if paciente in paciente_to_estudio else None
+            if paciente not in indice_paciente or orden is None or hora_str not in indice_hora:
+                continue
+            self.paciente[i] = indice_paciente[paciente]
+            self.orden[i] = orden
+            self.dia[i] = dia_idx
+            self.hueco[i] = indice_hora[hora_str]
+            self.personal[i] = indice_personal[personal_instancia]
+            self.consulta[i] = indice_consulta[consulta]
+            self.nodo_valido[i] = True
+
+        self.num_pacientes = len(pacientes)
+        self.max_orden = np.array([max(paciente_to_estudio[p]["orden_fases"].values(), default=0) for p in pacientes],
+                                  dtype=np.int16)
+        self.total_fases = sum(len(paciente_to_estudio[p]["orden_fases"]) for p in pacientes)
+        self.capacidad_personal = np.array([capacidad_recursos.get(p, 1) for p in personal], dtype=np.int16)
+        self.capacidad_consulta = np.array([capacidad_recursos.get(c, 1) for c in consultas], dtype=np.int16)
+
+        # Aristas en formato CSR, en el mismo orden que graph.edges
+        self.inicio_aristas = np.zeros(num_nodos + 1, dtype=np.int64)
+        destinos = []
+        self.indice_arista: Dict[Tuple[Tuple, Tuple], int] = {}
+        indice_nodo = {nodo: i for i, nodo in enumerate(self.nodos)}
+        heuristica_estatica = []
+        for i, nodo in enumerate(self.nodos):
+            for destino in graph.edges.get(nodo, []):
+                j = indice_nodo.get(destino)
+                if j is None:
+                    continue
+                self.indice_arista[(nodo, destino)] = len(destinos)
+                destinos.append(j)
+                valor = graph.heuristica_estatica.get((nodo, destino)) if graph.heuristica_estatica is not None else None
+                if valor is None:
+                    mismo_paciente = nodo[0] == destino[0] and self.orden[j] != 1
+                    valor = heuristica_transicion(nodo, destino, duracion_consultas, mismo_paciente)
+                heuristica_estatica.append(valor)
+            self.inicio_aristas[i + 1] = len(destinos)
+        self.destinos = np.array(destinos, dtype=np.int32)
+        self.heuristica_estatica = np.array(heuristica_estatica, dtype=np.float64)
+        self._heuristica_beta = (None, None) # (beta, heuristica_estatica ** beta)
+
+        # Nodos iniciales: primeras fases (con la comprobación anticipada para un paciente sin fases)
+        iniciales = self.nodo_valido & (self.orden == 1)
+        if comprobacion_anticipada:
+            iniciales &= self._completable(self.paciente, np.arange(num_nodos), np.zeros(num_nodos, dtype=np.int16))
+        self.nodos_iniciales = np.nonzero(iniciales)[0]
+
+    def _completable(self, paciente: np.ndarray, nodo: np.ndarray, fases_en_el_dia: np.ndarray) -> np.ndarray:
+        """ Versión vectorizada de Ant._completable_tras: las fases restantes caben en el horizonte """
+        fases_restantes = self.max_orden[paciente] - self.orden[nodo]
+        huecos_hoy = np.minimum(self.max_fases_por_dia_paciente - (fases_en_el_dia + 1),
+                                self.num_huecos - 1 - self.hueco[nodo])
+        huecos_dias_siguientes = (self.num_dias - 1 - self.dia[nodo]) * min(self.max_fases_por_dia_paciente, self.num_huecos)
+        return fases_restantes <= np.maximum(0, huecos_hoy) + huecos_dias_siguientes
+
+    def _feromonas(self) -> np.ndarray:
+        """ Feromona actual de cada arista: la explícita del grafo o su nivel base """
+        feromonas = np.full(len(self.destinos), self.graph.current_base_pheromone, dtype=np.float64)
+        for arista, valor in self.graph.pheromone.items():
+            idx = self.indice_arista.get(arista)
+            if idx is not None:
+                feromonas[idx] = valor
+        return feromonas
+
+    def _heuristica_elevada(self, beta: float) -> np.ndarray:
+        if self._heuristica_beta[0] != beta:
+            self._heuristica_beta = (beta, self.heuristica_estatica ** beta)
+        return self._heuristica_beta[1]
+
+    def construir(self, ants: List["Ant"], alpha: float, beta: float, rng: np.random.Generator):
+        """
+        Construye a la vez los recorridos de todas las hormigas. Cada hormiga recibe su recorrido en
+        'visited' y 'valid_solution' indica si programó todas las fases.
+        """
+        num_hormigas = len(ants)
+        hormigas = np.arange(num_hormigas)
+        progreso = np.zeros((num_hormigas, self.num_pacientes), dtype=np.int16) # Última fase programada
+        fases_dia = np.zeros((num_hormigas, self.num_pacientes, self.num_dias), dtype=np.int16)
+        ocupacion_personal = np.zeros((num_hormigas, len(self.capacidad_personal), self.num_dias, self.num_huecos), dtype=np.int16)
+        ocupacion_consulta = np.zeros((num_hormigas, len(self.capacidad_consulta), self.num_dias, self.num_huecos), dtype=np.int16)
+        programadas = np.zeros(num_hormigas, dtype=np.int32)
+        recorridos = np.full((num_hormigas, max(1, self.total_fases)), -1, dtype=np.int32)
+        actual = np.full(num_hormigas, -1, dtype=np.int32)
+
+        def mover(idx_hormigas: np.ndarray, nodos: np.ndarray):
+            paciente, dia, hueco = self.paciente[nodos], self.dia[nodos], self.hueco[nodos]
+            progreso[idx_hormigas, paciente] = self.orden[nodos]
+            fases_dia[idx_hormigas, paciente, dia] += 1
+            ocupacion_personal[idx_hormigas, self.personal[nodos], dia, hueco] += 1
+            ocupacion_consulta[idx_hormigas, self.consulta[nodos], dia, hueco] += 1
+            recorridos[idx_hormigas, programadas[idx_hormigas]] = nodos
+            programadas[idx_hormigas] += 1
+            actual[idx_hormigas] = nodos
+
+        activas = np.zeros(num_hormigas, dtype=bool)
+        if len(self.nodos_iniciales) and self.total_fases:
+            mover(hormigas, self.nodos_iniciales[rng.integers(len(self.nodos_iniciales), size=num_hormigas)])
+            activas = programadas < self.total_fases
+
+        feromonas_alpha = self._feromonas() ** alpha
+        heuristica_beta = self._heuristica_elevada(beta)
+        heuristica_minima_beta = HEURISTICA_MINIMA ** beta
+
+        while activas.any():
+            idx_activas = np.nonzero(activas)[0]
+            nodo_actual = actual[idx_activas]
+            grados = self.inicio_aristas[nodo_actual + 1] - self.inicio_aristas[nodo_actual]
+            activas[idx_activas[grados == 0]] = False # Sin aristas salientes: bloqueada
+            idx_activas, nodo_actual, grados = idx_activas[grados > 0], nodo_actual[grados > 0], grados[grados > 0]
+            if not len(idx_activas):
+                break
+
+            # Candidatos de todas las hormigas activas, en segmentos contiguos por hormiga
+            total = int(grados.sum())
+            inicio_segmento = np.cumsum(grados) - grados
+            hormiga_de = np.repeat(idx_activas, grados)
+            aristas = np.repeat(self.inicio_aristas[nodo_actual], grados) + (np.arange(total) - np.repeat(inicio_segmento, grados))
+            candidatos = self.destinos[aristas]
+            paciente, dia, hueco = self.paciente[candidatos], self.dia[candidatos], self.hueco[candidatos]
+
+            # Mismos filtros que Ant.choose_next_node
+            fases_en_el_dia = fases_dia[hormiga_de, paciente, dia]
+            permitidos = self.nodo_valido[candidatos] & \
+                         (progreso[hormiga_de, paciente] < self.orden[candidatos]) & \
+                         (fases_en_el_dia < self.max_fases_por_dia_paciente)
+            if self.comprobacion_anticipada:
+                permitidos &= self._completable(paciente, candidatos, fases_en_el_dia)
+
+            # Peso: feromona ** alpha * heuristica ** beta (mínima si hay conflicto de recursos)
+            conflicto = (ocupacion_personal[hormiga_de, self.personal[candidatos], dia, hueco] >=
+                         self.capacidad_personal[self.personal[candidatos]]) | \
+                        (ocupacion_consulta[hormiga_de, self.consulta[candidatos], dia, hueco] >=
+                         self.capacidad_consulta[self.consulta[candidatos]])
+            pesos = feromonas_alpha[aristas] * np.where(conflicto, heuristica_minima_beta, heuristica_beta[aristas])
+            pesos = np.where(permitidos, pesos, 0.0)
+
+            # Normalizar por segmento antes de acumular para no perder precisión entre hormigas
+            maximos = np.maximum.reduceat(pesos, inicio_segmento)
+            bloqueadas = maximos <= 0
+            pesos = pesos / np.repeat(np.where(bloqueadas, 1.0, maximos), grados)
+            acumulados = np.cumsum(pesos)
+            fin_segmento = inicio_segmento + grados
+            acumulado_previo = np.where(inicio_segmento > 0, acumulados[inicio_segmento - 1], 0.0)
+            total_segmento = acumulados[fin_segmento - 1] - acumulado_previo
+
+            # Muestreo por ruleta dentro del segmento de cada hormiga
+            objetivo = acumulado_previo + rng.random(len(idx_activas)) * total_segmento
+            elegidos = np.searchsorted(acumulados, objetivo, side='right')
+            elegidos = np.clip(elegidos, inicio_segmento, fin_segmento - 1)
+
+            activas[idx_activas[bloqueadas]] = False
+            avanzan = ~bloqueadas
+            mover(idx_activas[avanzan], candidatos[elegidos[avanzan]])
+            activas[idx_activas[avanzan]] = programadas[idx_activas[avanzan]] < self.total_fases
+
+        for i, ant in enumerate(ants):
+            ant.visited = [self.nodos[nodo] for nodo in recorridos[i, :programadas[i]]]
+            ant.current_node = ant.visited[-1] if ant.visited else None
+            ant.valid_solution = bool(self.total_fases) and programadas[i] == self.total_fases
@@ -0,0 +1,37 @@
+import json
+import os
+from typing import Dict, List, Tuple, Optional
+
+from utils.solution import cargar_solucion
+
+
+def guardar_feromonas(ruta: str, graph) -> None:
+    """ Guarda en JSON la instantánea de feromonas del grafo (Graph.exportar_feromonas) """
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(graph.exportar_feromonas(), f, ensure_ascii=False)
+    print(f"Feromonas guardadas en {ruta}")
+
+
+def cargar_arranque_en_caliente(ruta_solucion: Optional[str],
+                                ruta_feromonas: Optional[str]) -> Tuple[Optional[List[Tuple]], Optional[Dict]]:
+    """
+    Carga la solución (guardar_solucion) y la instantánea de feromonas (guardar_feromonas) de una
+    ejecución anterior. Las rutas vacías o inexistentes se ignoran con un aviso.
+    """
+    solucion, feromonas = None, None
+    if ruta_solucion:
+        if os.path.exists(ruta_solucion):
+            solucion, coste, _ = cargar_solucion(ruta_solucion)
+            print(f"Solución anterior cargada de {ruta_solucion}: {len(solucion)} asignaciones (coste {coste:.2f}).")
+        else:
+            print(f"Aviso: no existe la solución anterior '{ruta_solucion}'; se ignora.")
+    if ruta_feromonas:
+        if os.path.exists(ruta_feromonas):
+            with open(ruta_feromonas, "r", encoding="utf-8") as f:
+                feromonas = json.load(f)
+        else:
+            print(f"Aviso: no existe la instantánea de feromonas '{ruta_feromonas}'; se ignora.")
+    return solucion, feromonas